@@ -10,8 +10,14 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
-import pymysql
+
+# mysqlclient (MySQLdb) is the native driver; fall back to PyMySQL only
+# when it is missing, and don't import either one otherwise
+if find_spec('MySQLdb') is None and find_spec('pymysql') is not None:
+    import pymysql
+    pymysql.install_as_MySQLdb()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -41,11 +47,15 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',  # ← Add this
     'drf_spectacular',
+    'django_crontab',
     'movies',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'movies.middleware.SlowQueryMiddleware',
+    'movies.middleware.CompressionMiddleware',
+    'movies.middleware.RateLimitHeadersMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -101,11 +111,34 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'movies.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    # Token buckets in the shared cache; views weight requests with
+    # throttle_cost and get their own bucket with throttle_scope
+    'DEFAULT_THROTTLE_CLASSES': [
+        'movies.throttling.UserTokenBucketThrottle',
+        'movies.throttling.ScopedTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '120/min',
+        'user': '600/min',
+        'search': '60/min',
+        'import': '20/hour',
+        'export': '10/hour',
+    },
+    # orjson-backed when installed, stdlib json otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'movies.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'movies.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 from datetime import timedelta
 
@@ -132,11 +165,105 @@ SIMPLE_JWT = {
     
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
-    'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
+    'TOKEN_USER_CLASS': 'movies.authentication.CachedTokenUser',
+    'TOKEN_REFRESH_SERIALIZER': 'movies.serializers.TokenRefreshDenylistSerializer',
     
     'JTI_CLAIM': 'jti',
 }
 
+# Cache
+# Holds the JWT denylist and short-lived user objects. Use a shared
+# backend (Redis / Memcached) in production so every worker sees it.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds a full User row stays cached for views that need the model
+JWT_USER_CACHE_TIMEOUT = 60
+
+# Response compression (brotli needs the optional `brotli` package)
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+RESPONSE_COMPRESSION_GZIP_LEVEL = 6
+RESPONSE_COMPRESSION_BROTLI_QUALITY = 5
+
+# Movie lists above this many rows are streamed in chunks
+MOVIE_LIST_STREAMING_THRESHOLD = 1000
+MOVIE_LIST_STREAMING_CHUNK_SIZE = 500
+
+# GET /api/v1/movies/batch/?ids=...: max ids per request, and how long
+# serialized movies stay cached (they are also invalidated on change).
+# Invalidation bumps version keys in CACHES: with the LocMemCache above,
+# bumps from cron processes (write-behind, sync, dedup) or other workers
+# never reach a web worker, which then serves its fragments until they
+# time out. Use a shared backend wherever more than one process writes.
+MOVIE_BATCH_MAX_IDS = 100
+MOVIE_CACHE_TIMEOUT = 3600
+
+# Scheduled jobs (python manage.py crontab add)
+CRONJOBS = [
+    ('*/15 * * * *', 'movies.cron.sync_catalog'),
+    ('* * * * *', 'movies.cron.apply_pending_writes'),
+    ('30 3 * * *', 'movies.cron.process_images'),
+    ('0 4 * * *', 'movies.cron.archive_reviews'),
+    ('30 4 * * *', 'movies.cron.compact_changes'),
+]
+CRONTAB_LOCK_JOBS = True
+
+# Catalog sync budget per run
+CATALOG_SYNC_TIME_BUDGET = 300
+CATALOG_SYNC_REQUEST_BUDGET = 200
+CATALOG_SYNC_MIN_AGE_HOURS = 24
+
+# Write-behind for review / watchlist bursts: requests are validated and
+# answered 202, a worker applies them in batches
+# (cron every minute, or `manage.py apply_pending_writes --follow`)
+WRITE_BEHIND_ENABLED = False
+WRITE_BEHIND_BATCH_SIZE = 500
+
+# Admin changelists count filtered results only up to this many rows
+ADMIN_COUNT_LIMIT = 10000
+
+# Poster / backdrop thumbnails (manage.py process_images; rendering needs
+# Pillow). Bare TMDB paths are fetched from IMAGE_SOURCE_BASE_URL; only
+# sources on IMAGE_SOURCE_HOSTS are fetched at all.
+IMAGE_STORAGE_DIR = BASE_DIR / 'var' / 'images'
+IMAGE_SOURCE_BASE_URL = 'https://image.tmdb.org/t/p/original'
+IMAGE_SOURCE_HOSTS = ('image.tmdb.org',)
+IMAGE_WIDTHS = (92, 185, 342, 500, 780)
+IMAGE_STORAGE_MAX_BYTES = 1024 ** 3
+
+# manage.py dedup_movies: minimum title similarity for a duplicate, and
+# blocks larger than DEDUP_MAX_BLOCK only compare DEDUP_WINDOW neighbours
+DEDUP_THRESHOLD = 0.92
+DEDUP_MAX_BLOCK = 500
+DEDUP_WINDOW = 50
+
+# Slow query log (off by default): queries slower than the threshold are
+# aggregated per view in SlowQuery (admin / manage.py slow_queries) and
+# new or sampled ones are EXPLAINed
+SLOW_QUERY_LOG_ENABLED = False
+SLOW_QUERY_THRESHOLD_MS = 200
+SLOW_QUERY_EXPLAIN_RATE = 0.1
+
+# Reviews older than this move to ArchivedReview (manage.py archive_reviews,
+# nightly cron). They keep counting in the statistics; the review list
+# includes them with ?include_archived=1
+REVIEW_ARCHIVE_AFTER_DAYS = 730
+
+# Change feed (GET /api/v1/changes/?since=): events get their position
+# once the write commits; compaction (nightly, manage.py compact_changes)
+# drops superseded events and everything older than the retention
+CHANGE_FEED_ENABLED = True
+CHANGE_FEED_RETENTION_DAYS = 7
+
+# Browse queries on the movie list / search answered from per-worker NumPy
+# columns (needs numpy); reloaded when the catalog version changes or
+# after COLUMNAR_CATALOG_MAX_AGE seconds
+COLUMNAR_CATALOG_ENABLED = False
+COLUMNAR_CATALOG_MAX_AGE = 300
+
 # Spectacular (Swagger)
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Movie Database API',
@@ -145,6 +272,11 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# Pre-generated schema artifacts (manage.py generate_schema at deploy;
+# otherwise built on the first /api/schema/ request). Set SCHEMA_VERSION
+# to e.g. the git sha to key them on that instead of a source hash.
+SCHEMA_ARTIFACT_DIR = BASE_DIR / 'var' / 'schema'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
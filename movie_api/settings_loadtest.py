@@ -0,0 +1,25 @@
+"""
+Settings for manage.py loadtest
+A seeded SQLite stand-in for the MySQL database, no throttling and
+DEBUG off (DEBUG keeps every query in memory)
+
+python manage.py loadtest --settings=movie_api.settings_loadtest
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'var' / 'loadtest.sqlite3',
+        # Writers wait for the lock instead of failing right away
+        'OPTIONS': {'timeout': 30},
+    }
+}
+
+# Measure the app, not the rate limits
+REST_FRAMEWORK = {**REST_FRAMEWORK, 'DEFAULT_THROTTLE_CLASSES': []}
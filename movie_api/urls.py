@@ -1,17 +1,32 @@
 from django.contrib import admin
 from django.urls import path, include
+from django.utils.module_loading import import_string
 from movies.views_frontend import home
-
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
+from movies.views import SchemaView, TokenRevokeView
 
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
 
+
+def lazy_view(view_path, **initkwargs):
+    """
+    Import the view class on its first request instead of at URLconf
+    load, so drf-spectacular stays out of worker start-up
+    """
+    view = None
+
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(view_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    dispatch.csrf_exempt = True
+    return dispatch
+
+
 urlpatterns = [
     # ================= FRONTEND =================#
     path('', home, name='home'),
@@ -22,7 +37,8 @@ urlpatterns = [
 # ================= AUTH =================#
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/revoke/', TokenRevokeView.as_view(), name='token_revoke'),
 # ================= API DOCS =================#
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('api/schema/', SchemaView.as_view(), name='schema'),
+    path('api/swagger/', lazy_view('drf_spectacular.views.SpectacularSwaggerView', url_name='schema'), name='swagger-ui'),
 ]
\ No newline at end of file
@@ -1,13 +1,45 @@
 
 from django.contrib import admin
-from .models import Movie, Genre, Review, Watchlist, Favorite
+from .models import Movie, Genre, Review, ArchivedReview, Watchlist, Favorite, SyncRun, CatalogStat, PendingWrite, SlowQuery, ChangeEvent, ChangeCompaction, ChangeSequence
+from .pagination import EstimatedCountPaginator
+from .utils.cache_manager import genre_cache
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """No COUNT(*) over the whole table on every changelist page"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class GenreListFilter(admin.SimpleListFilter):
+    """Genre choices from the genre cache, filtered without join + DISTINCT"""
+    title = "genre"
+    parameter_name = "genre"
+
+    def lookups(self, request, model_admin):
+        return [(genre["id"], genre["name"]) for genre in genre_cache.genres()]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+
+        try:
+            genre_id = int(self.value())
+        except ValueError:
+            return queryset.none()
+
+        links = Movie.genres.through.objects.filter(genre_id=genre_id)
+        return queryset.filter(id__in=links.values("movie_id"))
 
 
 @admin.register(Movie)
-class MovieAdmin(admin.ModelAdmin):
+class MovieAdmin(LargeTableAdmin):
     list_display = ("id", "title", "release_date", "vote_average")
-    search_fields = ("title",)
-    list_filter = ("release_date", "genres")
+    # Prefix / exact lookups can use the title and imdb_id indexes
+    search_fields = ("^title", "=imdb_id")
+    search_help_text = "Title prefix or exact IMDb id"
+    list_filter = ("release_date", GenreListFilter)
+    autocomplete_fields = ("genres",)
 
 
 @admin.register(Genre)
@@ -17,18 +49,86 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(LargeTableAdmin):
     list_display = ("id", "movie", "user", "rating", "created_at")
     list_filter = ("rating",)
+    list_select_related = ("movie", "user")
+    autocomplete_fields = ("movie", "user")
+
+
+@admin.register(ArchivedReview)
+class ArchivedReviewAdmin(LargeTableAdmin):
+    list_display = ("id", "movie", "user", "rating", "created_at")
+    list_filter = ("rating",)
+    list_select_related = ("movie", "user")
+    raw_id_fields = ("movie", "user")
+    readonly_fields = [field.name for field in ArchivedReview._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
 
 
 @admin.register(Watchlist)
-class WatchlistAdmin(admin.ModelAdmin):
+class WatchlistAdmin(LargeTableAdmin):
     list_display = ("id", "user", "movie", "added_at")
+    list_select_related = ("user", "movie")
+    autocomplete_fields = ("user", "movie")
 
 
 @admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
+class FavoriteAdmin(LargeTableAdmin):
     list_display = ("id", "user", "movie", "added_at")
+    list_select_related = ("user", "movie")
+    autocomplete_fields = ("user", "movie")
+
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "checked", "updated", "failed", "requests", "started_at", "finished_at")
+    list_filter = ("status",)
+
+
+@admin.register(CatalogStat)
+class CatalogStatAdmin(admin.ModelAdmin):
+    list_display = ("dimension", "key", "movie_count", "review_count", "updated_at")
+    list_filter = ("dimension",)
+
+
+@admin.register(PendingWrite)
+class PendingWriteAdmin(LargeTableAdmin):
+    list_display = ("id", "kind", "user", "movie", "created_at")
+    list_filter = ("kind",)
+    list_select_related = ("user", "movie")
+    raw_id_fields = ("user", "movie")
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("short_sql", "view", "count", "total_ms", "max_ms", "average_ms", "last_seen")
+    list_filter = ("view",)
+    search_fields = ("sql", "view")
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
+
+    @admin.display(description="SQL")
+    def short_sql(self, obj):
+        return obj.sql[:120]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(LargeTableAdmin):
+    list_display = ("id", "seq", "action", "entity", "entity_id", "movie_id", "user_id", "created_at")
+    list_filter = ("entity", "action")
+    readonly_fields = [field.name for field in ChangeEvent._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ChangeCompaction)
+class ChangeCompactionAdmin(admin.ModelAdmin):
+    list_display = ("ran_at", "watermark", "superseded", "expired")
 
 # Register your models here.
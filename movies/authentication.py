@@ -0,0 +1,123 @@
+"""
+JWT Authentication
+Resolves users from token claims instead of hitting the database
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+
+USER_CACHE_KEY = "auth:user:{}"
+TOKEN_DENYLIST_KEY = "auth:denylist:jti:{}"
+USER_DENYLIST_KEY = "auth:denylist:user:{}"
+
+
+# =====================================================
+# CACHED USER LOOKUP
+# =====================================================
+def get_cached_user(user_id):
+    """Return the User row for user_id, cached for a short TTL"""
+    key = USER_CACHE_KEY.format(user_id)
+    user = cache.get(key)
+
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(key, user, getattr(settings, "JWT_USER_CACHE_TIMEOUT", 60))
+
+    return user
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+# =====================================================
+# TOKEN DENYLIST
+# =====================================================
+def revoke_token(token):
+    """Deny a single token (access or refresh) until it expires"""
+    ttl = int(token["exp"] - time.time())
+    if ttl > 0:
+        cache.set(TOKEN_DENYLIST_KEY.format(token[api_settings.JTI_CLAIM]), True, ttl)
+
+
+def revoke_user_tokens(user_id):
+    """Deny every access token issued to user_id before now"""
+    ttl = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    cache.set(USER_DENYLIST_KEY.format(user_id), time.time(), ttl)
+
+
+def is_token_revoked(token):
+    jti_key = TOKEN_DENYLIST_KEY.format(token.get(api_settings.JTI_CLAIM))
+    user_key = USER_DENYLIST_KEY.format(token.get(api_settings.USER_ID_CLAIM))
+
+    # One cache round trip covers both the token and the user entry
+    denied = cache.get_many([jti_key, user_key])
+
+    if denied.get(jti_key):
+        return True
+
+    revoked_at = denied.get(user_key)
+    return revoked_at is not None and token.get("iat", 0) <= revoked_at
+
+
+# =====================================================
+# TOKEN USER
+# =====================================================
+class CachedTokenUser(TokenUser):
+    """
+    Stateless user backed by the token claims.
+    `id` / `pk` never touch the database; `instance` loads the
+    full User model (through the cache) only when a view needs it.
+    """
+
+    @cached_property
+    def instance(self):
+        user = get_cached_user(self.id)
+        if user is None or not user.is_active:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        return user
+
+    @cached_property
+    def username(self):
+        return self.instance.username
+
+    @cached_property
+    def is_staff(self):
+        return self.instance.is_staff
+
+    @cached_property
+    def is_superuser(self):
+        return self.instance.is_superuser
+
+    def has_perm(self, perm, obj=None):
+        return self.instance.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.instance.has_perms(perm_list, obj)
+
+
+class CachedJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication without a user query per request.
+    Users are built from SIMPLE_JWT["TOKEN_USER_CLASS"] (CachedTokenUser)
+    and revoked tokens are rejected through the cached denylist.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+
+        if is_token_revoked(validated_token):
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+
+        return validated_token
@@ -0,0 +1,268 @@
+"""
+Performance benchmarks
+Run with: python manage.py benchmark [suite ...]
+Every suite runs against a freshly seeded catalog that is rolled back afterwards
+"""
+
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+
+from .models import Movie, Genre, MovieRatingCount, Review
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a suite; it receives the row count and returns result tuples"""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def timed(label, rows, func):
+    """Run func once and return a (label, rows, seconds) result"""
+    started = time.perf_counter()
+    func()
+    return label, rows, time.perf_counter() - started
+
+
+# =====================================================
+# SEED DATA
+# =====================================================
+GENRE_NAMES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary",
+    "Drama", "Family", "Fantasy", "Horror", "Romance", "Thriller",
+]
+
+
+def seed_catalog(movies=1000, reviews_per_movie=3, seed=42):
+    """Bulk insert a synthetic catalog with genres, users and reviews"""
+    rng = random.Random(seed)
+
+    Genre.objects.bulk_create(
+        [Genre(name=name) for name in GENRE_NAMES],
+        ignore_conflicts=True,
+    )
+    genre_ids = list(Genre.objects.values_list("id", flat=True))
+
+    User.objects.bulk_create([
+        User(username=f"benchmark-{seed}-{i}") for i in range(reviews_per_movie)
+    ])
+    users = list(User.objects.filter(username__startswith=f"benchmark-{seed}-"))
+
+    first = date(1950, 1, 1)
+    created = Movie.objects.bulk_create(
+        [
+            Movie(
+                title=f"Benchmark Movie {i}",
+                overview="A synthetic movie used for benchmarking. " * 8,
+                release_date=first + timedelta(days=rng.randrange(27000)),
+                vote_average=round(rng.uniform(1, 10), 1),
+                vote_count=rng.randrange(50000),
+                runtime=rng.randrange(60, 200),
+                poster_path=f"https://images.example.com/{i}.jpg",
+            )
+            for i in range(movies)
+        ],
+        batch_size=1000,
+    )
+    movie_ids = [movie.id for movie in created]
+
+    # MySQL does not return ids from bulk_create
+    if None in movie_ids:
+        movie_ids = list(Movie.objects.order_by("-id").values_list("id", flat=True)[:movies])
+
+    Through = Movie.genres.through
+    Through.objects.bulk_create(
+        [
+            Through(movie_id=movie_id, genre_id=genre_id)
+            for movie_id in movie_ids
+            for genre_id in rng.sample(genre_ids, 2)
+        ],
+        batch_size=1000,
+    )
+
+    reviews = [
+        Review(movie_id=movie_id, user=user, rating=rng.randint(1, 10))
+        for movie_id in movie_ids
+        for user in users
+    ]
+    Review.objects.bulk_create(reviews, batch_size=1000)
+
+    # bulk_create sends no signals; the movie aggregates read the histogram
+    histogram = Counter((review.movie_id, review.rating) for review in reviews)
+    MovieRatingCount.objects.bulk_create(
+        [
+            MovieRatingCount(movie_id=movie_id, rating=rating, count=count)
+            for (movie_id, rating), count in histogram.items()
+        ],
+        batch_size=1000,
+    )
+
+    return movie_ids
+
+
+# =====================================================
+# SUITES
+# =====================================================
+@benchmark("serializers")
+def serializer_throughput(rows):
+    from .serializers import MovieFieldset, MovieSerializer
+
+    seed_catalog(rows)
+    queryset = Movie.objects.all()
+
+    full = MovieFieldset()
+    compact = MovieFieldset({"fields": "id,title,poster_path,vote_average"})
+
+    return [
+        timed("MovieSerializer (N+1 aggregates)", rows,
+              lambda: MovieSerializer(queryset.prefetch_related("genres"), many=True).data),
+        timed("MovieSerializer (optimized qs)", rows,
+              lambda: MovieSerializer(full.optimize(queryset), many=True).data),
+        timed("fast path, all fields", rows,
+              lambda: full.serialize(full.values(queryset))),
+        timed("fast path, ?fields=id,title,...", rows,
+              lambda: compact.serialize(compact.values(queryset))),
+    ]
+
+
+@benchmark("renderer")
+def renderer_throughput(rows):
+    import io
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from .renderers import FastJSONParser, FastJSONRenderer, orjson
+    from .serializers import MovieFieldset
+
+    seed_catalog(rows)
+
+    fieldset = MovieFieldset()
+    payload = {"count": rows, "results": fieldset.serialize(fieldset.values(Movie.objects.all()))}
+    body = JSONRenderer().render(payload)
+
+    engine = "orjson" if orjson is not None else "stdlib fallback"
+
+    return [
+        timed("JSONRenderer (stdlib json)", rows, lambda: JSONRenderer().render(payload)),
+        timed(f"FastJSONRenderer ({engine})", rows, lambda: FastJSONRenderer().render(payload)),
+        timed("JSONParser (stdlib json)", rows, lambda: JSONParser().parse(io.BytesIO(body))),
+        timed(f"FastJSONParser ({engine})", rows, lambda: FastJSONParser().parse(io.BytesIO(body))),
+    ]
+
+
+@benchmark("streaming")
+def streaming_list(rows):
+    import time
+    import tracemalloc
+
+    from django.test import RequestFactory, override_settings
+
+    from .views import MovieListCreateView
+
+    seed_catalog(rows)
+    view = MovieListCreateView.as_view()
+    request = RequestFactory().get("/api/v1/movies/")
+
+    results = []
+    for label, threshold in (("buffered", rows + 1), ("streamed", 0)):
+        with override_settings(MOVIE_LIST_STREAMING_THRESHOLD=threshold):
+            tracemalloc.start()
+            started = time.perf_counter()
+
+            response = view(request)
+            if response.streaming:
+                chunks = iter(response.streaming_content)
+                next(chunks)
+                first_byte = time.perf_counter() - started
+                for _ in chunks:
+                    pass
+            else:
+                response.render()
+                first_byte = time.perf_counter() - started
+
+            total = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+
+        results.append((f"{label}: first byte", rows, first_byte))
+        results.append((f"{label}: total (peak {peak:.1f} MB)", rows, total))
+
+    return results
+
+
+@benchmark("columnar")
+def columnar_browse(rows):
+    """ORM vs the in-memory columnar snapshot for browse queries"""
+    from django.test import RequestFactory, override_settings
+
+    from .utils import columnar
+    from .utils.cache_manager import catalog_version, genre_cache
+    from .views import MovieListCreateView, filter_by_genre
+
+    if not columnar.available():
+        return [("numpy is not installed", 0, 0.0)]
+
+    seed_catalog(rows)
+    genre = genre_cache.genres()[0]["slug"]
+    queryset = filter_by_genre(Movie.objects.all(), genre).filter(vote_average__gte=5)
+
+    snapshot = None
+
+    def load():
+        nonlocal snapshot
+        snapshot = columnar.CatalogSnapshot(catalog_version())
+
+    results = [timed("snapshot load", rows, load)]
+    genre_ids = genre_cache.resolve(genre)
+
+    for sort in ("-vote_average", "title"):
+        results += [
+            timed(f"ORM: genre + min_vote, top 20 by {sort}", rows,
+                  lambda: list(queryset.order_by(sort, "id").values_list("id", flat=True)[:20])),
+            timed(f"snapshot: genre + min_vote, top 20 by {sort}", rows,
+                  lambda: snapshot.query(genre_ids=genre_ids, min_vote=5, sort=sort)[:20]),
+            timed(f"ORM: genre + min_vote, all by {sort}", rows,
+                  lambda: list(queryset.order_by(sort, "id").values_list("id", flat=True))),
+            timed(f"snapshot: genre + min_vote, all by {sort}", rows,
+                  lambda: snapshot.query(genre_ids=genre_ids, min_vote=5, sort=sort)[:]),
+        ]
+
+    # Whole request, movie fragments cached by a first pass. The default
+    # LocMem cache keeps 300 entries, too few to hold every fragment.
+    caches = {"default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": rows * 4},
+    }}
+    view = MovieListCreateView.as_view()
+    request = RequestFactory().get("/api/v1/movies/", {"genre": genre, "min_vote": 5, "sort": "-vote_average"})
+    for label, enabled in (("ORM", False), ("snapshot", True)):
+        with override_settings(CACHES=caches, COLUMNAR_CATALOG_ENABLED=enabled, MOVIE_LIST_STREAMING_THRESHOLD=rows + 1):
+            view(request).render()
+            results.append(timed(f"{label}: list view, warm", rows, lambda: view(request).render()))
+
+    return results
+
+
+@benchmark("startup")
+def startup_time(rows):
+    """Cold start of a fresh interpreter; rows = modules imported"""
+    from .utils.startup import profile_startup
+
+    modules = len(profile_startup()["modules"])
+    profile = profile_startup(importtime=False)
+
+    return [
+        ("cold start: total", modules, profile["wall"]),
+        ("cold start: settings", modules, profile["settings"]),
+        ("cold start: apps ready", modules, profile["apps_ready"]),
+        ("cold start: urlconf", modules, profile["urls"]),
+    ]
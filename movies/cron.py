@@ -0,0 +1,27 @@
+"""
+Scheduled jobs (registered through CRONJOBS / django-crontab)
+"""
+
+from movies.services import change_feed, image_pipeline, review_archive, write_behind
+from movies.services.catalog_sync import CatalogSync
+
+
+def sync_catalog():
+    CatalogSync().run()
+
+
+def apply_pending_writes():
+    if write_behind.enabled():
+        write_behind.apply_pending_writes()
+
+
+def process_images():
+    image_pipeline.process_catalog()
+
+
+def archive_reviews():
+    review_archive.archive_reviews()
+
+
+def compact_changes():
+    change_feed.compact()
@@ -0,0 +1,173 @@
+"""
+Catalog Exporter
+Streams the whole catalog as gzip NDJSON (or Parquet) snapshots
+"""
+
+import zlib
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from movies.models import Movie, MovieRatingCount, Review
+from movies.renderers import dumps
+
+
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "overview",
+    "release_date",
+    "vote_average",
+    "vote_count",
+    "poster_path",
+    "backdrop_path",
+    "runtime",
+    "tmdb_id",
+    "imdb_id",
+    "created_at",
+    "updated_at",
+)
+
+
+# =====================================================
+# ROW SOURCE
+# =====================================================
+def parse_since(value):
+    """Parse an ISO date/datetime for incremental exports"""
+    since = parse_datetime(value)
+
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid since value: {value}")
+        since = datetime.combine(day, datetime.min.time())
+
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, dt_timezone.utc)
+
+    return since
+
+
+def changed_movies(since=None):
+    """Movies changed (or reviewed) at or after `since`; all movies if None"""
+    queryset = Movie.objects.all()
+
+    if since is not None:
+        reviewed = Review.objects.filter(updated_at__gte=since).values("movie_id")
+        queryset = queryset.filter(Q(updated_at__gte=since) | Q(id__in=reviewed))
+
+    return queryset
+
+
+def iter_catalog_chunks(since=None, chunk_size=2000):
+    """
+    Yield lists of plain row dicts with genre ids and review aggregates.
+
+    The table is walked by primary key (keyset), so every chunk is a
+    short indexed range query and memory stays constant on every backend,
+    including MySQL where iterator() cannot stream from the server.
+    """
+    queryset = changed_movies(since).order_by("id").values(*EXPORT_FIELDS)
+    last_id = 0
+
+    while True:
+        rows = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not rows:
+            return
+
+        ids = [row["id"] for row in rows]
+
+        genre_ids = defaultdict(list)
+        through = Movie.genres.through.objects.filter(movie_id__in=ids)
+        for movie_id, genre_id in through.values_list("movie_id", "genre_id"):
+            genre_ids[movie_id].append(genre_id)
+
+        # Rating histograms also count archived reviews
+        aggregates = {
+            movie_id: (count, total)
+            for movie_id, count, total in MovieRatingCount.objects.filter(movie_id__in=ids, count__gt=0)
+            .order_by()
+            .values_list("movie_id")
+            .annotate(reviews=Sum("count"), total=Sum(F("rating") * F("count")))
+        }
+
+        for row in rows:
+            count, total = aggregates.get(row["id"], (0, 0))
+            row["genre_ids"] = sorted(genre_ids.get(row["id"], []))
+            row["review_count"] = count
+            row["average_rating"] = round(total / count, 1) if count else None
+
+        yield rows
+
+        last_id = ids[-1]
+
+
+# =====================================================
+# NDJSON
+# =====================================================
+def iter_ndjson_gzip(chunks, level=6):
+    """Compress NDJSON incrementally, yielding gzip bytes per chunk"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    for rows in chunks:
+        data = b"".join(dumps(row) + b"\n" for row in rows)
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
+
+
+def write_ndjson(path, chunks):
+    rows = 0
+
+    def counted():
+        nonlocal rows
+        for chunk in chunks:
+            rows += len(chunk)
+            yield chunk
+
+    with open(path, "wb") as output:
+        for data in iter_ndjson_gzip(counted()):
+            output.write(data)
+
+    return rows
+
+
+# =====================================================
+# PARQUET (optional, needs pyarrow)
+# =====================================================
+def write_parquet(path, chunks):
+    """Write one Parquet row group per chunk; requires pyarrow"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("title", pa.string()),
+        ("overview", pa.string()),
+        ("release_date", pa.date32()),
+        ("vote_average", pa.float64()),
+        ("vote_count", pa.int64()),
+        ("poster_path", pa.string()),
+        ("backdrop_path", pa.string()),
+        ("runtime", pa.int64()),
+        ("tmdb_id", pa.int64()),
+        ("imdb_id", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("updated_at", pa.timestamp("us", tz="UTC")),
+        ("genre_ids", pa.list_(pa.int64())),
+        ("review_count", pa.int64()),
+        ("average_rating", pa.float64()),
+    ])
+
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            rows += len(chunk)
+
+    return rows
@@ -0,0 +1,194 @@
+"""
+IMDb Dataset Importer
+Bulk loads the title.basics / title.ratings TSV dumps
+(https://datasets.imdbws.com) keyed on imdb_id
+"""
+
+import gzip
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from django.db import connections
+
+from movies.models import Genre
+from movies.importers.upsert import link_genres, upsert_movies
+
+
+NULL = "\\N"
+TITLE_TYPES = ("movie", "tvMovie")
+
+
+# =====================================================
+# FILE READING
+# =====================================================
+def open_dataset(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def iter_line_chunks(path, chunk_size):
+    """Yield lists of raw data lines (header skipped)"""
+    with open_dataset(path) as handle:
+        next(handle, None)
+
+        chunk = []
+        for line in handle:
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+
+def read_ratings(path):
+    """Load title.ratings into {tconst: (average_rating, num_votes)}"""
+    ratings = {}
+
+    with open_dataset(path) as handle:
+        next(handle, None)
+
+        for line in handle:
+            tconst, average, votes = line.rstrip("\n").split("\t")
+            ratings[tconst] = (float(average), int(votes))
+
+    return ratings
+
+
+# =====================================================
+# PARSING (runs in worker processes)
+# =====================================================
+def parse_basics_chunk(lines, title_types=TITLE_TYPES):
+    """
+    Parse title.basics lines into
+    (imdb_id, title, release_date, runtime, genre_names) tuples
+    """
+    rows = []
+
+    for line in lines:
+        fields = line.rstrip("\n").split("\t")
+        if len(fields) < 9 or fields[1] not in title_types:
+            continue
+
+        tconst, _, title, _, _, start_year, _, runtime, genres = fields[:9]
+
+        rows.append((
+            tconst,
+            title[:255],
+            date(int(start_year), 1, 1) if start_year != NULL else None,
+            int(runtime) if runtime != NULL else 0,
+            tuple(genres.split(",")) if genres != NULL else (),
+        ))
+
+    return rows
+
+
+# =====================================================
+# IMPORTER
+# =====================================================
+class IMDBDatasetImporter:
+    """
+    Streams title.basics, parses it in a process pool, joins
+    title.ratings by tconst and upserts movies in large batches
+    """
+
+    def __init__(self, basics_path, ratings_path=None, batch_size=5000,
+                 workers=None, title_types=TITLE_TYPES, log=print):
+        self.basics_path = basics_path
+        self.ratings_path = ratings_path
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.title_types = tuple(title_types)
+        self.log = log
+
+        self.genre_ids = {}
+
+    def run(self):
+
+        started = time.perf_counter()
+
+        ratings = {}
+        if self.ratings_path:
+            self.log("Loading ratings...")
+            ratings = read_ratings(self.ratings_path)
+            self.log(f"Loaded {len(ratings)} ratings")
+
+        self.genre_ids = dict(Genre.objects.values_list("name", "id"))
+
+        rows = 0
+        totals = {"created": 0, "updated": 0, "unchanged": 0}
+
+        for parsed in self._parse_in_pool():
+            stats = self._upsert(parsed, ratings)
+            rows += len(parsed)
+
+            for name, count in stats.items():
+                totals[name] += count
+
+            elapsed = time.perf_counter() - started
+            self.log(f"Imported {rows} movies ({rows / elapsed:.0f} rows/s)")
+
+        elapsed = time.perf_counter() - started
+
+        self.log("IMDb dataset import finished ✅")
+
+        return {
+            "rows": rows,
+            **totals,
+            "seconds": round(elapsed, 2),
+            "rows_per_second": round(rows / elapsed) if elapsed else 0,
+        }
+
+    def _parse_in_pool(self):
+        """
+        Yield parsed batches in file order while keeping at most
+        2 * workers chunks in flight, so memory stays bounded
+        """
+        # Forked workers must not share the parent's DB sockets
+        connections.close_all()
+
+        chunks = iter_line_chunks(self.basics_path, self.batch_size)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+
+            for chunk in chunks:
+                pending.append(executor.submit(parse_basics_chunk, chunk, self.title_types))
+
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def _upsert(self, parsed, ratings):
+
+        if not parsed:
+            return {}
+
+        rows = []
+        for imdb_id, title, release_date, runtime, _ in parsed:
+            vote_average, vote_count = ratings.get(imdb_id, (0.0, 0))
+            rows.append({
+                "imdb_id": imdb_id,
+                "title": title,
+                "release_date": release_date,
+                "runtime": runtime,
+                "vote_average": vote_average,
+                "vote_count": vote_count,
+            })
+
+        movie_ids, stats = upsert_movies(rows, key="imdb_id", batch_size=self.batch_size)
+
+        link_genres(
+            {movie_ids[row[0]]: row[4] for row in parsed if row[4]},
+            known=self.genre_ids,
+            batch_size=self.batch_size,
+        )
+
+        return stats
@@ -1,5 +1,20 @@
 import requests
-from movies.models import Movie, Genre
+from movies.importers.upsert import link_genres, upsert_movies
+
+
+def imdb_title_to_row(item):
+    """Map an imdbapi.dev title to an upsert row"""
+    rating = item.get("rating") or {}
+    start_year = item.get("startYear")
+
+    return {
+        "imdb_id": item["id"],
+        "title": item.get("primaryTitle", "Unknown")[:255],
+        "release_date": f"{start_year}-01-01" if start_year else None,
+        "vote_average": rating.get("aggregateRating") or 0,
+        "vote_count": rating.get("voteCount") or 0,
+        "runtime": int(item.get("runtimeSeconds") or 0) // 60,
+    }
 
 
 class IMDBImporter:
@@ -20,22 +35,31 @@ class IMDBImporter:
 
         print(f"Found {len(titles)} movies")
 
+        rows = []
+        genres = {}
+
         for item in titles:
 
-            movie, created = Movie.objects.get_or_create(
-                title=item.get("primaryTitle", "Unknown"),
-                defaults={
-                    "overview": "",
-                    "release_date": "2024-01-01",
-                    "vote_average": item.get("rating", {}).get("aggregateRating", 0),
-                    "vote_count": 0,
-                    "runtime": int(item.get("runtimeSeconds", 0)) // 60,
-                }
-            )
-
-            # Genres
-            for g in item.get("genres", []):
-                genre, _ = Genre.objects.get_or_create(name=g)
-                movie.genres.add(genre)
-
-        print("IMDb Import Finished ✅")
\ No newline at end of file
+            # imdb_id is the natural key; titles are not unique
+            imdb_id = item.get("id")
+            if not imdb_id:
+                continue
+
+            rows.append(imdb_title_to_row(item))
+            genres[imdb_id] = item.get("genres", [])
+
+        movie_ids, stats = upsert_movies(rows, key="imdb_id")
+
+        # Genres
+        link_genres({
+            movie_ids[imdb_id]: names
+            for imdb_id, names in genres.items()
+            if names
+        })
+
+        print(
+            f"IMDb Import Finished ✅ "
+            f"({stats['created']} created, {stats['updated']} updated, {stats['unchanged']} unchanged)"
+        )
+
+        return stats
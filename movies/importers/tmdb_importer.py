@@ -0,0 +1,13 @@
+def tmdb_details_to_row(tmdb_id, data):
+    """Map TMDBService.get_movie_details() output to an upsert row"""
+    return {
+        "tmdb_id": tmdb_id,
+        "title": data["title"],
+        "overview": data.get("overview", ""),
+        "release_date": data.get("release_date"),
+        "vote_average": data.get("vote_average", 0),
+        "vote_count": data.get("vote_count", 0),
+        "runtime": data.get("runtime", 0),
+        "poster_path": data.get("poster_path", ""),
+        "backdrop_path": data.get("backdrop_path", ""),
+    }
@@ -0,0 +1,157 @@
+"""
+Importer Upserts
+Insert-or-update movies by external id, skipping unchanged rows
+"""
+
+import hashlib
+import json
+
+from django.db import connection, transaction
+
+from movies.models import Movie, Genre
+from movies.services import catalog_stats, change_feed
+from movies.utils.cache_manager import genre_cache, movie_cache
+
+
+# =====================================================
+# CONTENT HASH
+# =====================================================
+def content_hash(row, key):
+    """Stable hash of every imported value except the natural key"""
+    values = sorted((name, value) for name, value in row.items() if name != key)
+    encoded = json.dumps(values, default=str, ensure_ascii=False)
+    return hashlib.md5(encoded.encode("utf-8")).hexdigest()
+
+
+# =====================================================
+# MOVIES
+# =====================================================
+def upsert_movies(rows, key="imdb_id", batch_size=1000):
+    """
+    Upsert movie dicts keyed on `key` ("imdb_id" or "tmdb_id").
+
+    Rows whose content hash matches the stored one are skipped, so a
+    re-import only writes the movies that actually changed. The write is
+    a native INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE.
+
+    Returns ({key value: movie id}, {"created", "updated", "unchanged"}).
+    """
+    rows = list({row[key]: row for row in rows}.values())
+    keys = [row[key] for row in rows]
+
+    stored = {
+        value: (movie_id, digest)
+        for value, movie_id, digest in Movie.objects.filter(
+            **{f"{key}__in": keys}
+        ).values_list(key, "id", "content_hash")
+    }
+
+    changed = {}
+    changed_keys = []
+    stats = {"created": 0, "updated": 0, "unchanged": 0}
+
+    for row in rows:
+        digest = content_hash(row, key)
+
+        if stored.get(row[key], (None, None))[1] == digest:
+            stats["unchanged"] += 1
+            continue
+
+        stats["updated" if row[key] in stored else "created"] += 1
+        changed_keys.append(row[key])
+
+        # One bulk statement per field set, since update_fields is per call
+        fields = tuple(sorted(name for name in row if name != key))
+        changed.setdefault(fields, []).append(Movie(content_hash=digest, **row))
+
+    unique_fields = None
+    if connection.features.supports_update_conflicts_with_target:
+        unique_fields = [key]
+
+    # bulk_create sends no signals, so diff the statistics around the write
+    before = catalog_stats.load_states(
+        [stored[value][0] for value in changed_keys if value in stored]
+    )
+
+    with transaction.atomic():
+        for fields, movies in changed.items():
+            Movie.objects.bulk_create(
+                movies,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=[*fields, "content_hash", "updated_at"],
+            )
+
+        # Upserts do not return ids on every backend, so look them up
+        movie_ids = dict(
+            Movie.objects.filter(**{f"{key}__in": keys}).values_list(key, "id")
+        )
+        change_feed.record_movies(change_feed.UPSERT, [movie_ids[value] for value in changed_keys])
+
+    after = catalog_stats.load_states(
+        [movie_ids[value] for value in changed_keys if value in movie_ids]
+    )
+    catalog_stats.add_deltas(catalog_stats.states_delta(before, after))
+    movie_cache.invalidate(after)
+
+    return movie_ids, stats
+
+
+# =====================================================
+# GENRES
+# =====================================================
+def resolve_genre_ids(names, known=None):
+    """Map genre names to ids, creating missing genres in bulk"""
+    known = known if known is not None else {}
+    missing = set(names) - known.keys()
+
+    if missing:
+        known.update(Genre.objects.filter(name__in=missing).values_list("name", "id"))
+        missing -= known.keys()
+
+    if missing:
+        with transaction.atomic():
+            Genre.objects.bulk_create(
+                [Genre(name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+            created = dict(Genre.objects.filter(name__in=missing).values_list("name", "id"))
+            change_feed.record(change_feed.GENRE, change_feed.UPSERT, [(genre_id, None, None) for genre_id in created.values()])
+
+        # bulk_create sends no signals
+        genre_cache.invalidate()
+        known.update(created)
+
+    return known
+
+
+def link_genres(movie_genres, known=None, batch_size=1000):
+    """Add genre links from {movie id: [genre name, ...]}; existing links are kept"""
+    known = resolve_genre_ids(
+        {name for names in movie_genres.values() for name in names},
+        known,
+    )
+
+    Through = Movie.genres.through
+    existing = set(
+        Through.objects.filter(movie_id__in=list(movie_genres)).values_list("movie_id", "genre_id")
+    )
+    pairs = {
+        (movie_id, known[name])
+        for movie_id, names in movie_genres.items()
+        for name in names
+    } - existing
+
+    with transaction.atomic():
+        Through.objects.bulk_create(
+            [Through(movie_id=movie_id, genre_id=genre_id) for movie_id, genre_id in pairs],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        change_feed.record_movies(change_feed.UPSERT, sorted({movie_id for movie_id, _ in pairs}))
+
+    catalog_stats.genre_links_changed(pairs, 1)
+    movie_cache.invalidate({movie_id for movie_id, _ in pairs})
+
+    return known
@@ -0,0 +1,274 @@
+"""
+HTTP load test
+Run with: python manage.py loadtest --settings=movie_api.settings_loadtest
+Starts the app under a real WSGI or ASGI server in separate processes and
+replays a mix of API calls with JWT tokens at rising concurrency
+"""
+
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from importlib.util import find_spec
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .benchmarks import GENRE_NAMES, seed_catalog
+from .models import Movie, Review, Watchlist
+
+
+# (call, weight): browsing dominates, writes are a steady trickle
+SCENARIO = [
+    ("list", 25),
+    ("search", 15),
+    ("detail", 35),
+    ("review", 10),
+    ("watchlist", 15),
+]
+
+
+# =====================================================
+# DATA
+# =====================================================
+def prepare(movies, users):
+    """Migrate and seed the database; returns (movie ids, user ids, tokens)"""
+    if connection.vendor == "sqlite":
+        Path(connection.settings_dict["NAME"]).parent.mkdir(parents=True, exist_ok=True)
+
+    call_command("migrate", verbosity=0)
+
+    if connection.vendor == "sqlite":
+        # Readers do not block on the writer (persists in the file)
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode=WAL")
+
+    existing = Movie.objects.count()
+    if existing < movies:
+        seed_catalog(movies - existing, seed=existing)
+
+    accounts = [User.objects.get_or_create(username=f"loadtest-{i}")[0] for i in range(users)]
+
+    # Every run starts without the load test's own writes
+    Review.objects.filter(user__in=accounts).delete()
+    Watchlist.objects.filter(user__in=accounts).delete()
+
+    movie_ids = list(Movie.objects.order_by("id").values_list("id", flat=True)[:movies])
+    return movie_ids, [user.id for user in accounts], [str(AccessToken.for_user(user)) for user in accounts]
+
+
+# =====================================================
+# SERVER
+# =====================================================
+def server_command(kind, port, workers, threads):
+    """Command line for a local server, from what is installed"""
+    python = sys.executable
+
+    if kind == "wsgi":
+        if find_spec("gunicorn"):
+            return [
+                python, "-m", "gunicorn", "movie_api.wsgi:application",
+                "--bind", f"127.0.0.1:{port}",
+                "--workers", str(workers), "--threads", str(threads),
+                "--log-level", "warning",
+            ], "gunicorn"
+        # One process, a thread per request
+        return [python, "manage.py", "runserver", f"127.0.0.1:{port}", "--noreload"], "runserver"
+
+    if find_spec("uvicorn"):
+        return [
+            python, "-m", "uvicorn", "movie_api.asgi:application",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ], "uvicorn"
+    if find_spec("daphne"):
+        return [python, "-m", "daphne", "-b", "127.0.0.1", "-p", str(port), "movie_api.asgi:application"], "daphne"
+    return None, None
+
+
+class Server:
+    """A server subprocess on the current settings module"""
+
+    def __init__(self, command, port, threads):
+        self.command = command
+        self.port = port
+
+        self.env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "movie_api.settings"),
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(settings.BASE_DIR), os.environ.get("PYTHONPATH")])),
+            # Size of the thread pool running sync views under ASGI
+            "ASGI_THREADS": str(threads),
+        }
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            self.command,
+            cwd=settings.BASE_DIR,
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        self.wait_until_ready()
+        return self
+
+    def wait_until_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited: {self.process.stderr.read().decode()[-2000:]}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+                conn.request("GET", "/api/v1/genres/")
+                conn.getresponse().read()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError(f"Server did not answer on port {self.port} within {timeout}s")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+# =====================================================
+# LOAD
+# =====================================================
+class Session:
+    """One simulated client: a keep-alive connection, a user and its own writes"""
+
+    def __init__(self, port, movie_ids, token, offset, seed=None):
+        self.port = port
+        self.movie_ids = movie_ids
+        self.headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        self.rng = random.Random(seed)
+        # Each user reviews movies in order, so it never reviews one twice
+        self.next_review = offset
+        self.watchlist_step = 0
+        self.connect()
+
+    def connect(self):
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        try:
+            self.conn.connect()
+            # Small requests go out at once instead of waiting on Nagle
+            self.conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            # Counted as an error on the first request
+            self.conn.close()
+
+    def build(self, call):
+        rng = self.rng
+
+        if call == "list":
+            return "GET", f"/api/v1/movies/?year={rng.randrange(1950, 2024)}&fields=id,title,vote_average,genres", None
+        if call == "search":
+            return "GET", f"/api/v1/movies/search/?q=Movie {rng.randrange(100)}&genre={rng.choice(GENRE_NAMES)}", None
+        if call == "detail":
+            return "GET", f"/api/v1/movies/{rng.choice(self.movie_ids)}/", None
+        if call == "review":
+            movie_id = self.movie_ids[self.next_review % len(self.movie_ids)]
+            self.next_review += 1
+            body = {"rating": rng.randint(1, 10), "comment": "Load test review"}
+            return "POST", f"/api/v1/movies/{movie_id}/reviews/", json.dumps(body)
+
+        # Watchlist: add a movie, read the list, remove it again
+        step, self.watchlist_step = self.watchlist_step % 3, self.watchlist_step + 1
+        if step == 0:
+            self.watchlist_movie = rng.choice(self.movie_ids)
+            return "POST", "/api/v1/watchlist/", json.dumps({"movie_id": self.watchlist_movie})
+        if step == 1:
+            return "GET", "/api/v1/watchlist/", None
+        return "DELETE", f"/api/v1/watchlist/{self.watchlist_movie}/", None
+
+    def run(self, deadline, results):
+        calls, weights = zip(*SCENARIO)
+
+        while time.perf_counter() < deadline:
+            call = self.rng.choices(calls, weights)[0]
+            method, path, body = self.build(call)
+
+            started = time.perf_counter()
+            try:
+                self.conn.request(method, path.replace(" ", "%20"), body, self.headers)
+                response = self.conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                status = 0
+                self.conn.close()
+                self.connect()
+
+            results.append((call, status, time.perf_counter() - started, started))
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(results, seconds):
+    latencies = sorted(row[2] for row in results)
+    errors = sum(1 for row in results if row[1] == 0 or row[1] >= 400)
+    return {
+        "requests": len(results),
+        "rps": len(results) / seconds if seconds else 0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+        "error_rate": errors / len(results) if results else 0,
+    }
+
+
+def run_level(port, concurrency, duration, movie_ids, tokens, offsets, warmup=0):
+    """
+    `concurrency` closed-loop clients for `duration` seconds. `offsets`
+    holds each user's review cursor and is advanced for the next run.
+    Returns the overall summary and one per call type.
+    """
+    sessions = [
+        Session(port, movie_ids, tokens[index % len(tokens)], offsets[index % len(tokens)])
+        for index in range(concurrency)
+    ]
+    results = [[] for _ in sessions]
+
+    started = time.perf_counter()
+    deadline = started + warmup + duration
+    threads = [
+        threading.Thread(target=session.run, args=(deadline, result))
+        for session, result in zip(sessions, results)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Keep the review cursors for the next level
+    for index, session in enumerate(sessions):
+        offsets[index % len(tokens)] = max(offsets[index % len(tokens)], session.next_review)
+
+    # Drop the warmup: only requests that started after it count
+    measured = [row for rows in results for row in rows if row[3] >= started + warmup]
+
+    by_call = {}
+    for row in measured:
+        by_call.setdefault(row[0], []).append(row)
+
+    return (
+        summarize(measured, duration),
+        {call: summarize(rows, duration) for call, rows in sorted(by_call.items())},
+    )
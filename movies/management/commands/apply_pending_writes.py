@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from movies.services.write_behind import apply_pending_writes
+
+
+class Command(BaseCommand):
+    help = "Apply queued write-behind reviews and watchlist adds in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--follow", action="store_true", help="Keep polling the queue")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls")
+
+    def handle(self, *args, **options):
+        while True:
+            totals = apply_pending_writes(batch_size=options["batch_size"])
+
+            if totals["batches"] or not options["follow"]:
+                self.stdout.write(
+                    f"{totals['applied']} applied, {totals['skipped']} skipped "
+                    f"in {totals['batches']} batches"
+                )
+
+            if not options["follow"]:
+                break
+
+            time.sleep(options["interval"])
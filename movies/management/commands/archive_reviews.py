@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from movies.services import review_archive
+
+
+class Command(BaseCommand):
+    help = "Move reviews older than REVIEW_ARCHIVE_AFTER_DAYS to the archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=None, help="Default: REVIEW_ARCHIVE_AFTER_DAYS")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Reviews moved per transaction")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        moved = review_archive.archive_reviews(
+            older_than_days=options["older_than_days"],
+            batch_size=options["batch_size"],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} reviews in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from movies.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = "Run performance benchmarks on a seeded catalog (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("suites", nargs="*", help=f"Any of: {', '.join(BENCHMARKS)}")
+        parser.add_argument("--rows", type=int, default=2000)
+        parser.add_argument("--output", help="Also append the results to this file")
+
+    def handle(self, *args, **options):
+        suites = options["suites"] or list(BENCHMARKS)
+
+        unknown = set(suites) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+        lines = []
+        for name in suites:
+            with transaction.atomic():
+                results = BENCHMARKS[name](options["rows"])
+                transaction.set_rollback(True)
+
+            for label, rows, seconds in results:
+                rate = rows / seconds if seconds else 0
+                lines.append(
+                    f"{name:<12} {label:<40} {rows:>8} rows {seconds:>9.3f}s {rate:>12,.0f} rows/s"
+                )
+                self.stdout.write(lines[-1])
+
+        if options["output"]:
+            with open(options["output"], "a") as output:
+                output.write("\n".join(lines) + "\n")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from movies.services import change_feed
+
+
+class Command(BaseCommand):
+    help = "Drop superseded change feed events and those older than the retention"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retention-days", type=int, default=None, help="Default: CHANGE_FEED_RETENTION_DAYS")
+
+    def handle(self, *args, **options):
+        run = change_feed.compact(retention_days=options["retention_days"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {run.superseded} superseded and {run.expired} expired events "
+            f"(watermark {run.watermark}, feed head {change_feed.latest_seq()})"
+        ))
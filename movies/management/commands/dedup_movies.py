@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from movies.services import dedup
+
+
+class Command(BaseCommand):
+    help = "Find movies imported twice (IMDb / TMDB) and merge them into one row"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=float, default=None, help="Minimum title similarity (0-1)")
+        parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: CPU count)")
+        parser.add_argument("--dry-run", action="store_true", help="Only report the clusters")
+        parser.add_argument("--show", type=int, default=20, help="Clusters to print")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        records = dedup.load_records()
+        loaded = time.perf_counter()
+
+        pairs = dedup.find_duplicates(records, threshold=options["threshold"], workers=options["workers"])
+        clusters = dedup.cluster(pairs, records)
+        scored = time.perf_counter()
+
+        self.stdout.write(
+            f"{len(records)} movies loaded in {loaded - started:.1f}s, "
+            f"{len(pairs)} matching pairs / {len(clusters)} clusters in {scored - loaded:.1f}s"
+        )
+
+        titles = {record.id: record.title for record in records}
+        for survivor, duplicates in list(clusters.items())[:options["show"]]:
+            self.stdout.write(
+                f"  {survivor} {titles[survivor]!r} <- "
+                + ", ".join(f"{duplicate} {titles[duplicate]!r}" for duplicate in duplicates)
+            )
+
+        if options["dry_run"]:
+            return
+
+        stats = dedup.merge(clusters)
+        self.stdout.write(self.style.SUCCESS(
+            f"Merged {stats['merged']} duplicates into {len(clusters)} movies "
+            f"({stats['conflicts']} conflicting rows dropped) in {time.perf_counter() - scored:.1f}s"
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from movies.importers.imdb_dataset_importer import IMDBDatasetImporter, TITLE_TYPES
+
+
+class Command(BaseCommand):
+    help = "Bulk import movies from IMDb title.basics / title.ratings TSV dumps"
+
+    def add_arguments(self, parser):
+        parser.add_argument("basics", help="Path to title.basics.tsv(.gz)")
+        parser.add_argument("--ratings", help="Path to title.ratings.tsv(.gz)")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument(
+            "--title-types",
+            default=",".join(TITLE_TYPES),
+            help="Comma separated titleType values to import",
+        )
+
+    def handle(self, *args, **options):
+        importer = IMDBDatasetImporter(
+            options["basics"],
+            ratings_path=options["ratings"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            title_types=options["title_types"].split(","),
+            log=self.stdout.write,
+        )
+        stats = importer.run()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['rows']} movies in {stats['seconds']}s ({stats['rows_per_second']} rows/s): "
+            f"{stats['created']} created, {stats['updated']} updated, {stats['unchanged']} unchanged"
+        ))
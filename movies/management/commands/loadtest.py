@@ -0,0 +1,82 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from movies import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the API under a local WSGI and/or ASGI server at rising concurrency. "
+        "Use --settings=movie_api.settings_loadtest for the seeded SQLite stand-in"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--server", choices=["wsgi", "asgi", "both"], default="both")
+        parser.add_argument("--workers", type=int, default=2, help="Server processes")
+        parser.add_argument("--threads", type=int, default=4, help="Threads per process (sync views under ASGI too)")
+        parser.add_argument("--concurrency", default="1,4,16,32", help="Comma separated client counts")
+        parser.add_argument("--duration", type=float, default=10, help="Measured seconds per level")
+        parser.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds before each level")
+        parser.add_argument("--movies", type=int, default=2000, help="Catalog size to seed")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--output", help="Also write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",")]
+        except ValueError:
+            raise CommandError("--concurrency must be a comma separated list of integers")
+
+        if settings.DEBUG:
+            self.stdout.write(self.style.WARNING(
+                "DEBUG is on, which slows every request; use --settings=movie_api.settings_loadtest"
+            ))
+
+        movie_ids, _, tokens = loadtest.prepare(options["movies"], users=max(levels))
+        self.stdout.write(f"{len(movie_ids)} movies, {len(tokens)} users")
+
+        kinds = ["wsgi", "asgi"] if options["server"] == "both" else [options["server"]]
+        report = []
+        # Review cursors per user carry over, so no movie is reviewed twice
+        offsets = [0] * len(tokens)
+
+        for kind in kinds:
+            command, name = loadtest.server_command(kind, options["port"], options["workers"], options["threads"])
+            if command is None:
+                self.stdout.write(self.style.WARNING(f"Skipping {kind}: install uvicorn or daphne"))
+                continue
+            if name == "runserver":
+                self.stdout.write(self.style.WARNING("gunicorn is not installed: WSGI runs on runserver (one process)"))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{kind} ({name}, {options['workers']} workers x {options['threads']} threads)"
+            ))
+            self.stdout.write(
+                f"{'clients':>8} {'req/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'errors':>8}"
+            )
+
+            with loadtest.Server(command, options["port"], options["threads"]):
+                for level in levels:
+                    overall, by_call = loadtest.run_level(
+                        options["port"], level, options["duration"], movie_ids, tokens, offsets,
+                        warmup=options["warmup"],
+                    )
+                    self.stdout.write(
+                        f"{level:>8} {overall['rps']:>9.1f} {overall['p50_ms']:>9.1f} "
+                        f"{overall['p90_ms']:>9.1f} {overall['p99_ms']:>9.1f} {overall['error_rate']:>8.1%}"
+                    )
+                    report.append({
+                        "server": kind,
+                        "runner": name,
+                        "workers": options["workers"],
+                        "threads": options["threads"],
+                        "concurrency": level,
+                        **overall,
+                        "calls": by_call,
+                    })
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from movies.services import image_pipeline
+
+
+class Command(BaseCommand):
+    help = "Fetch poster / backdrop sources and render their thumbnails, then apply the disk quota"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+        parser.add_argument("--fetch-workers", type=int, default=8, help="Concurrent downloads")
+        parser.add_argument("--quota-only", action="store_true", help="Only evict files over the quota")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        if options["quota_only"]:
+            removed, used = image_pipeline.enforce_quota()
+            self.stdout.write(self.style.SUCCESS(f"Evicted {removed} files, {used} bytes in use"))
+            return
+
+        if not image_pipeline.available():
+            self.stdout.write(self.style.WARNING("Pillow is not installed: fetching sources only"))
+
+        stats = image_pipeline.process_catalog(
+            workers=options["workers"],
+            fetch_workers=options["fetch_workers"],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['sources']} sources, {stats['failed']} failed, "
+            f"{stats['rendered']} thumbnails rendered, {stats['existing']} up to date, "
+            f"{stats['evicted']} evicted, {stats['bytes']} bytes in use "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
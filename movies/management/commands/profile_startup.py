@@ -0,0 +1,48 @@
+import statistics
+
+from django.core.management.base import BaseCommand
+
+from movies.utils.startup import profile_startup
+
+
+PHASES = ("wall", "settings", "apps_ready", "urls")
+
+
+class Command(BaseCommand):
+    help = "Profile a cold Django start: import time per module and setup phases"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3, help="Cold starts to take the median of")
+        parser.add_argument("--top", type=int, default=20, help="Packages / modules to list")
+        parser.add_argument("--output", help="Also append the phase timings to this file")
+
+    def handle(self, *args, **options):
+        # Phase timings without the importtime overhead
+        runs = [profile_startup(importtime=False) for _ in range(options["repeat"])]
+        phases = {name: statistics.median(run[name] for run in runs) for name in PHASES}
+
+        profile = profile_startup()
+        top = options["top"]
+
+        lines = [f"{name:<12} {seconds * 1000:>9.1f} ms" for name, seconds in phases.items()]
+        lines.append(f"{'modules':<12} {len(profile['modules']):>9}")
+
+        self.stdout.write("Startup (median of %d cold starts)" % options["repeat"])
+        for line in lines:
+            self.stdout.write("  " + line)
+
+        self.stdout.write(f"\nSlowest packages (self import time)")
+        packages = sorted(profile["packages"].items(), key=lambda item: -item[1])
+        for name, self_us in packages[:top]:
+            self.stdout.write(f"  {name:<40} {self_us / 1000:>9.1f} ms")
+
+        self.stdout.write(f"\nSlowest modules (cumulative import time)")
+        modules = sorted(profile["modules"].items(), key=lambda item: -item[1][1])
+        for name, (self_us, cumulative_us) in modules[:top]:
+            self.stdout.write(
+                f"  {name:<40} {cumulative_us / 1000:>9.1f} ms  (self {self_us / 1000:.1f} ms)"
+            )
+
+        if options["output"]:
+            with open(options["output"], "a") as output:
+                output.write("\n".join(f"startup {line}" for line in lines) + "\n")
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from movies.services import catalog_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the per genre / year / runtime statistics and rating histograms"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        rows = catalog_stats.rebuild()
+        histogram_rows = catalog_stats.rebuild_rating_counts()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows} statistics rows and {histogram_rows} rating counts "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from movies.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = "Show the slow query log (SLOW_QUERY_LOG_ENABLED) aggregated per statement and view"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--order", choices=["total", "max", "count"], default="total")
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--view", help="Only entries whose view contains this text")
+        parser.add_argument("--plans", action="store_true", help="Print the captured EXPLAIN output")
+        parser.add_argument("--reset", action="store_true", help="Delete all entries")
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} entries"))
+            return
+
+        order = {"total": "-total_ms", "max": "-max_ms", "count": "-count"}[options["order"]]
+        entries = SlowQuery.objects.order_by(order)
+        if options["view"]:
+            entries = entries.filter(view__icontains=options["view"])
+
+        for entry in entries[:options["limit"]]:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{entry.count:>6}x  total {entry.total_ms:>10.1f} ms  max {entry.max_ms:>8.1f} ms  "
+                f"avg {entry.average_ms:>8.1f} ms  {entry.view}"
+            ))
+            self.stdout.write(f"  {entry.sql}")
+            if options["plans"] and entry.plan:
+                for line in entry.plan.splitlines():
+                    self.stdout.write(f"    {line}")
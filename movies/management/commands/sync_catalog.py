@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from movies.services.catalog_sync import CatalogSync
+
+
+class Command(BaseCommand):
+    help = "Refresh stale movies from TMDB / IMDb within a time and request budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--time-budget", type=int, help="Seconds per run")
+        parser.add_argument("--request-budget", type=int, help="Upstream requests per run")
+        parser.add_argument("--min-age-hours", type=int, help="Only movies not synced for this long")
+
+    def handle(self, *args, **options):
+        run = CatalogSync(
+            time_budget=options["time_budget"],
+            request_budget=options["request_budget"],
+            min_age_hours=options["min_age_hours"],
+        ).run()
+
+        self.stdout.write(
+            f"{run.status}: {run.checked} checked, {run.updated} updated, "
+            f"{run.unchanged} unchanged, {run.failed} failed, {run.requests} requests"
+        )
+        if run.message:
+            self.stdout.write(run.message)
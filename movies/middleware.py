@@ -0,0 +1,222 @@
+"""
+Middleware for the Movie Database API
+"""
+
+import zlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+# Already compressed payloads are passed through untouched
+INCOMPRESSIBLE_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "application/gzip",
+    "application/zip",
+    "application/x-brotli",
+)
+
+# HTML pages (admin, browsable API) carry CSRF tokens next to reflected
+# input; compressing them would expose the tokens to BREACH
+UNSAFE_TYPES = (
+    "text/html",
+)
+
+
+def accepted_encodings(header):
+    """Parse Accept-Encoding into {coding: q}"""
+    encodings = {}
+
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+
+        if coding:
+            encodings[coding.strip().lower()] = quality
+
+    return encodings
+
+
+# =====================================================
+# COMPRESSORS
+# =====================================================
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data) + self.compressor.flush()
+
+    def process(self, chunk):
+        # Sync flush so every streamed chunk reaches the client immediately
+        return self.compressor.compress(chunk) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.compressor.process(data) + self.compressor.finish()
+
+    def process(self, chunk):
+        return self.compressor.process(chunk) + self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+# =====================================================
+# COMPRESSION MIDDLEWARE
+# =====================================================
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Negotiated brotli / gzip response compression.
+
+    Like django's GZipMiddleware, but with a configurable size threshold
+    and level, brotli when the `brotli` package is installed, and
+    streamed responses compressed chunk by chunk. HTML is never
+    compressed (BREACH).
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, "RESPONSE_COMPRESSION_MIN_SIZE", 1024)
+        self.gzip_level = getattr(settings, "RESPONSE_COMPRESSION_GZIP_LEVEL", 6)
+        self.brotli_quality = getattr(settings, "RESPONSE_COMPRESSION_BROTLI_QUALITY", 5)
+
+    def get_encoder(self, request):
+        encodings = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+
+        br = encodings.get("br", 0) if brotli is not None else 0
+        gzip = encodings.get("gzip", 0)
+
+        # Highest client preference wins; brotli on a tie
+        if br > 0 and br >= gzip:
+            return BrotliEncoder(self.brotli_quality)
+        if gzip > 0:
+            return GzipEncoder(self.gzip_level)
+        return None
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        if response.has_header("Content-Encoding"):
+            return response
+
+        content_type = response.get("Content-Type", "")
+        if content_type.startswith(INCOMPRESSIBLE_TYPES + UNSAFE_TYPES):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoder = self.get_encoder(request)
+        if encoder is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+
+            response.streaming_content = self.compress_stream(encoder, response.streaming_content)
+            # The compressed size is unknown until it has been streamed
+            del response.headers["Content-Length"]
+        else:
+            compressed = encoder.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # Compressed bytes differ, so a strong ETag must become weak
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoder.name
+
+        return response
+
+    @staticmethod
+    def compress_stream(encoder, chunks):
+        for chunk in chunks:
+            compressed = encoder.process(chunk)
+            if compressed:
+                yield compressed
+        yield encoder.finish()
+
+
+# =====================================================
+# RATE LIMIT HEADERS
+# =====================================================
+class RateLimitHeadersMiddleware(MiddlewareMixin):
+    """Adds RateLimit-* headers recorded by the token bucket throttles"""
+
+    def process_response(self, request, response):
+        ratelimit = getattr(request, "ratelimit", None)
+
+        if ratelimit is not None:
+            response.headers["RateLimit-Limit"] = str(ratelimit["limit"])
+            response.headers["RateLimit-Remaining"] = str(ratelimit["remaining"])
+            response.headers["RateLimit-Reset"] = str(ratelimit["reset"])
+
+        return response
+
+
+# =====================================================
+# SLOW QUERY LOG
+# =====================================================
+class SlowQueryMiddleware:
+    """
+    Times every query of the request (all databases) and records the
+    slow ones with the view they came from. Off unless
+    SLOW_QUERY_LOG_ENABLED; queries run while a streamed body is being
+    sent are not seen.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SLOW_QUERY_LOG_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold_ms = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 200)
+
+    def __call__(self, request):
+        from .utils.slow_queries import QueryRecorder, record
+
+        recorder = QueryRecorder(self.threshold_ms)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        if recorder.slow:
+            match = getattr(request, "resolver_match", None)
+            view = f"{request.method} {match.view_name if match else request.path}"
+            record(view, recorder.slow)
+
+        return response
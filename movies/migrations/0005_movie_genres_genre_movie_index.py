@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+INDEX = models.Index(fields=['genre', 'movie'], name='movie_genres_genre_movie_idx')
+
+
+def add_index(apps, schema_editor):
+    Through = apps.get_model('movies', 'Movie').genres.through
+    schema_editor.add_index(Through, INDEX)
+
+
+def remove_index(apps, schema_editor):
+    Through = apps.get_model('movies', 'Movie').genres.through
+    schema_editor.remove_index(Through, INDEX)
+
+
+class Migration(migrations.Migration):
+    """
+    Covering (genre_id, movie_id) index on the auto-created genre link
+    table, so genre filters resolve movie ids from the index alone
+    """
+
+    dependencies = [
+        ('movies', '0004_catalog_sync'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
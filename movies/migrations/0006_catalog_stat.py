@@ -0,0 +1,31 @@
+# Generated by Django 4.2.28 on 2026-10-19 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0005_movie_genres_genre_movie_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('genre', 'Genre'), ('year', 'Release year'), ('runtime', 'Runtime bucket')], max_length=10)),
+                ('key', models.IntegerField()),
+                ('movie_count', models.IntegerField(default=0)),
+                ('vote_average_sum', models.FloatField(default=0.0)),
+                ('runtime_sum', models.BigIntegerField(default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['dimension', 'key'],
+                'unique_together': {('dimension', 'key')},
+            },
+        ),
+    ]
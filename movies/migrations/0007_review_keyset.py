@@ -0,0 +1,38 @@
+# Generated by Django 4.2.28 on 2026-10-19 15:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_catalog_stat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieRatingCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['movie', 'rating'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['movie', 'created_at', 'id'], name='review_movie_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='movieratingcount',
+            name='movie',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_counts', to='movies.movie'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='movieratingcount',
+            unique_together={('movie', 'rating')},
+        ),
+    ]
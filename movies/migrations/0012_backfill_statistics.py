@@ -0,0 +1,104 @@
+from django.db import migrations
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import ExtractYear
+
+# Frozen copies of the catalog_stats rules: a migration must not import
+# the live models, which may have columns this schema does not have yet
+COUNTERS = ('movie_count', 'vote_average_sum', 'runtime_sum', 'review_count', 'rating_sum')
+RUNTIME_BUCKET = 30
+RUNTIME_LAST_BUCKET = 180
+
+
+def runtime_bucket(field):
+    whens = [
+        When(Q(**{f'{field}__gte': start, f'{field}__lt': start + RUNTIME_BUCKET}), then=Value(start))
+        for start in range(0, RUNTIME_LAST_BUCKET, RUNTIME_BUCKET)
+    ]
+    return Case(*whens, default=Value(RUNTIME_LAST_BUCKET), output_field=IntegerField())
+
+
+def backfill_stats(apps):
+    Movie = apps.get_model('movies', 'Movie')
+    CatalogStat = apps.get_model('movies', 'CatalogStat')
+    review_models = [apps.get_model('movies', name) for name in ('Review', 'ArchivedReview')]
+
+    movie_sums = {'movie_count': Count('id'), 'vote_average_sum': Sum('vote_average'), 'runtime_sum': Sum('runtime')}
+    review_sums = {'review_count': Count('id'), 'rating_sum': Sum('rating')}
+
+    movies = Movie.objects.order_by()
+    groups = [
+        ('genre', Movie.genres.through.objects.order_by().values(key=F('genre_id')).annotate(
+            movie_count=Count('id'),
+            vote_average_sum=Sum('movie__vote_average'),
+            runtime_sum=Sum('movie__runtime'),
+        )),
+        ('year', movies.filter(release_date__isnull=False)
+            .values(key=ExtractYear('release_date')).annotate(**movie_sums)),
+        ('runtime', movies.filter(runtime__gt=0)
+            .values(key=runtime_bucket('runtime')).annotate(**movie_sums)),
+    ]
+    for model in review_models:
+        reviews = model.objects.order_by()
+        groups += [
+            ('genre', reviews.filter(movie__genres__isnull=False)
+                .values(key=F('movie__genres')).annotate(**review_sums)),
+            ('year', reviews.filter(movie__release_date__isnull=False)
+                .values(key=ExtractYear('movie__release_date')).annotate(**review_sums)),
+            ('runtime', reviews.filter(movie__runtime__gt=0)
+                .values(key=runtime_bucket('movie__runtime')).annotate(**review_sums)),
+        ]
+
+    totals = {}
+    for dimension, rows in groups:
+        for row in rows:
+            counters = totals.setdefault((dimension, row.pop('key')), dict.fromkeys(COUNTERS, 0))
+            for name, value in row.items():
+                counters[name] += value or 0
+
+    CatalogStat.objects.all().delete()
+    CatalogStat.objects.bulk_create(
+        [CatalogStat(dimension=dimension, key=key, **counters) for (dimension, key), counters in sorted(totals.items())],
+        batch_size=1000,
+    )
+
+
+def backfill_rating_counts(apps):
+    MovieRatingCount = apps.get_model('movies', 'MovieRatingCount')
+
+    counts = {}
+    for name in ('Review', 'ArchivedReview'):
+        rows = (
+            apps.get_model('movies', name).objects.order_by()
+            .values_list('movie_id', 'rating')
+            .annotate(count=Count('id'))
+        )
+        for movie_id, rating, count in rows.iterator(chunk_size=5000):
+            counts[movie_id, rating] = counts.get((movie_id, rating), 0) + count
+
+    MovieRatingCount.objects.all().delete()
+    MovieRatingCount.objects.bulk_create(
+        [MovieRatingCount(movie_id=movie_id, rating=rating, count=count) for (movie_id, rating), count in counts.items()],
+        batch_size=5000,
+    )
+
+
+def backfill(apps, schema_editor):
+    backfill_stats(apps)
+    backfill_rating_counts(apps)
+
+
+class Migration(migrations.Migration):
+    """
+    Fill CatalogStat and MovieRatingCount from the existing movies and
+    reviews. Both tables were created empty, and review counts / average
+    ratings are read from MovieRatingCount only. Same totals as
+    catalog_stats.rebuild() and rebuild_rating_counts().
+    """
+
+    dependencies = [
+        ('movies', '0011_change_feed'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.28 on 2026-10-19 16:26
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def stamp_existing(apps, schema_editor):
+    # Events written so far keep their id as their position
+    ChangeEvent = apps.get_model('movies', 'ChangeEvent')
+    ChangeSequence = apps.get_model('movies', 'ChangeSequence')
+
+    ChangeEvent.objects.update(seq=F('id'))
+    last = ChangeEvent.objects.aggregate(value=Max('id'))['value'] or 0
+    ChangeSequence.objects.create(pk=1, last_seq=last)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0012_backfill_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_seq', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='changeevent',
+            name='change_event_entity_idx',
+        ),
+        migrations.AddField(
+            model_name='changeevent',
+            name='seq',
+            field=models.BigIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='changeevent',
+            index=models.Index(fields=['entity', 'entity_id', 'seq'], name='change_event_entity_seq_idx'),
+        ),
+        migrations.RunPython(stamp_existing, migrations.RunPython.noop),
+    ]
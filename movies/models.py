@@ -53,10 +53,16 @@ class Movie(models.Model):
     tmdb_id = models.IntegerField(unique=True, null=True, blank=True)
     imdb_id = models.CharField(max_length=20, unique=True, null=True, blank=True)
 
+    # Hash of the last imported content, lets re-imports skip unchanged rows
+    content_hash = models.CharField(max_length=32, blank=True, default="", editable=False)
+
     # System Fields
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Last time the scheduled catalog sync checked this movie upstream
+    last_synced_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
     def __str__(self):
         return self.title
 
@@ -100,6 +106,51 @@ class Review(models.Model):
     class Meta:
         ordering = ["-created_at"]
         unique_together = ["movie", "user"]
+        indexes = [
+            # Keyset pagination of a movie's reviews (newest first)
+            models.Index(fields=["movie", "created_at", "id"], name="review_movie_created_idx"),
+            # Oldest first for manage.py archive_reviews
+            models.Index(fields=["created_at", "id"], name="review_created_idx"),
+        ]
+
+
+class ArchivedReview(models.Model):
+    """
+    Reviews moved out of movies_review by `manage.py archive_reviews`,
+    so the hot table stays small. Rows are read-only and still count in
+    CatalogStat / MovieRatingCount.
+    """
+
+    # Same id as the Review it was moved from
+    id = models.BigIntegerField(primary_key=True)
+
+    movie = models.ForeignKey(
+        Movie,
+        on_delete=models.CASCADE,
+        related_name="archived_reviews"
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_reviews"
+    )
+
+    rating = models.PositiveSmallIntegerField()
+    comment = models.TextField(blank=True, null=True)
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user_id} - {self.movie_id} ({self.rating}/10, archived)"
+
+    class Meta:
+        ordering = ["-created_at"]
+        unique_together = ["movie", "user"]
+        indexes = [
+            models.Index(fields=["movie", "created_at", "id"], name="archived_review_movie_idx"),
+        ]
 
 
 # =====================================================
@@ -145,4 +196,268 @@ class Favorite(models.Model):
 
     class Meta:
         ordering = ["-added_at"]
-        unique_together = ["user", "movie"]
\ No newline at end of file
+        unique_together = ["user", "movie"]
+
+
+# =====================================================
+# CATALOG SYNC RUN
+# =====================================================
+class SyncRun(models.Model):
+
+    STATUS_RUNNING = "running"
+    STATUS_SUCCESS = "success"
+    STATUS_SKIPPED = "skipped"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCESS, "Success"),
+        (STATUS_SKIPPED, "Skipped"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+
+    checked = models.IntegerField(default=0)
+    updated = models.IntegerField(default=0)
+    unchanged = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    requests = models.IntegerField(default=0)
+
+    message = models.TextField(blank=True)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Sync {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+    class Meta:
+        ordering = ["-started_at"]
+
+
+# =====================================================
+# CATALOG STATISTICS (summary table)
+# =====================================================
+class CatalogStat(models.Model):
+    """
+    Running totals per genre / release year / runtime bucket.
+    Kept up to date incrementally by movies.services.catalog_stats
+    and rebuilt from scratch by `manage.py rebuild_stats`.
+    """
+
+    DIMENSION_GENRE = "genre"
+    DIMENSION_YEAR = "year"
+    DIMENSION_RUNTIME = "runtime"
+
+    DIMENSION_CHOICES = [
+        (DIMENSION_GENRE, "Genre"),
+        (DIMENSION_YEAR, "Release year"),
+        (DIMENSION_RUNTIME, "Runtime bucket"),
+    ]
+
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+
+    # Genre id, release year or runtime bucket start (minutes)
+    key = models.IntegerField()
+
+    movie_count = models.IntegerField(default=0)
+    vote_average_sum = models.FloatField(default=0.0)
+    runtime_sum = models.BigIntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.dimension}:{self.key}"
+
+    class Meta:
+        ordering = ["dimension", "key"]
+        unique_together = ["dimension", "key"]
+
+
+# =====================================================
+# RATING HISTOGRAM (per movie)
+# =====================================================
+class MovieRatingCount(models.Model):
+    """Number of reviews per rating value, maintained with CatalogStat"""
+
+    movie = models.ForeignKey(
+        Movie,
+        on_delete=models.CASCADE,
+        related_name="rating_counts"
+    )
+
+    rating = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.movie_id}: {self.rating} x{self.count}"
+
+    class Meta:
+        ordering = ["movie", "rating"]
+        unique_together = ["movie", "rating"]
+
+
+# =====================================================
+# WRITE-BEHIND QUEUE
+# =====================================================
+class PendingWrite(models.Model):
+    """
+    A validated, acknowledged write waiting for the write-behind worker
+    (manage.py apply_pending_writes). Rows are deleted once applied.
+    """
+
+    KIND_REVIEW = "review"
+    KIND_WATCHLIST = "watchlist"
+
+    KIND_CHOICES = [
+        (KIND_REVIEW, "Review"),
+        (KIND_WATCHLIST, "Watchlist add"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE)
+
+    # e.g. {"rating": 8, "comment": "..."} for reviews
+    payload = models.JSONField(default=dict, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind}: user {self.user_id} / movie {self.movie_id}"
+
+    class Meta:
+        ordering = ["id"]
+        # One queued write per user, movie and kind
+        unique_together = ["kind", "user", "movie"]
+
+
+# =====================================================
+# SLOW QUERY LOG
+# =====================================================
+class SlowQuery(models.Model):
+    """
+    Queries over SLOW_QUERY_THRESHOLD_MS, aggregated per normalized
+    statement and view (see movies.utils.slow_queries)
+    """
+
+    fingerprint = models.CharField(max_length=32)
+    view = models.CharField(max_length=200, blank=True, default="")
+
+    # Literals replaced by ?; `example` is one real statement with its params
+    sql = models.TextField()
+    example = models.TextField(blank=True, default="")
+
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+
+    plan = models.TextField(blank=True, default="")
+    explained_at = models.DateTimeField(null=True, blank=True)
+
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.view or '-'}: {self.sql[:80]}"
+
+    @property
+    def average_ms(self):
+        return self.total_ms / self.count if self.count else 0
+
+    class Meta:
+        ordering = ["-total_ms"]
+        unique_together = ["fingerprint", "view"]
+
+
+# =====================================================
+# CHANGE FEED (outbox)
+# =====================================================
+class ChangeEvent(models.Model):
+    """
+    One catalog write, appended with the write itself (see
+    movies.services.change_feed). `seq` is the feed position consumers of
+    GET /api/v1/changes/?since= resume from; it is stamped after the
+    write commits, so positions follow commit order.
+    """
+
+    ENTITY_MOVIE = "movie"
+    ENTITY_GENRE = "genre"
+    ENTITY_REVIEW = "review"
+    ENTITY_WATCHLIST = "watchlist"
+    ENTITY_FAVORITE = "favorite"
+
+    ENTITY_CHOICES = [
+        (ENTITY_MOVIE, "Movie"),
+        (ENTITY_GENRE, "Genre"),
+        (ENTITY_REVIEW, "Review"),
+        (ENTITY_WATCHLIST, "Watchlist entry"),
+        (ENTITY_FAVORITE, "Favorite"),
+    ]
+
+    ACTION_UPSERT = "upsert"
+    ACTION_DELETE = "delete"
+
+    ACTION_CHOICES = [
+        (ACTION_UPSERT, "Created or updated"),
+        (ACTION_DELETE, "Deleted (tombstone)"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    # Null until the writing transaction has committed
+    seq = models.BigIntegerField(null=True, blank=True, unique=True)
+
+    entity = models.CharField(max_length=10, choices=ENTITY_CHOICES)
+    entity_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+
+    # Movie / user the row belongs to; plain ids, tombstones outlive the rows
+    movie_id = models.BigIntegerField(null=True, blank=True)
+    user_id = models.IntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"#{self.seq or '-'} {self.action} {self.entity} {self.entity_id}"
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # Compaction keeps the newest event per entity
+            models.Index(fields=["entity", "entity_id", "seq"], name="change_event_entity_seq_idx"),
+        ]
+
+
+class ChangeSequence(models.Model):
+    """
+    Single row holding the last feed position handed out. Stamping
+    locks it, so positions are assigned in commit order.
+    """
+
+    last_seq = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Change feed at {self.last_seq}"
+
+
+class ChangeCompaction(models.Model):
+    """
+    One `manage.py compact_changes` run. Events up to `watermark` have
+    expired, so consumers behind it must resync from a full export.
+    """
+
+    watermark = models.BigIntegerField(default=0)
+    superseded = models.IntegerField(default=0)
+    expired = models.IntegerField(default=0)
+
+    ran_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Compaction {self.ran_at:%Y-%m-%d %H:%M} (watermark {self.watermark})"
+
+    class Meta:
+        ordering = ["-ran_at"]
@@ -0,0 +1,171 @@
+"""
+Pagination
+- KeysetPagination: newest-first API paging on (created_at, id) that
+  costs the same on page 1 and page 1000, and can merge several sources
+- EstimatedCountPaginator: admin changelists without COUNT(*) scans
+"""
+
+import base64
+import heapq
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    ?cursor=<opaque> continues after the last row of the previous page.
+    Rows are ordered by (created_at, id) descending; the cursor encodes
+    that pair, so each page is an index range scan instead of an OFFSET.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def __init__(self):
+        self.page_size = api_settings.PAGE_SIZE or 20
+        self.next_position = None
+
+    # ---------- cursor ----------
+
+    @staticmethod
+    def encode_cursor(created_at, pk):
+        raw = f"{created_at.isoformat()}|{pk}".encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound("Invalid cursor")
+
+    # ---------- paging ----------
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def after_position(self, queryset, position):
+        """Rows strictly after `position` in (created_at, id) descending order"""
+        created_at, pk = position
+        return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_sources([queryset], request)
+
+    def paginate_sources(self, querysets, request):
+        """
+        One page over several querysets ordered the same way.
+        Each source contributes at most page_size + 1 rows, which are
+        merged in Python; the extra row tells whether a next page exists.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        position = self.decode_cursor(cursor) if cursor else None
+
+        pages = []
+        for queryset in querysets:
+            if position is not None:
+                queryset = self.after_position(queryset, position)
+            pages.append(list(queryset.order_by("-created_at", "-id")[:page_size + 1]))
+
+        rows = list(heapq.merge(*pages, key=lambda row: (row.created_at, row.id), reverse=True))
+
+        page = rows[:page_size]
+        self.next_position = None
+        if len(rows) > page_size:
+            self.next_position = (page[-1].created_at, page[-1].id)
+
+        return page
+
+    # ---------- response ----------
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(*self.next_position))
+
+    def get_first_link(self):
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "first": self.get_first_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "first": {"type": "string", "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+# =====================================================
+# ADMIN
+# =====================================================
+class EstimatedCountPaginator(Paginator):
+    """
+    Unfiltered big tables use the planner's row estimate; filtered
+    querysets are counted only up to ADMIN_COUNT_LIMIT rows.
+    Small tables get an exact count.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limit = getattr(settings, "ADMIN_COUNT_LIMIT", 10000)
+
+        if not queryset.query.has_filters():
+            estimate = self.estimate(queryset)
+            if estimate is not None and estimate > limit:
+                return estimate
+
+        # COUNT over a LIMITed subquery stops after `limit` rows
+        return queryset.order_by()[:limit].count()
+
+    @staticmethod
+    def estimate(queryset):
+        connection = connections[queryset.db]
+        table = queryset.model._meta.db_table
+
+        if connection.vendor == "mysql":
+            sql = (
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+            )
+        elif connection.vendor == "postgresql":
+            sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+        else:
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+
+        return int(row[0]) if row and row[0] is not None else None
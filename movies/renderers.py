@@ -0,0 +1,96 @@
+"""
+JSON Renderer and Parser
+Uses orjson when it is installed and falls back to DRF's stdlib
+json implementation otherwise
+"""
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+_encoder = JSONEncoder()
+
+
+def _default(value):
+    """Types orjson has no native encoding for: Decimal, lazy strings, querysets..."""
+    return _encoder.default(value)
+
+
+def _escape_line_separators(data):
+    # Same JavaScript-safe escaping DRF's JSONRenderer applies
+    if b"\xe2\x80\xa8" in data or b"\xe2\x80\xa9" in data:
+        data = data.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return data
+
+
+def dumps(data):
+    """Encode data as compact JSON bytes, exactly like the API renders it"""
+    if orjson is not None:
+        return _escape_line_separators(orjson.dumps(data, default=_default, option=ORJSON_OPTIONS))
+    return JSONRenderer().render(data)
+
+
+def iter_json_list(chunks, head=b"", tail=b""):
+    """
+    Stream a JSON array chunk by chunk: `chunks` yields lists of items,
+    `head` / `tail` wrap the array (e.g. b'{"results":' and b'}')
+    """
+    yield head + b"["
+
+    first = True
+    for items in chunks:
+        if not items:
+            continue
+
+        encoded = b",".join(dumps(item) for item in items)
+        yield encoded if first else b"," + encoded
+        first = False
+
+    yield b"]" + tail
+
+
+# =====================================================
+# RENDERER / PARSER
+# =====================================================
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer. Compact output goes through orjson;
+    indented output (browsable API, ?indent) uses the stdlib path.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        # orjson only reads UTF-8
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
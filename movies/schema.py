@@ -0,0 +1,13 @@
+"""
+drf-spectacular extensions for the project's own classes
+Imported by movies.utils.schema_cache before a schema is generated,
+so drf-spectacular stays out of worker start-up
+"""
+
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Extensions match exact classes, so the simplejwt subclass needs its own"""
+
+    target_class = "movies.authentication.CachedJWTAuthentication"
@@ -4,9 +4,15 @@ Converts models to JSON and validates data
 """
 
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
-from django.db import models
-from .models import Movie, Genre, Review, Watchlist, Favorite
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+from .authentication import is_token_revoked
+from .models import Movie, Genre, Review, Watchlist, Favorite, MovieRatingCount
+from .utils.cache_manager import movie_cache
 
 
 # =========================
@@ -18,6 +24,279 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'created_at']
 
 
+# =========================
+# SPARSE FIELDSETS
+# =========================
+# Readable movie fields, in response order
+MOVIE_FIELDS = [
+    'id',
+    'title',
+    'overview',
+    'release_date',
+    'vote_average',
+    'vote_count',
+    'poster_path',
+    'backdrop_path',
+    'runtime',
+    'genres',
+    'tmdb_id',
+    'average_rating',
+    'review_count',
+    'created_at',
+    'updated_at',
+]
+
+MOVIE_RELATIONS = {'genres'}
+
+
+def _rating_counts(expression):
+    """
+    Correlated subquery over the movie's MovieRatingCount histogram,
+    which also counts archived reviews and is at most 10 rows per movie
+    """
+    return Subquery(
+        MovieRatingCount.objects.filter(movie=OuterRef('pk'))
+        .order_by()
+        .values('movie')
+        .annotate(value=expression)
+        .values('value')
+    )
+
+
+MOVIE_AGGREGATES = {
+    'average_rating': _rating_counts(
+        Cast(Sum(F('rating') * F('count')), FloatField()) / Cast(NullIf(Sum('count'), 0), FloatField())
+    ),
+    'review_count': Coalesce(_rating_counts(Sum('count')), 0),
+}
+
+
+def round_rating(avg):
+    return round(avg, 1) if avg else None
+
+
+def _split_param(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def _chunks(items, size=500):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class MovieFieldset:
+    """
+    The movie fields a request asked for:
+
+    ?fields=id,title      only these fields
+    ?omit=overview        everything except these
+    ?expand=genres        nest genre objects; when `fields` is given,
+                          relations are returned as ids unless expanded
+
+    Also shapes the queryset so only the needed columns, prefetches
+    and aggregates are loaded.
+    """
+
+    def __init__(self, query_params=None):
+        params = query_params or {}
+
+        fields = _split_param(params.get('fields'))
+        omit = _split_param(params.get('omit'))
+        expand = _split_param(params.get('expand'))
+
+        unknown = (set(fields) | set(omit)) - set(MOVIE_FIELDS)
+        unknown |= set(expand) - MOVIE_RELATIONS
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f"Unknown movie field(s): {', '.join(sorted(unknown))}"
+            })
+
+        self.fields = [
+            name for name in MOVIE_FIELDS
+            if (not fields or name in fields) and name not in omit
+        ]
+        self.expand = set(expand) if fields else set(expand) | MOVIE_RELATIONS
+
+    @property
+    def is_full(self):
+        """Every field with relations expanded: the cached fragment shape"""
+        return self.fields == MOVIE_FIELDS and self.expand >= MOVIE_RELATIONS
+
+    def project(self, data):
+        """Cut a full movie fragment down to this fieldset"""
+        item = {name: data[name] for name in self.fields}
+        if 'genres' in item and 'genres' not in self.expand:
+            item['genres'] = [genre['id'] for genre in item['genres']]
+        return item
+
+    @property
+    def columns(self):
+        return [
+            name for name in self.fields
+            if name != 'id' and name not in MOVIE_RELATIONS and name not in MOVIE_AGGREGATES
+        ]
+
+    @property
+    def aggregates(self):
+        return {name: MOVIE_AGGREGATES[name] for name in self.fields if name in MOVIE_AGGREGATES}
+
+    def optimize(self, queryset):
+        """Model queryset for MovieSerializer (detail / write responses)"""
+        queryset = queryset.only('id', *self.columns)
+
+        if 'genres' in self.fields:
+            queryset = queryset.prefetch_related('genres')
+
+        if self.aggregates:
+            queryset = queryset.annotate(**self.aggregates)
+
+        return queryset
+
+    def values(self, queryset):
+        """Row-dict queryset for the fast list path (serialize)"""
+        # Meta.ordering is not applied to GROUP BY queries, so make it explicit
+        if not queryset.query.order_by:
+            queryset = queryset.order_by(*queryset.model._meta.ordering)
+
+        return queryset.annotate(**self.aggregates).values(
+            'id', *self.columns, *self.aggregates
+        )
+
+    def serialize(self, rows):
+        """
+        Fast read-only serialization of values() rows. Produces the same
+        output as MovieSerializer without per-row field objects.
+        Movies with a valid cached fragment are projected from it; the
+        rest are rendered and, for a full fieldset, cached.
+        """
+        rows = list(rows)
+        datetime_field = serializers.DateTimeField()
+
+        stamps = None
+        if 'updated_at' in self.fields:
+            stamps = {row['id']: datetime_field.to_representation(row['updated_at']) for row in rows}
+        cached, versions = movie_cache.lookup([row['id'] for row in rows], stamps)
+
+        misses = [row for row in rows if row['id'] not in cached]
+        rendered = dict(zip([row['id'] for row in misses], self._render(misses)))
+        if rendered and self.is_full:
+            movie_cache.store(rendered, versions)
+
+        return [
+            self.project(cached[row['id']]) if row['id'] in cached else rendered[row['id']]
+            for row in rows
+        ]
+
+    def serialize_ids(self, movie_ids):
+        """Movies in the given order, from their (cached) full fragments; unknown ids are skipped"""
+        results = []
+        for ids in _chunks(list(movie_ids)):
+            fragments = movie_fragments(dict.fromkeys(ids))
+            results += [self.project(fragments[movie_id]) for movie_id in ids if movie_id in fragments]
+        return results
+
+    def _render(self, rows):
+
+        genres = {}
+        if 'genres' in self.fields:
+            genres = self._genres_for([row['id'] for row in rows])
+
+        datetime_field = serializers.DateTimeField()
+        formatters = {
+            'release_date': lambda value: value.isoformat(),
+            'created_at': datetime_field.to_representation,
+            'updated_at': datetime_field.to_representation,
+        }
+
+        plan = [
+            (name, formatters.get(name))
+            for name in self.fields
+            if name != 'genres' and name != 'average_rating'
+        ]
+
+        results = []
+        for row in rows:
+            item = {}
+
+            for name, formatter in plan:
+                value = row[name]
+                item[name] = formatter(value) if formatter and value is not None else value
+
+            if 'average_rating' in row:
+                item['average_rating'] = round_rating(row['average_rating'])
+
+            if 'genres' in self.fields:
+                item['genres'] = genres.get(row['id'], [])
+
+            # Keep the response key order identical to MovieSerializer
+            results.append({name: item[name] for name in self.fields})
+
+        return results
+
+    def iter_serialized(self, queryset, chunk_size=500):
+        """Serialize a values() queryset chunk by chunk from a DB iterator"""
+        chunk = []
+
+        for row in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield self.serialize(chunk)
+                chunk = []
+
+        if chunk:
+            yield self.serialize(chunk)
+
+    def _genres_for(self, movie_ids):
+        links = {}
+        Through = Movie.genres.through
+
+        for ids in _chunks(movie_ids):
+            for movie_id, genre_id in Through.objects.filter(movie_id__in=ids).values_list('movie_id', 'genre_id'):
+                links.setdefault(movie_id, []).append(genre_id)
+
+        genre_ids = {genre_id for ids in links.values() for genre_id in ids}
+        genres = Genre.objects.filter(id__in=genre_ids)
+
+        # Genres are ordered by name, like the prefetched relation
+        if 'genres' in self.expand:
+            rendered = {genre['id']: genre for genre in GenreSerializer(genres, many=True).data}
+        else:
+            rendered = {genre_id: genre_id for genre_id in genres.values_list('id', flat=True)}
+        position = {genre_id: index for index, genre_id in enumerate(rendered)}
+
+        return {
+            movie_id: [rendered[genre_id] for genre_id in sorted(ids, key=position.get)]
+            for movie_id, ids in links.items()
+        }
+
+
+def movie_fragments(updated_at):
+    """
+    Full movie representations for {movie id: updated_at or None}.
+    Valid fragments come from the cache; misses are loaded in one
+    aggregated query, rendered and cached. Unknown ids are left out.
+    """
+    fieldset = MovieFieldset()
+    datetime_field = serializers.DateTimeField()
+
+    stamps = {
+        movie_id: datetime_field.to_representation(value)
+        for movie_id, value in updated_at.items()
+        if value is not None
+    }
+    # Ids without a known updated_at are validated by version only
+    found, versions = movie_cache.lookup(list(updated_at), stamps)
+
+    missing = [movie_id for movie_id in updated_at if movie_id not in found]
+    if missing:
+        rows = list(fieldset.values(Movie.objects.filter(id__in=missing)))
+        rendered = dict(zip([row['id'] for row in rows], fieldset._render(rows)))
+        movie_cache.store(rendered, versions)
+        found.update(rendered)
+
+    return found
+
+
 # =========================
 # MOVIE SERIALIZER
 # =========================
@@ -56,16 +335,42 @@ class MovieSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Sparse fieldset from the request (see MovieFieldset)
+        fieldset = self.context.get('fieldset')
+        if fieldset is None:
+            return
+
+        for name in list(self.fields):
+            if name not in fieldset.fields and not self.fields[name].write_only:
+                self.fields.pop(name)
+
+        if 'genres' in self.fields and 'genres' not in fieldset.expand:
+            self.fields['genres'] = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    def to_representation(self, instance):
+        # Prefetched fragments (see movie_fragments) skip the per-movie queries
+        fragments = self.context.get('movie_fragments')
+        if fragments is not None and instance.pk in fragments:
+            return (self.context.get('fieldset') or MovieFieldset()).project(fragments[instance.pk])
+        return super().to_representation(instance)
+
     # ⭐ Calculate average rating
     def get_average_rating(self, obj):
-        if obj.reviews.exists():
-            avg = obj.reviews.aggregate(avg=models.Avg('rating'))['avg']
-            return round(avg, 1) if avg else None
+        if hasattr(obj, 'average_rating'):
+            return round_rating(obj.average_rating)
+        totals = obj.rating_counts.aggregate(reviews=Sum('count'), total=Sum(F('rating') * F('count')))
+        if totals['reviews']:
+            return round_rating(totals['total'] / totals['reviews'])
         return None
 
     # ⭐ Count reviews
     def get_review_count(self, obj):
-        return obj.reviews.count()
+        if hasattr(obj, 'review_count'):
+            return obj.review_count
+        return obj.rating_counts.aggregate(reviews=Sum('count'))['reviews'] or 0
 
     # CREATE movie
     def create(self, validated_data):
@@ -166,4 +471,20 @@ class FavoriteSerializer(serializers.ModelSerializer):
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'first_name', 'last_name']
\ No newline at end of file
+        fields = ['id', 'username', 'email', 'first_name', 'last_name']
+
+
+# =========================
+# TOKEN SERIALIZERS
+# =========================
+class TokenRefreshDenylistSerializer(TokenRefreshSerializer):
+    """Refuses refresh tokens that were revoked through the denylist"""
+
+    def validate(self, attrs):
+        if is_token_revoked(RefreshToken(attrs["refresh"])):
+            raise InvalidToken("Token has been revoked")
+        return super().validate(attrs)
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
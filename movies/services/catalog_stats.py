@@ -0,0 +1,538 @@
+"""
+Catalog Statistics
+Keeps the CatalogStat summary table (per genre / year / runtime bucket)
+and the per-movie rating histogram current with small deltas instead
+of scanning movies_movie / movies_review
+"""
+
+import heapq
+import threading
+from collections import namedtuple
+from itertools import groupby
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from movies.models import ArchivedReview, CatalogStat, Genre, Movie, MovieRatingCount, Review
+from movies.utils.cache_manager import genre_cache
+
+
+COUNTERS = ("movie_count", "vote_average_sum", "runtime_sum", "review_count", "rating_sum")
+
+RUNTIME_BUCKET = 30
+RUNTIME_LAST_BUCKET = 180
+
+GENRE = CatalogStat.DIMENSION_GENRE
+YEAR = CatalogStat.DIMENSION_YEAR
+RUNTIME = CatalogStat.DIMENSION_RUNTIME
+
+# Archived reviews still count in every total
+REVIEW_MODELS = (Review, ArchivedReview)
+
+# Everything a movie contributes to the summary rows
+MovieState = namedtuple(
+    "MovieState",
+    "release_date runtime vote_average genre_ids review_count rating_sum",
+)
+
+_deleting = threading.local()
+
+
+# =====================================================
+# BUCKETS
+# =====================================================
+def release_year(value):
+    if not value:
+        return None
+    if isinstance(value, str):
+        # Import rows may still carry the raw "YYYY-MM-DD" string
+        return int(value[:4])
+    return value.year
+
+
+def runtime_bucket(runtime):
+    """Start of the 30 minute bucket; 180+ is one bucket, unknown (0) none"""
+    if not runtime or runtime <= 0:
+        return None
+    return min(runtime // RUNTIME_BUCKET * RUNTIME_BUCKET, RUNTIME_LAST_BUCKET)
+
+
+def buckets(state):
+    """(dimension, key) summary rows a movie counts towards"""
+    keys = [(GENRE, genre_id) for genre_id in state.genre_ids]
+
+    year = release_year(state.release_date)
+    if year:
+        keys.append((YEAR, year))
+
+    bucket = runtime_bucket(state.runtime)
+    if bucket is not None:
+        keys.append((RUNTIME, bucket))
+
+    return keys
+
+
+# =====================================================
+# DELTAS
+# {(dimension, key): {counter: change}}. Deltas add up, so any
+# number of changes can be coalesced before one write.
+# =====================================================
+def movie_counters(state, sign=1):
+    return {
+        "movie_count": sign,
+        "vote_average_sum": sign * (state.vote_average or 0),
+        "runtime_sum": sign * (state.runtime or 0),
+        "review_count": sign * state.review_count,
+        "rating_sum": sign * state.rating_sum,
+    }
+
+
+def add_counters(deltas, key, counters):
+    row = deltas.setdefault(key, dict.fromkeys(COUNTERS, 0))
+    for name, value in counters.items():
+        row[name] += value
+    return deltas
+
+
+def merge_deltas(deltas, other):
+    for key, counters in other.items():
+        add_counters(deltas, key, counters)
+    return deltas
+
+
+def movie_delta(old, new):
+    """Delta for a movie going from state `old` to `new` (None = absent)"""
+    deltas = {}
+
+    if old is not None:
+        for key in buckets(old):
+            add_counters(deltas, key, movie_counters(old, -1))
+
+    if new is not None:
+        for key in buckets(new):
+            add_counters(deltas, key, movie_counters(new))
+
+    return deltas
+
+
+def review_delta(state, count, rating_sum):
+    deltas = {}
+    for key in buckets(state):
+        add_counters(deltas, key, {"review_count": count, "rating_sum": rating_sum})
+    return deltas
+
+
+def genre_link_delta(states, pairs, sign):
+    """Delta for (movie_id, genre_id) links being added (+1) or removed (-1)"""
+    deltas = {}
+    for movie_id, genre_id in pairs:
+        if movie_id in states:
+            add_counters(deltas, (GENRE, genre_id), movie_counters(states[movie_id], sign))
+    return deltas
+
+
+def rating_delta(old, new):
+    """{(movie_id, rating): change} for a review going from old to new"""
+    deltas = {}
+    if old is not None:
+        deltas[old] = deltas.get(old, 0) - 1
+    if new is not None:
+        deltas[new] = deltas.get(new, 0) + 1
+    return deltas
+
+
+def states_delta(before, after):
+    """Delta between two load_states() snapshots of the same movies"""
+    deltas = {}
+    for movie_id in before.keys() | after.keys():
+        merge_deltas(deltas, movie_delta(before.get(movie_id), after.get(movie_id)))
+    return deltas
+
+
+# =====================================================
+# DATABASE
+# =====================================================
+def load_states(movie_ids, chunk_size=1000, with_reviews=True):
+    """
+    {movie id: MovieState} in four queries per chunk. Without reviews the
+    review counters are 0 (two queries, enough for buckets())
+    """
+    movie_ids = list(movie_ids)
+    states = {}
+
+    for start in range(0, len(movie_ids), chunk_size):
+        chunk = movie_ids[start:start + chunk_size]
+
+        genres = {}
+        links = Movie.genres.through.objects.filter(movie_id__in=chunk)
+        for movie_id, genre_id in links.values_list("movie_id", "genre_id"):
+            genres.setdefault(movie_id, []).append(genre_id)
+
+        reviews = {}
+        for model in REVIEW_MODELS if with_reviews else ():
+            rows = (
+                model.objects.filter(movie_id__in=chunk)
+                .order_by()
+                .values_list("movie_id")
+                .annotate(count=Count("id"), total=Sum("rating"))
+            )
+            for movie_id, count, total in rows:
+                previous = reviews.get(movie_id, (0, 0))
+                reviews[movie_id] = (previous[0] + count, previous[1] + (total or 0))
+
+        movies = Movie.objects.filter(id__in=chunk).values_list(
+            "id", "release_date", "runtime", "vote_average"
+        )
+        for movie_id, release_date, runtime, vote_average in movies:
+            review_count, rating_sum = reviews.get(movie_id, (0, 0))
+            states[movie_id] = MovieState(
+                release_date, runtime, vote_average,
+                tuple(genres.get(movie_id, ())), review_count, rating_sum,
+            )
+
+    return states
+
+
+def _add_to_row(model, lookup, counters, **extra):
+    """UPDATE ... SET c = c + n, or INSERT the row if it does not exist yet"""
+    rows = model.objects.filter(**lookup)
+    updates = {name: F(name) + value for name, value in counters.items() if value}
+
+    if rows.update(**extra, **updates):
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **counters)
+    except IntegrityError:
+        # Created by a concurrent writer in the meantime
+        rows.update(**extra, **updates)
+
+
+def apply_deltas(deltas):
+    """Add coalesced deltas to the summary rows, creating rows on first use"""
+    changes = {key: counters for key, counters in deltas.items() if any(counters.values())}
+    if not changes:
+        return
+
+    # Rows of genres deleted since the deltas were computed are gone for good
+    genre_ids = {key for dimension, key in changes if dimension == GENRE}
+    if genre_ids:
+        deleted = genre_ids - set(Genre.objects.filter(id__in=genre_ids).values_list("id", flat=True))
+        changes = {(dimension, key): counters for (dimension, key), counters in changes.items()
+                   if dimension != GENRE or key not in deleted}
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        # A fixed row order keeps concurrent writers from deadlocking
+        for (dimension, key), counters in sorted(changes.items()):
+            _add_to_row(CatalogStat, {"dimension": dimension, "key": key}, counters, updated_at=now)
+
+
+def apply_rating_deltas(deltas):
+    """Add coalesced rating_delta() changes to MovieRatingCount"""
+    changes = {key: change for key, change in deltas.items() if change}
+    if not changes:
+        return
+
+    # Histograms of movies deleted in the meantime went with the movie
+    movie_ids = set(Movie.objects.filter(id__in={movie_id for movie_id, _ in changes}).values_list("id", flat=True))
+
+    with transaction.atomic():
+        for (movie_id, rating), change in sorted(changes.items()):
+            if movie_id not in movie_ids:
+                continue
+            _add_to_row(MovieRatingCount, {"movie_id": movie_id, "rating": rating}, {"count": change})
+
+
+class PendingDeltas:
+    """
+    Deltas of one transaction, written once after it commits. The shared
+    summary rows are then only locked for that short write, not for the
+    whole transaction that changed movies or reviews.
+    """
+
+    def __init__(self):
+        self.deltas = {}
+        self.ratings = {}
+
+    def add(self, deltas, ratings):
+        merge_deltas(self.deltas, deltas)
+        for key, change in ratings.items():
+            self.ratings[key] = self.ratings.get(key, 0) + change
+
+    def __call__(self):
+        apply_deltas(self.deltas)
+        apply_rating_deltas(self.ratings)
+
+
+def add_deltas(deltas, ratings=None):
+    """
+    Queue summary and rating deltas until the current transaction
+    commits (written right away outside of one). Changes made in the
+    same savepoint share one PendingDeltas, so a rollback still drops
+    exactly the deltas it undid.
+    """
+    ratings = ratings or {}
+    connection = transaction.get_connection()
+
+    if not connection.in_atomic_block:
+        apply_deltas(deltas)
+        apply_rating_deltas(ratings)
+        return
+
+    # run_on_commit holds (savepoint ids, callback, robust) per hook
+    savepoints = set(connection.savepoint_ids)
+    for hook in reversed(connection.run_on_commit):
+        if isinstance(hook[1], PendingDeltas) and hook[0] == savepoints:
+            hook[1].add(deltas, ratings)
+            return
+
+    pending = PendingDeltas()
+    pending.add(deltas, ratings)
+    transaction.on_commit(pending)
+
+
+# =====================================================
+# CHANGE HOOKS (wired in movies.signals and the bulk importers)
+# =====================================================
+def movie_saved(movie, previous):
+    """`previous` is the load_states() entry captured before the save"""
+    genre_ids, review_count, rating_sum = (), 0, 0
+    if previous is not None:
+        genre_ids = previous.genre_ids
+        review_count, rating_sum = previous.review_count, previous.rating_sum
+
+    current = MovieState(
+        movie.release_date, movie.runtime, movie.vote_average,
+        genre_ids, review_count, rating_sum,
+    )
+    add_deltas(movie_delta(previous, current))
+
+
+def movie_deleting(movie_id):
+    """Reviews cascade-deleted with a movie are covered by the movie delta"""
+    if not hasattr(_deleting, "movie_ids"):
+        _deleting.movie_ids = set()
+    _deleting.movie_ids.add(movie_id)
+
+
+def movie_deleted(movie_id, previous):
+    getattr(_deleting, "movie_ids", set()).discard(movie_id)
+    if previous is not None:
+        add_deltas(movie_delta(previous, None))
+
+
+def review_changed(old, new):
+    """old / new are (movie_id, rating) tuples, or None"""
+    if old == new:
+        return
+
+    if old is not None and old[0] in getattr(_deleting, "movie_ids", ()):
+        old = None
+    if old is None and new is None:
+        return
+
+    # Only the buckets are needed, not the movie's review totals
+    states = load_states({review[0] for review in (old, new) if review is not None}, with_reviews=False)
+    deltas = {}
+
+    if old is not None and old[0] in states:
+        merge_deltas(deltas, review_delta(states[old[0]], -1, -old[1]))
+    if new is not None and new[0] in states:
+        merge_deltas(deltas, review_delta(states[new[0]], 1, new[1]))
+
+    add_deltas(deltas, rating_delta(old, new))
+
+
+def reviews_changed(changes):
+    """
+    Coalesced review_changed() for bulk writes that send no signals.
+    `changes` is a list of (old, new) pairs as in review_changed();
+    every touched movie is loaded once and each row is written once.
+    """
+    changes = [(old, new) for old, new in changes if old != new]
+    movie_ids = {review[0] for change in changes for review in change if review is not None}
+    if not movie_ids:
+        return
+
+    states = load_states(movie_ids, with_reviews=False)
+    deltas, ratings = {}, {}
+
+    for old, new in changes:
+        for review, sign in ((old, -1), (new, 1)):
+            if review is not None and review[0] in states:
+                merge_deltas(deltas, review_delta(states[review[0]], sign, sign * review[1]))
+
+        for key, change in rating_delta(old, new).items():
+            ratings[key] = ratings.get(key, 0) + change
+
+    add_deltas(deltas, ratings)
+
+
+def genre_links_changed(pairs, sign):
+    """(movie_id, genre_id) links that were actually added (+1) or removed (-1)"""
+    pairs = list(pairs)
+    if pairs:
+        states = load_states({movie_id for movie_id, _ in pairs})
+        add_deltas(genre_link_delta(states, pairs, sign))
+
+
+def genre_deleted(genre_id):
+    CatalogStat.objects.filter(dimension=GENRE, key=genre_id).delete()
+
+
+# =====================================================
+# FULL REBUILD
+# =====================================================
+def _runtime_bucket_expression(field):
+    """SQL twin of runtime_bucket()"""
+    whens = [
+        When(Q(**{f"{field}__gte": start, f"{field}__lt": start + RUNTIME_BUCKET}), then=Value(start))
+        for start in range(0, RUNTIME_LAST_BUCKET, RUNTIME_BUCKET)
+    ]
+    return Case(*whens, default=Value(RUNTIME_LAST_BUCKET), output_field=IntegerField())
+
+
+def rebuild():
+    """Recompute every summary row with a handful of GROUP BY queries"""
+    movie_sums = {
+        "movie_count": Count("id"),
+        "vote_average_sum": Sum("vote_average"),
+        "runtime_sum": Sum("runtime"),
+    }
+    review_sums = {
+        "review_count": Count("id"),
+        "rating_sum": Sum("rating"),
+    }
+
+    movies = Movie.objects.order_by()
+
+    groups = [
+        (GENRE, Movie.genres.through.objects.order_by().values(key=F("genre_id")).annotate(
+            movie_count=Count("id"),
+            vote_average_sum=Sum("movie__vote_average"),
+            runtime_sum=Sum("movie__runtime"),
+        )),
+        (YEAR, movies.filter(release_date__isnull=False)
+            .values(key=ExtractYear("release_date")).annotate(**movie_sums)),
+        (RUNTIME, movies.filter(runtime__gt=0)
+            .values(key=_runtime_bucket_expression("runtime")).annotate(**movie_sums)),
+    ]
+
+    for model in REVIEW_MODELS:
+        reviews = model.objects.order_by()
+        groups += [
+            (GENRE, reviews.filter(movie__genres__isnull=False)
+                .values(key=F("movie__genres")).annotate(**review_sums)),
+            (YEAR, reviews.filter(movie__release_date__isnull=False)
+                .values(key=ExtractYear("movie__release_date")).annotate(**review_sums)),
+            (RUNTIME, reviews.filter(movie__runtime__gt=0)
+                .values(key=_runtime_bucket_expression("movie__runtime")).annotate(**review_sums)),
+        ]
+
+    deltas = {}
+    for dimension, rows in groups:
+        for row in rows:
+            key = row.pop("key")
+            add_counters(deltas, (dimension, key), {name: value or 0 for name, value in row.items()})
+
+    with transaction.atomic():
+        CatalogStat.objects.all().delete()
+        CatalogStat.objects.bulk_create(
+            [
+                CatalogStat(dimension=dimension, key=key, **counters)
+                for (dimension, key), counters in sorted(deltas.items())
+            ],
+            batch_size=1000,
+        )
+
+    return len(deltas)
+
+
+def rebuild_rating_counts(batch_size=5000):
+    """Recompute every movie's rating histogram (hot and archived reviews)"""
+    sources = [
+        model.objects.order_by("movie_id", "rating")
+        .values_list("movie_id", "rating")
+        .annotate(count=Count("id"))
+        .iterator(chunk_size=batch_size)
+        for model in REVIEW_MODELS
+    ]
+    # Both streams are sorted, so equal keys are adjacent after the merge
+    counts = (
+        (movie_id, rating, sum(row[2] for row in rows))
+        for (movie_id, rating), rows in groupby(heapq.merge(*sources), key=lambda row: row[:2])
+    )
+
+    rows = 0
+    with transaction.atomic():
+        MovieRatingCount.objects.all().delete()
+
+        batch = []
+        for movie_id, rating, count in counts:
+            batch.append(MovieRatingCount(movie_id=movie_id, rating=rating, count=count))
+            if len(batch) >= batch_size:
+                MovieRatingCount.objects.bulk_create(batch)
+                rows += len(batch)
+                batch = []
+
+        MovieRatingCount.objects.bulk_create(batch)
+        rows += len(batch)
+
+    return rows
+
+
+# =====================================================
+# READING
+# =====================================================
+def _label(dimension, key):
+    if dimension == GENRE:
+        return genre_cache.names().get(key, str(key))
+    if dimension == RUNTIME:
+        if key >= RUNTIME_LAST_BUCKET:
+            return f"{RUNTIME_LAST_BUCKET}+ min"
+        return f"{key}-{key + RUNTIME_BUCKET - 1} min"
+    return str(key)
+
+
+def _average(total, count):
+    return round(total / count, 2) if count else None
+
+
+def summary(dimension):
+    """Averages per key for one dimension, straight from the summary rows"""
+    rows = CatalogStat.objects.filter(dimension=dimension, movie_count__gt=0)
+
+    return [
+        {
+            "key": row.key,
+            "label": _label(dimension, row.key),
+            "movie_count": row.movie_count,
+            "average_vote": _average(row.vote_average_sum, row.movie_count),
+            "average_runtime": _average(row.runtime_sum, row.movie_count),
+            "review_count": row.review_count,
+            "average_rating": _average(row.rating_sum, row.review_count),
+        }
+        for row in rows
+    ]
+
+
+def rating_summary(movie_id):
+    """Review count, average and 1-10 histogram from MovieRatingCount"""
+    histogram = dict.fromkeys(range(1, 11), 0)
+    histogram.update(
+        MovieRatingCount.objects.filter(movie_id=movie_id, count__gt=0).values_list("rating", "count")
+    )
+
+    count = sum(histogram.values())
+    total = sum(rating * n for rating, n in histogram.items())
+
+    return {
+        "count": count,
+        "average_rating": _average(total, count),
+        "histogram": histogram,
+    }
@@ -0,0 +1,161 @@
+"""
+Catalog Sync - Scheduled Incremental Refresh
+Refreshes the stalest, most popular movies from TMDB / IMDb
+within a per-run time and request budget
+"""
+
+import logging
+import math
+import time
+import uuid
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from movies.importers.imdb_importer import imdb_title_to_row
+from movies.importers.tmdb_importer import tmdb_details_to_row
+from movies.importers.upsert import upsert_movies
+from movies.models import Movie, SyncRun
+from .imdb_service import IMDBService
+from .tmdb_service import TMDBService
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = "catalog_sync:lock"
+
+
+class CatalogSync:
+    """
+    One sync run. Overlapping runs are skipped through a cache lock
+    and every run (including skipped ones) is recorded as a SyncRun
+    """
+
+    def __init__(self, time_budget=None, request_budget=None, min_age_hours=None):
+        self.time_budget = time_budget or getattr(settings, "CATALOG_SYNC_TIME_BUDGET", 300)
+        self.request_budget = request_budget or getattr(settings, "CATALOG_SYNC_REQUEST_BUDGET", 200)
+        self.min_age_hours = min_age_hours or getattr(settings, "CATALOG_SYNC_MIN_AGE_HOURS", 24)
+
+        self.tmdb = TMDBService()
+        self.imdb = IMDBService()
+
+    def run(self):
+
+        token = uuid.uuid4().hex
+
+        # cache.add is atomic: only one worker gets the lock
+        if not cache.add(LOCK_KEY, token, self.time_budget + 60):
+            return SyncRun.objects.create(
+                status=SyncRun.STATUS_SKIPPED,
+                message="Another sync run is in progress",
+                finished_at=timezone.now(),
+            )
+
+        run = SyncRun.objects.create()
+
+        try:
+            self._sync(run)
+            run.status = SyncRun.STATUS_SUCCESS
+        except Exception as e:
+            logger.exception("Catalog sync failed")
+            run.status = SyncRun.STATUS_FAILED
+            run.message = str(e)
+        finally:
+            run.finished_at = timezone.now()
+            run.save()
+
+            if cache.get(LOCK_KEY) == token:
+                cache.delete(LOCK_KEY)
+
+        return run
+
+    # =====================================================
+    # CANDIDATES
+    # =====================================================
+    def candidates(self):
+        """
+        Stale movies ordered by priority: hours since last sync
+        weighted by log(popularity), so hot titles refresh first
+        """
+        now = timezone.now()
+        cutoff = now - timedelta(hours=self.min_age_hours)
+
+        pool = (
+            Movie.objects
+            .filter(Q(tmdb_id__isnull=False) | Q(imdb_id__isnull=False))
+            .annotate(synced=Coalesce("last_synced_at", "updated_at"))
+            .filter(synced__lt=cutoff)
+            .order_by("synced")
+            .values("id", "tmdb_id", "imdb_id", "vote_count", "synced")
+            [: self.request_budget * 4]
+        )
+
+        def priority(movie):
+            age_hours = (now - movie["synced"]).total_seconds() / 3600
+            return age_hours * math.log(2 + movie["vote_count"])
+
+        return sorted(pool, key=priority, reverse=True)
+
+    # =====================================================
+    # SYNC
+    # =====================================================
+    def _sync(self, run):
+
+        deadline = time.monotonic() + self.time_budget
+
+        tmdb_rows = []
+        imdb_rows = []
+        checked_ids = []
+
+        for movie in self.candidates():
+            if run.requests >= self.request_budget or time.monotonic() >= deadline:
+                break
+
+            run.requests += 1
+            checked_ids.append(movie["id"])
+
+            row = self._fetch(movie)
+            if row is None:
+                run.failed += 1
+            elif "tmdb_id" in row:
+                tmdb_rows.append(row)
+            else:
+                imdb_rows.append(row)
+
+        for rows, key in ((tmdb_rows, "tmdb_id"), (imdb_rows, "imdb_id")):
+            if rows:
+                _, stats = upsert_movies(rows, key=key)
+                run.updated += stats["updated"] + stats["created"]
+                run.unchanged += stats["unchanged"]
+
+        # Failed lookups are marked too, so they do not starve the queue
+        Movie.objects.filter(id__in=checked_ids).update(last_synced_at=timezone.now())
+
+        run.checked = len(checked_ids)
+
+        logger.info(
+            f"Catalog sync: {run.checked} checked, {run.updated} updated, "
+            f"{run.unchanged} unchanged, {run.failed} failed"
+        )
+
+    def _fetch(self, movie):
+
+        if movie["tmdb_id"]:
+            data = self.tmdb.get_movie_details(movie["tmdb_id"])
+            if "error" in data:
+                return None
+            return tmdb_details_to_row(movie["tmdb_id"], data)
+
+        try:
+            item = self.imdb.get_title(movie["imdb_id"])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"IMDb lookup failed for {movie['imdb_id']}: {e}")
+            return None
+
+        if not item.get("id"):
+            return None
+        return imdb_title_to_row(item)
@@ -0,0 +1,223 @@
+"""
+Change Feed (transactional outbox)
+Catalog writes append ChangeEvent rows next to the write: model signals
+for single-row writes, explicit record() calls for the bulk paths
+(importer upserts, write-behind, dedup). Consumers page through
+GET /api/v1/changes/?since=<seq>; deletes arrive as tombstones.
+
+Row ids are allocated before commit, so a long transaction (an import
+or dedup batch) can commit a lower id after a higher one was read.
+Feed positions are therefore stamped after commit, under a lock on
+ChangeSequence: a consumer that has seen a position has also seen
+every lower one.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, Max, OuterRef
+from django.utils import timezone
+
+from movies.models import ChangeCompaction, ChangeEvent, ChangeSequence
+from movies.utils.cache_manager import bump_catalog_version
+
+MOVIE = ChangeEvent.ENTITY_MOVIE
+GENRE = ChangeEvent.ENTITY_GENRE
+REVIEW = ChangeEvent.ENTITY_REVIEW
+WATCHLIST = ChangeEvent.ENTITY_WATCHLIST
+FAVORITE = ChangeEvent.ENTITY_FAVORITE
+
+UPSERT = ChangeEvent.ACTION_UPSERT
+DELETE = ChangeEvent.ACTION_DELETE
+
+
+class FeedExpired(Exception):
+    """The requested position is behind the compaction watermark"""
+
+    def __init__(self, watermark):
+        super().__init__(f"Changes up to {watermark} have been compacted")
+        self.watermark = watermark
+
+
+def enabled():
+    return getattr(settings, "CHANGE_FEED_ENABLED", True)
+
+
+# =====================================================
+# RECORDING
+# =====================================================
+def record(entity, action, rows):
+    """
+    Append one event per (entity id, movie id, user id) row. Call it
+    inside the transaction of the write it describes.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+
+    # Per-worker catalog snapshots (movies.utils.columnar) reload on this
+    if entity in (MOVIE, GENRE):
+        transaction.on_commit(bump_catalog_version)
+
+    if not enabled():
+        return
+
+    ChangeEvent.objects.bulk_create(
+        [
+            ChangeEvent(entity=entity, action=action, entity_id=entity_id, movie_id=movie_id, user_id=user_id)
+            for entity_id, movie_id, user_id in rows
+        ],
+        batch_size=1000,
+    )
+    _stamp_on_commit()
+
+
+def record_movies(action, movie_ids):
+    record(MOVIE, action, [(movie_id, movie_id, None) for movie_id in movie_ids])
+
+
+def record_instance(entity, action, instance):
+    """Event for a Movie, Genre or per-user row (review / watchlist / favorite)"""
+    if entity == MOVIE:
+        movie_id = instance.pk
+    else:
+        movie_id = getattr(instance, "movie_id", None)
+    record(entity, action, [(instance.pk, movie_id, getattr(instance, "user_id", None))])
+
+
+# =====================================================
+# SEQUENCING
+# =====================================================
+def _stamp_on_commit():
+    """One stamp() per transaction: an enclosing scope's hook covers inner ones"""
+    connection = transaction.get_connection()
+    savepoints = set(connection.savepoint_ids)
+
+    # run_on_commit holds ({savepoint ids}, callback, robust) per hook;
+    # a hook registered in an enclosing scope is rolled back with less
+    for hook in connection.run_on_commit:
+        if hook[1] is stamp and hook[0] <= savepoints:
+            return
+    transaction.on_commit(stamp)
+
+
+def stamp(batch_size=1000):
+    """
+    Give every committed event without a position the next positions,
+    in id order. Uncommitted events are invisible here, and the lock on
+    ChangeSequence orders concurrent stampers, so positions follow
+    commit order. Events a crashed process left unstamped are picked up
+    by the next call. Returns the number stamped.
+    """
+    stamped = 0
+
+    while True:
+        with transaction.atomic():
+            sequence, _ = ChangeSequence.objects.select_for_update().get_or_create(pk=1)
+            ids = list(
+                ChangeEvent.objects.filter(seq__isnull=True)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return stamped
+
+            # Ids are unique and ascending, so id + offset keeps both
+            offset = sequence.last_seq + 1 - ids[0]
+            ChangeEvent.objects.filter(id__in=ids, seq__isnull=True).update(seq=F("id") + offset)
+
+            sequence.last_seq = ids[-1] + offset
+            sequence.save(update_fields=["last_seq"])
+
+        stamped += len(ids)
+
+
+# =====================================================
+# READING
+# =====================================================
+def watermark():
+    """Highest compacted-away position (0 before the first compaction)"""
+    return ChangeCompaction.objects.aggregate(value=Max("watermark"))["value"] or 0
+
+
+def changes(since=0, limit=500, entities=None):
+    """
+    ([events], has_more) after `since`, oldest first. Raises FeedExpired
+    when events after `since` may have been compacted away.
+    """
+    horizon = watermark()
+    if since < horizon:
+        raise FeedExpired(horizon)
+
+    queryset = ChangeEvent.objects.filter(seq__gt=since)
+    if entities:
+        queryset = queryset.filter(entity__in=entities)
+
+    events = list(queryset.order_by("seq")[:limit + 1])
+    return events[:limit], len(events) > limit
+
+
+def as_dict(event):
+    return {
+        "seq": event.seq,
+        "entity": event.entity,
+        "id": event.entity_id,
+        "action": event.action,
+        "movie_id": event.movie_id,
+        "user_id": event.user_id,
+        "at": event.created_at,
+    }
+
+
+def latest_seq():
+    """Position of the newest served event"""
+    return ChangeEvent.objects.aggregate(value=Max("seq"))["value"] or 0
+
+
+# =====================================================
+# COMPACTION
+# =====================================================
+def _delete(ids, chunk_size=1000):
+    for start in range(0, len(ids), chunk_size):
+        ChangeEvent.objects.filter(id__in=ids[start:start + chunk_size]).delete()
+
+
+def compact(retention_days=None):
+    """
+    Drop events superseded by a newer event for the same entity (a
+    consumer that resumes anywhere still gets each entity's last event),
+    then everything older than CHANGE_FEED_RETENTION_DAYS. Only stamped
+    events are touched. Returns the ChangeCompaction run.
+    """
+    if retention_days is None:
+        retention_days = getattr(settings, "CHANGE_FEED_RETENTION_DAYS", 7)
+
+    # Leftovers of a process that died between commit and stamp
+    stamp()
+
+    newer = ChangeEvent.objects.filter(entity=OuterRef("entity"), entity_id=OuterRef("entity_id"), seq__gt=OuterRef("seq"))
+    # Ids first: MySQL cannot DELETE with a subquery on the same table
+    superseded = list(
+        ChangeEvent.objects.filter(seq__isnull=False)
+        .filter(Exists(newer))
+        .values_list("id", flat=True)
+    )
+    _delete(superseded)
+
+    expired = ChangeEvent.objects.filter(
+        seq__isnull=False,
+        created_at__lt=timezone.now() - timedelta(days=retention_days),
+    )
+    horizon = expired.aggregate(value=Max("seq"))["value"]
+
+    count = 0
+    if horizon is not None:
+        # By position, so the watermark is exact even if created_at is not monotonic
+        count, _ = ChangeEvent.objects.filter(seq__lte=horizon).delete()
+
+    return ChangeCompaction.objects.create(
+        watermark=max(horizon or 0, watermark()),
+        superseded=len(superseded),
+        expired=count,
+    )
@@ -0,0 +1,387 @@
+"""
+Duplicate Detection
+The IMDb and TMDB importers key on different ids, so one film can end up
+as several Movie rows. Candidates are blocked on (title token, year) so
+only similar titles are compared, pairs are scored with difflib in a
+process pool and confirmed clusters are merged into one survivor.
+"""
+
+import re
+import unicodedata
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+from movies.models import ArchivedReview, Favorite, Movie, PendingWrite, Review, Watchlist
+from movies.utils.cache_manager import movie_cache
+from . import catalog_stats, change_feed
+
+Record = namedtuple("Record", "id title year runtime imdb_id tmdb_id vote_count")
+
+STOPWORDS = {"the", "a", "an", "and", "of", "in", "on", "to", "la", "le", "les", "el", "der", "die", "das"}
+
+# Movie fields a survivor takes over from a duplicate when its own is empty
+FILL_FIELDS = [
+    "imdb_id",
+    "tmdb_id",
+    "overview",
+    "release_date",
+    "runtime",
+    "poster_path",
+    "backdrop_path",
+]
+
+# Rows that follow the movie, with the fields that make them unique per
+# movie. Models grouped together share that key: a user keeps one review
+# per movie, hot or archived.
+RELATED = [
+    ((Review, ArchivedReview), ["user_id"]),
+    ((Watchlist,), ["user_id"]),
+    ((Favorite,), ["user_id"]),
+    ((PendingWrite,), ["kind", "user_id"]),
+]
+
+FEED_ENTITIES = {
+    Review: change_feed.REVIEW,
+    ArchivedReview: change_feed.REVIEW,
+    Watchlist: change_feed.WATCHLIST,
+    Favorite: change_feed.FAVORITE,
+}
+
+
+# =====================================================
+# NORMALIZATION / BLOCKING
+# =====================================================
+def normalize_title(title):
+    """Lowercase ASCII words: "Amélie (2001)" and "AMELIE" both give "amelie 2001" / "amelie" """
+    title = unicodedata.normalize("NFKD", title or "").encode("ascii", "ignore").decode()
+    title = title.lower().replace("&", " and ")
+    # Catalog style "Matrix, The"
+    title = re.sub(r"^(.*),\s*(the|a|an)$", r"\2 \1", title.strip())
+    return " ".join(re.findall(r"[a-z0-9]+", title))
+
+
+def title_tokens(normalized):
+    tokens = normalized.split()
+    return [token for token in tokens if token not in STOPWORDS] or tokens
+
+
+def blocking_keys(record):
+    """
+    (token, year) keys of the first two significant title tokens. Each
+    record also claims year + 1, so releases a year apart share a block.
+    """
+    years = (record.year, record.year + 1) if record.year else (None,)
+    return {(token, year) for token in title_tokens(record.title)[:2] for year in years}
+
+
+def build_blocks(records):
+    """Groups of records sharing a blocking key; singletons are dropped"""
+    blocks = {}
+    for record in records:
+        for key in blocking_keys(record):
+            blocks.setdefault(key, []).append(record)
+    return [block for block in blocks.values() if len(block) > 1]
+
+
+# =====================================================
+# SCORING
+# =====================================================
+def score(a, b, threshold, matcher=None):
+    """
+    Similarity in [0, 1]; 0 for records that cannot be the same film.
+    Passing the same `matcher` for consecutive comparisons with one `a`
+    indexes a.title only once.
+    """
+    if a.imdb_id and b.imdb_id and a.imdb_id != b.imdb_id:
+        return 0.0
+    if a.tmdb_id and b.tmdb_id and a.tmdb_id != b.tmdb_id:
+        return 0.0
+    if a.year and b.year and abs(a.year - b.year) > 1:
+        return 0.0
+
+    # Upper bound from the lengths alone; the penalties below only lower the score
+    length = len(a.title) + len(b.title)
+    if not length or 2 * min(len(a.title), len(b.title)) / length < threshold:
+        return 0.0
+
+    if a.title == b.title:
+        similarity = 1.0
+    else:
+        matcher = matcher or SequenceMatcher(None, autojunk=False)
+        # No-op when seq2 already is a.title
+        matcher.set_seq2(a.title)
+        matcher.set_seq1(b.title)
+        if matcher.quick_ratio() < threshold:
+            return 0.0
+        similarity = matcher.ratio()
+
+    if a.year != b.year:
+        similarity -= 0.05
+    if a.runtime and b.runtime and abs(a.runtime - b.runtime) > 15:
+        similarity -= 0.1
+    return similarity
+
+
+def compare_block(block, threshold, max_block, window):
+    """
+    Scored pairs (score, id, id) within one block. Blocks above
+    `max_block` records only compare title-sorted neighbours.
+    """
+    if len(block) > max_block:
+        block = sorted(block, key=lambda record: record.title)
+        reach = window
+    else:
+        reach = len(block)
+
+    pairs = []
+    matcher = SequenceMatcher(None, autojunk=False)
+    for index, a in enumerate(block):
+        for b in block[index + 1:index + 1 + reach]:
+            similarity = score(a, b, threshold, matcher)
+            if similarity >= threshold:
+                pairs.append((similarity, min(a.id, b.id), max(a.id, b.id)))
+    return pairs
+
+
+def _compare_blocks(args):
+    blocks, threshold, max_block, window = args
+    return [pair for block in blocks for pair in compare_block(block, threshold, max_block, window)]
+
+
+def find_duplicates(records, threshold=None, workers=None, chunk_size=500):
+    """Best score per matching pair, as [(score, id, id)] best (then lowest ids) first"""
+    threshold = threshold or getattr(settings, "DEDUP_THRESHOLD", 0.92)
+    max_block = getattr(settings, "DEDUP_MAX_BLOCK", 500)
+    window = getattr(settings, "DEDUP_WINDOW", 50)
+
+    blocks = build_blocks(records)
+    jobs = [
+        (blocks[start:start + chunk_size], threshold, max_block, window)
+        for start in range(0, len(blocks), chunk_size)
+    ]
+
+    if workers == 1 or len(jobs) <= 1:
+        results = list(map(_compare_blocks, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_compare_blocks, jobs))
+
+    best = {}
+    for pairs in results:
+        for similarity, a, b in pairs:
+            if similarity > best.get((a, b), 0):
+                best[(a, b)] = similarity
+
+    return sorted(
+        ((similarity, a, b) for (a, b), similarity in best.items()),
+        key=lambda pair: (-pair[0], pair[1], pair[2]),
+    )
+
+
+def cluster(pairs, records):
+    """
+    Union the pairs best first into {survivor id: [duplicate ids]}.
+    Clusters never combine two different IMDb or TMDB ids.
+    """
+    by_id = {record.id: record for record in records}
+    parent = {}
+    ids = {}
+
+    def root(movie_id):
+        while parent.get(movie_id, movie_id) != movie_id:
+            movie_id = parent[movie_id]
+        return movie_id
+
+    def external_ids(movie_id):
+        if movie_id not in ids:
+            record = by_id[movie_id]
+            ids[movie_id] = ({record.imdb_id} - {None, ""}, {record.tmdb_id} - {None})
+        return ids[movie_id]
+
+    for _, a, b in pairs:
+        a, b = root(a), root(b)
+        if a == b:
+            continue
+
+        (imdb_a, tmdb_a), (imdb_b, tmdb_b) = external_ids(a), external_ids(b)
+        if len(imdb_a | imdb_b) > 1 or len(tmdb_a | tmdb_b) > 1:
+            continue
+
+        parent[b] = a
+        ids[a] = (imdb_a | imdb_b, tmdb_a | tmdb_b)
+
+    groups = {}
+    for movie_id in parent:
+        groups.setdefault(root(movie_id), {root(movie_id)}).add(movie_id)
+
+    clusters = {}
+    for members in groups.values():
+        # Prefer the record with both external ids, then the most votes, then the oldest
+        ranked = sorted(
+            (by_id[movie_id] for movie_id in members),
+            key=lambda record: (-bool(record.imdb_id) - bool(record.tmdb_id), -record.vote_count, record.id),
+        )
+        clusters[ranked[0].id] = sorted(record.id for record in ranked[1:])
+    return clusters
+
+
+# =====================================================
+# LOADING
+# =====================================================
+def load_records(chunk_size=5000):
+    records = []
+    rows = Movie.objects.order_by().values_list(
+        "id", "title", "release_date", "runtime", "imdb_id", "tmdb_id", "vote_count"
+    )
+    for movie_id, title, release_date, runtime, imdb_id, tmdb_id, vote_count in rows.iterator(chunk_size=chunk_size):
+        records.append(Record(
+            movie_id,
+            normalize_title(title),
+            release_date.year if release_date else None,
+            runtime or 0,
+            imdb_id or None,
+            tmdb_id,
+            vote_count or 0,
+        ))
+    return records
+
+
+# =====================================================
+# MERGE
+# =====================================================
+def _chunks(items, size=500):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _redirect(model, target):
+    """UPDATE movie_id = CASE ... for every duplicate, a chunk at a time"""
+    for chunk in _chunks(sorted(target.items())):
+        model.objects.filter(movie_id__in=[duplicate for duplicate, _ in chunk]).update(
+            movie_id=Case(*[When(movie_id=duplicate, then=Value(survivor)) for duplicate, survivor in chunk])
+        )
+
+
+def _reassign(models, key_fields, target):
+    """
+    Move rows to the survivor. Where the user already has one on the
+    survivor (or on an earlier duplicate), in any of `models`, the extra
+    rows are deleted.
+    """
+    movie_ids = [*target, *set(target.values())]
+    rows = [
+        (row_id, movie_id, model, key)
+        for model in models
+        for row_id, movie_id, *key in model.objects.filter(movie_id__in=movie_ids).values_list("id", "movie_id", *key_fields)
+    ]
+
+    kept = set()
+    conflicts = {model: [] for model in models}
+    moved = {model: [] for model in models}
+    # Survivor rows first, then duplicates oldest first
+    for row_id, movie_id, model, key in sorted(rows, key=lambda row: (row[1] in target, row[0])):
+        owner = (target.get(movie_id, movie_id), *key)
+        if owner in kept:
+            conflicts[model].append(row_id)
+        else:
+            kept.add(owner)
+            if movie_id in target:
+                moved[model].append((row_id, target[movie_id], dict(zip(key_fields, key))["user_id"]))
+
+    for model in models:
+        _move(model, target, movie_ids, conflicts[model], moved[model])
+
+    return sum(len(row_ids) for row_ids in conflicts.values())
+
+
+def _move(model, target, movie_ids, conflicts, moved):
+    """Delete one model's conflicting rows and redirect the rest"""
+    # Queryset delete sends the per-row signals (statistics, caches)
+    if conflicts:
+        model.objects.filter(id__in=conflicts).delete()
+
+    if model in catalog_stats.REVIEW_MODELS:
+        ratings = {}
+        for movie_id, rating in model.objects.filter(movie_id__in=list(target)).values_list("movie_id", "rating"):
+            for key, change in catalog_stats.rating_delta((movie_id, rating), (target[movie_id], rating)).items():
+                ratings[key] = ratings.get(key, 0) + change
+
+        # update() sends no signals, so diff the statistics around it
+        before = catalog_stats.load_states(movie_ids)
+        _redirect(model, target)
+        catalog_stats.add_deltas(catalog_stats.states_delta(before, catalog_stats.load_states(movie_ids)), ratings)
+    else:
+        _redirect(model, target)
+
+    # update() sends no signals either
+    if model in FEED_ENTITIES:
+        change_feed.record(FEED_ENTITIES[model], change_feed.UPSERT, moved)
+
+
+def _merge_genres(target):
+    Through = Movie.genres.through
+    links = Through.objects.filter(movie_id__in=[*target, *set(target.values())]).values_list("movie_id", "genre_id")
+
+    existing = set()
+    wanted = set()
+    for movie_id, genre_id in links:
+        if movie_id in target:
+            wanted.add((target[movie_id], genre_id))
+        else:
+            existing.add((movie_id, genre_id))
+
+    pairs = wanted - existing
+    Through.objects.bulk_create(
+        [Through(movie_id=movie_id, genre_id=genre_id) for movie_id, genre_id in pairs],
+        ignore_conflicts=True,
+    )
+    catalog_stats.genre_links_changed(pairs, 1)
+
+
+def _merge_fields(clusters):
+    """Fill the survivors' empty fields from their duplicates, then delete those"""
+    movies = Movie.objects.in_bulk([*clusters, *(d for duplicates in clusters.values() for d in duplicates)])
+
+    updates = {}
+    for survivor_id, duplicate_ids in clusters.items():
+        survivor = movies[survivor_id]
+        for duplicate_id in duplicate_ids:
+            for field in FILL_FIELDS:
+                value = getattr(movies[duplicate_id], field)
+                if getattr(survivor, field) in (None, "", 0) and value not in (None, "", 0):
+                    setattr(survivor, field, value)
+                    updates.setdefault(survivor_id, set()).add(field)
+
+    # Duplicates go first: their imdb_id / tmdb_id are unique
+    Movie.objects.filter(id__in=[d for duplicates in clusters.values() for d in duplicates]).delete()
+
+    for survivor_id, fields in updates.items():
+        movies[survivor_id].save(update_fields=[*sorted(fields), "updated_at"])
+
+
+def merge(clusters, batch_size=200):
+    """Merge {survivor id: [duplicate ids]}; one transaction per batch"""
+    stats = {"merged": 0, "conflicts": 0}
+    items = sorted(clusters.items())
+
+    for batch in _chunks(items, batch_size):
+        batch = dict(batch)
+        target = {duplicate: survivor for survivor, duplicates in batch.items() for duplicate in duplicates}
+
+        with transaction.atomic():
+            for models, key_fields in RELATED:
+                stats["conflicts"] += _reassign(models, key_fields, target)
+            _merge_genres(target)
+            _merge_fields(batch)
+            # Survivors gained reviews / genres; duplicates got tombstones on delete
+            change_feed.record_movies(change_feed.UPSERT, list(batch))
+
+        movie_cache.invalidate(batch)
+        stats["merged"] += len(target)
+
+    return stats
@@ -0,0 +1,366 @@
+"""
+Image Pipeline
+Poster / backdrop sources are fetched once into local storage. Resized
+WebP / JPEG derivatives are rendered in a process pool and named after
+the source content hash, so clients can cache them forever.
+Rendering needs the optional Pillow package.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import product
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # optional, rendering is disabled without it
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (92, 185, 342, 500, 780)
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+NAME_PATTERN = re.compile(r"^([0-9a-f]{32})-(\d+)\.(webp|jpg)$")
+
+
+class ImageUnavailable(Exception):
+    """The source image could not be fetched or rendered"""
+
+
+# =====================================================
+# SETTINGS
+# =====================================================
+def storage_dir():
+    return Path(getattr(settings, "IMAGE_STORAGE_DIR", Path(settings.BASE_DIR) / "var" / "images"))
+
+
+def widths():
+    return tuple(sorted(getattr(settings, "IMAGE_WIDTHS", DEFAULT_WIDTHS)))
+
+
+def available():
+    return Image is not None
+
+
+def formats():
+    """Output formats this Pillow build can write, preferred first"""
+    if not available():
+        return []
+    return ["webp", "jpeg"] if features.check("webp") else ["jpeg"]
+
+
+def bucket_width(requested, buckets=None):
+    """Smallest bucket at least `requested` wide (the largest otherwise)"""
+    buckets = buckets or widths()
+    for width in buckets:
+        if width >= requested:
+            return width
+    return buckets[-1]
+
+
+def negotiate_format(accept):
+    """WebP for clients that accept it, JPEG for everyone else"""
+    supported = formats()
+    if "webp" in supported and "image/webp" in (accept or ""):
+        return "webp"
+    return "jpeg"
+
+
+def source_hosts():
+    return set(getattr(settings, "IMAGE_SOURCE_HOSTS", ("image.tmdb.org",)))
+
+
+def allowed_source(url):
+    """
+    Poster / backdrop values are user-writable, so only URLs on
+    IMAGE_SOURCE_HOSTS are ever fetched (no internal hosts)
+    """
+    parts = urlsplit(url)
+    return parts.scheme in ("http", "https") and (parts.hostname or "").lower() in source_hosts()
+
+
+def source_url(path):
+    """Absolute URL for a stored poster / backdrop value (TMDB stores bare paths)"""
+    if not path:
+        return None
+    if path.startswith(("http://", "https://")):
+        return path
+
+    base = getattr(settings, "IMAGE_SOURCE_BASE_URL", None)
+    if not base:
+        return None
+    return f"{base.rstrip('/')}/{path.lstrip('/')}"
+
+
+# =====================================================
+# STORAGE
+# =====================================================
+def _shard(directory, name):
+    return storage_dir() / directory / name[:2] / name
+
+
+def alias_path(url):
+    return _shard("urls", hashlib.sha1(url.encode()).hexdigest())
+
+
+def source_path(digest):
+    return _shard("sources", digest)
+
+
+def derivative_name(digest, width, fmt):
+    return f"{digest}-{width}.{EXTENSIONS[fmt]}"
+
+
+def derivative_path(name):
+    return _shard("derived", name)
+
+
+def parse_derivative_name(name):
+    """(digest, width, format) for a derivative file name, or None"""
+    match = NAME_PATTERN.match(name)
+    if match is None:
+        return None
+    digest, width, extension = match.groups()
+    return digest, int(width), "webp" if extension == "webp" else "jpeg"
+
+
+def _write(path, content):
+    # Write then rename, so readers never see a partial file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Fetch threads of one process may write the same content at once
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temporary.write_bytes(content)
+    os.replace(temporary, path)
+
+
+def touch(path):
+    """Mark a file as recently used for the LRU quota (at most hourly)"""
+    interval = getattr(settings, "IMAGE_TOUCH_INTERVAL", 3600)
+    try:
+        if time.time() - path.stat().st_mtime > interval:
+            os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+# =====================================================
+# FETCH
+# =====================================================
+def stored_source(url):
+    """Digest of the stored source for `url`, or None if it was never fetched"""
+    try:
+        digest = alias_path(url).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+    if not source_path(digest).exists():
+        return None
+    touch(source_path(digest))
+    return digest
+
+
+def fetch_source(url):
+    """
+    Store the image at `url` and return its content digest. A URL is
+    downloaded only once; later calls are answered from the alias file.
+    Redirects are not followed, so the host check cannot be bypassed.
+    """
+    digest = stored_source(url)
+    if digest is not None:
+        return digest
+
+    if not allowed_source(url):
+        raise ImageUnavailable(f"{url} is not on an allowed image host")
+
+    max_bytes = getattr(settings, "IMAGE_MAX_SOURCE_BYTES", 20 * 1024 * 1024)
+    timeout = getattr(settings, "IMAGE_FETCH_TIMEOUT", 10)
+
+    try:
+        with requests.get(url, timeout=timeout, stream=True, allow_redirects=False) as response:
+            response.raise_for_status()
+            if response.status_code != 200:
+                raise ImageUnavailable(f"{url} answered {response.status_code}")
+            if not response.headers.get("Content-Type", "").startswith("image/"):
+                raise ImageUnavailable(f"{url} is not an image")
+
+            content = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                content += chunk
+                if len(content) > max_bytes:
+                    raise ImageUnavailable(f"{url} is larger than {max_bytes} bytes")
+    except requests.RequestException as e:
+        raise ImageUnavailable(f"Could not fetch {url}: {e}")
+
+    digest = hashlib.sha256(content).hexdigest()[:32]
+    if not source_path(digest).exists():
+        _write(source_path(digest), bytes(content))
+    _write(alias_path(url), digest.encode())
+
+    return digest
+
+
+# =====================================================
+# RENDER
+# =====================================================
+def render(source, destination, width, fmt):
+    """Resize `source` to `width` (never upscaled) and write it as `fmt`"""
+    with Image.open(source) as image:
+        # JPEG sources can be decoded at a reduced scale directly
+        image.draft("RGB", (width, width * image.height // max(image.width, 1)))
+        image = ImageOps.exif_transpose(image)
+
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        if fmt == "webp":
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            image.save(buffer, "WEBP", quality=80, method=4)
+        else:
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            image.save(buffer, "JPEG", quality=82, optimize=True, progressive=True)
+
+    _write(Path(destination), buffer.getvalue())
+    return destination
+
+
+def _render_job(job):
+    """Pool entry point: returns the error instead of raising, so one bad source does not stop the run"""
+    try:
+        render(*job)
+    except (OSError, ValueError) as e:
+        return f"Could not render {Path(job[0]).name}: {e}"
+    return None
+
+
+def ensure_derivative(digest, width, fmt):
+    """Path of the derivative, rendered in this process if it is missing"""
+    path = derivative_path(derivative_name(digest, width, fmt))
+    if path.exists():
+        touch(path)
+        return path
+
+    if not available():
+        raise ImageUnavailable("Image processing requires Pillow")
+
+    source = source_path(digest)
+    if not source.exists():
+        raise ImageUnavailable("Source image is not stored")
+
+    try:
+        return render(source, path, width, fmt)
+    except (OSError, ValueError) as e:
+        raise ImageUnavailable(f"Could not render {source.name}: {e}")
+
+
+def process(urls, sizes=None, output_formats=None, workers=None, fetch_workers=8):
+    """
+    Fetch every source (threads, network bound) and render the missing
+    derivatives (processes, CPU bound). Sources that fail to fetch or
+    decode are logged and counted as failed. Returns counters.
+    """
+    sizes = sizes or widths()
+    output_formats = output_formats or formats()
+    stats = {"sources": 0, "failed": 0, "rendered": 0, "existing": 0}
+
+    digests = set()
+    with ThreadPoolExecutor(max_workers=fetch_workers) as pool:
+        futures = {pool.submit(fetch_source, url): url for url in set(urls)}
+        for future in as_completed(futures):
+            try:
+                digests.add(future.result())
+                stats["sources"] += 1
+            except ImageUnavailable as e:
+                logger.warning(str(e))
+                stats["failed"] += 1
+
+    if not available():
+        return stats
+
+    jobs = []
+    for digest, width, fmt in product(sorted(digests), sizes, output_formats):
+        path = derivative_path(derivative_name(digest, width, fmt))
+        if path.exists():
+            stats["existing"] += 1
+        else:
+            jobs.append((source_path(digest), path, width, fmt))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for error in pool.map(_render_job, jobs, chunksize=8):
+                if error:
+                    logger.warning(error)
+                    stats["failed"] += 1
+                else:
+                    stats["rendered"] += 1
+
+    return stats
+
+
+def catalog_urls():
+    """Source URLs of every poster and backdrop in the catalog"""
+    from movies.models import Movie
+
+    urls = set()
+    for poster, backdrop in Movie.objects.values_list("poster_path", "backdrop_path").iterator():
+        urls.update(url for url in (source_url(poster), source_url(backdrop)) if url)
+    return urls
+
+
+def process_catalog(workers=None, fetch_workers=8):
+    """Bring the whole catalog's images up to date, then apply the quota (even if that failed)"""
+    stats = {}
+    try:
+        stats.update(process(catalog_urls(), workers=workers, fetch_workers=fetch_workers))
+    finally:
+        stats["evicted"], stats["bytes"] = enforce_quota()
+    return stats
+
+
+# =====================================================
+# QUOTA
+# =====================================================
+def enforce_quota(max_bytes=None):
+    """
+    Delete least recently used sources / derivatives until the store is
+    below 90% of IMAGE_STORAGE_MAX_BYTES. Evicted files are fetched or
+    rendered again on their next use. Returns (files removed, bytes used).
+    """
+    max_bytes = max_bytes or getattr(settings, "IMAGE_STORAGE_MAX_BYTES", 1024 ** 3)
+
+    files = []
+    for directory in ("sources", "derived"):
+        for path in (storage_dir() / directory).glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+    used = sum(size for _, size, _ in files)
+    if used <= max_bytes:
+        return 0, used
+
+    removed = 0
+    for _, size, path in sorted(files, key=lambda item: item[0]):
+        if used <= max_bytes * 0.9:
+            break
+        path.unlink(missing_ok=True)
+        used -= size
+        removed += 1
+
+    return removed, used
@@ -7,4 +7,9 @@ class IMDBService:
     def fetch_titles(self):
         response = requests.get(self.BASE_URL)
         response.raise_for_status()
-        return response.json()
\ No newline at end of file
+        return response.json()
+
+    def get_title(self, imdb_id):
+        response = requests.get(f"{self.BASE_URL}/{imdb_id}", timeout=10)
+        response.raise_for_status()
+        return response.json()
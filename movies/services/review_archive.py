@@ -0,0 +1,65 @@
+"""
+Review Archive
+Reviews older than REVIEW_ARCHIVE_AFTER_DAYS are moved in batches from
+movies_review to ArchivedReview, so the hot table (and its indexes) stay
+small. CatalogStat and MovieRatingCount count both tables, so a move
+changes no totals and the review signals are muted for it.
+"""
+
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from movies.models import ArchivedReview, Review
+
+FIELDS = ("id", "movie_id", "user_id", "rating", "comment", "created_at", "updated_at")
+
+_moving = threading.local()
+
+
+def moving():
+    """True while this thread deletes reviews it has just archived"""
+    return getattr(_moving, "active", False)
+
+
+def cutoff(older_than_days=None):
+    if older_than_days is None:
+        older_than_days = getattr(settings, "REVIEW_ARCHIVE_AFTER_DAYS", 730)
+    return timezone.now() - timedelta(days=older_than_days)
+
+
+def archive_batch(before, batch_size=1000):
+    """Move up to `batch_size` of the oldest reviews created before `before`"""
+    with transaction.atomic():
+        queryset = Review.objects.filter(created_at__lt=before).order_by("created_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+
+        rows = list(queryset.values_list(*FIELDS)[:batch_size])
+        if not rows:
+            return 0
+
+        ArchivedReview.objects.bulk_create([ArchivedReview(**dict(zip(FIELDS, row))) for row in rows])
+
+        _moving.active = True
+        try:
+            Review.objects.filter(id__in=[row[0] for row in rows]).delete()
+        finally:
+            _moving.active = False
+
+    return len(rows)
+
+
+def archive_reviews(older_than_days=None, batch_size=1000):
+    """Archive every review older than the cutoff; one transaction per batch"""
+    before = cutoff(older_than_days)
+    moved = 0
+
+    while True:
+        count = archive_batch(before, batch_size)
+        moved += count
+        if count < batch_size:
+            return moved
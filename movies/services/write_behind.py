@@ -0,0 +1,212 @@
+"""
+Write-Behind Queue
+With WRITE_BEHIND_ENABLED, review and watchlist writes are validated in
+the request, stored in PendingWrite and acknowledged with 202. A worker
+applies them in batches and updates the aggregates once per movie.
+
+Consistency: eventual. A queued write becomes visible after the next
+worker pass; `lag_seconds` in status() is how far behind that is.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from movies.models import ArchivedReview, PendingWrite, Review, Watchlist
+from movies.utils import metrics
+from movies.utils.cache_manager import movie_cache
+from . import change_feed
+from .catalog_stats import reviews_changed
+
+logger = logging.getLogger(__name__)
+
+LAST_APPLIED_KEY = "write_behind:last_applied_at"
+
+
+def enabled():
+    return getattr(settings, "WRITE_BEHIND_ENABLED", False)
+
+
+# =====================================================
+# QUEUE
+# =====================================================
+def enqueue(kind, user_id, movie_id, payload=None):
+    """
+    Store a validated write. Returns False if the same write is
+    already queued (one per kind, user and movie).
+    """
+    try:
+        with transaction.atomic():
+            PendingWrite.objects.create(
+                kind=kind, user_id=user_id, movie_id=movie_id, payload=payload or {}
+            )
+    except IntegrityError:
+        return False
+
+    metrics.incr(f"write_behind.queued.{kind}")
+    return True
+
+
+def is_queued(kind, user_id, movie_id):
+    return PendingWrite.objects.filter(kind=kind, user_id=user_id, movie_id=movie_id).exists()
+
+
+# =====================================================
+# WORKER
+# =====================================================
+def _claim(batch_size):
+    """Lock the oldest batch; other workers skip it where supported"""
+    queryset = PendingWrite.objects.order_by("id")
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    return list(queryset[:batch_size])
+
+
+def _apply_reviews(writes):
+    existing = set()
+    for model in (Review, ArchivedReview):
+        existing.update(
+            model.objects.filter(
+                movie_id__in={write.movie_id for write in writes},
+                user_id__in={write.user_id for write in writes},
+            ).values_list("movie_id", "user_id")
+        )
+
+    reviews = [
+        Review(
+            movie_id=write.movie_id,
+            user_id=write.user_id,
+            rating=write.payload["rating"],
+            comment=write.payload.get("comment"),
+        )
+        for write in writes
+        if (write.movie_id, write.user_id) not in existing
+    ]
+
+    reviews = _insert_reviews(reviews)
+
+    # bulk_create sends no signals: one coalesced stats update per batch
+    reviews_changed([(None, (review.movie_id, review.rating)) for review in reviews])
+    movie_cache.invalidate({review.movie_id for review in reviews})
+    _record(Review, change_feed.REVIEW, {(review.movie_id, review.user_id) for review in reviews})
+
+    return len(reviews)
+
+
+def _insert_reviews(reviews):
+    """
+    The reviews actually inserted. A pair written through another path
+    since the check above conflicts; the batch then falls back to one
+    insert per review, so only that review is skipped, not the batch.
+    """
+    try:
+        with transaction.atomic():
+            Review.objects.bulk_create(reviews)
+        return reviews
+    except IntegrityError:
+        pass
+
+    inserted = []
+    for review in reviews:
+        try:
+            with transaction.atomic():
+                Review.objects.bulk_create([review])
+        except IntegrityError:
+            continue
+        inserted.append(review)
+
+    return inserted
+
+
+def _apply_watchlist(writes):
+    existing = set(
+        Watchlist.objects.filter(
+            movie_id__in={write.movie_id for write in writes},
+            user_id__in={write.user_id for write in writes},
+        ).values_list("movie_id", "user_id")
+    )
+    pairs = {(write.movie_id, write.user_id) for write in writes} - existing
+
+    # Still ignore conflicts: a concurrent request may add the same entry
+    Watchlist.objects.bulk_create(
+        [Watchlist(user_id=user_id, movie_id=movie_id) for movie_id, user_id in pairs],
+        ignore_conflicts=True,
+    )
+    _record(Watchlist, change_feed.WATCHLIST, pairs)
+    return len(pairs)
+
+
+def _record(model, entity, pairs):
+    """Change events for bulk-created rows (ids are not returned on every backend)"""
+    if not pairs:
+        return
+    rows = model.objects.filter(
+        movie_id__in={movie_id for movie_id, _ in pairs},
+        user_id__in={user_id for _, user_id in pairs},
+    ).values_list("id", "movie_id", "user_id")
+    change_feed.record(entity, change_feed.UPSERT, [row for row in rows if row[1:] in pairs])
+
+
+APPLIERS = {
+    PendingWrite.KIND_REVIEW: _apply_reviews,
+    PendingWrite.KIND_WATCHLIST: _apply_watchlist,
+}
+
+
+def apply_pending_writes(batch_size=None, max_batches=None):
+    """Drain the queue in batches; returns {"applied", "skipped", "batches"}"""
+    batch_size = batch_size or getattr(settings, "WRITE_BEHIND_BATCH_SIZE", 500)
+    totals = {"applied": 0, "skipped": 0, "batches": 0}
+
+    while max_batches is None or totals["batches"] < max_batches:
+
+        with transaction.atomic():
+            batch = _claim(batch_size)
+            if not batch:
+                break
+
+            by_kind = {}
+            for write in batch:
+                by_kind.setdefault(write.kind, []).append(write)
+
+            applied = sum(APPLIERS[kind](writes) for kind, writes in by_kind.items())
+
+            PendingWrite.objects.filter(id__in=[write.id for write in batch]).delete()
+
+        totals["applied"] += applied
+        totals["skipped"] += len(batch) - applied
+        totals["batches"] += 1
+
+        metrics.incr("write_behind.applied", applied)
+        if len(batch) > applied:
+            # e.g. the user reviewed the movie through another path meanwhile
+            metrics.incr("write_behind.skipped", len(batch) - applied)
+
+        cache.set(LAST_APPLIED_KEY, time.time(), None)
+
+    if totals["batches"]:
+        logger.info("Applied %(applied)d pending writes in %(batches)d batches", totals)
+
+    return totals
+
+
+# =====================================================
+# STATUS
+# =====================================================
+def status():
+    """Queue depth and lag for the metrics endpoint"""
+    pending = PendingWrite.objects.count()
+    oldest = PendingWrite.objects.order_by("id").values_list("created_at", flat=True).first()
+    last_applied = cache.get(LAST_APPLIED_KEY)
+
+    return {
+        "enabled": enabled(),
+        "consistency": "eventual" if enabled() else "immediate",
+        "pending": pending,
+        "lag_seconds": round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0,
+        "last_applied_seconds_ago": round(time.time() - last_applied, 1) if last_applied else None,
+    }
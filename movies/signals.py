@@ -0,0 +1,179 @@
+"""
+Model signal handlers for the movies app
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user, revoke_user_tokens
+from .models import ArchivedReview, Favorite, Genre, Movie, Review, Watchlist
+from .services import catalog_stats, change_feed, review_archive
+from .utils.cache_manager import genre_cache, movie_cache
+
+
+# =====================================================
+# AUTH CACHE
+# =====================================================
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+    # Stateless tokens outlive the row, so deactivation must deny them
+    if not instance.is_active:
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    revoke_user_tokens(instance.pk)
+
+
+# =====================================================
+# GENRE TAXONOMY
+# =====================================================
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, **kwargs):
+    genre_cache.invalidate()
+
+
+# =====================================================
+# CATALOG STATISTICS
+# =====================================================
+@receiver(post_delete, sender=Genre)
+def genre_stats_deleted(sender, instance, **kwargs):
+    catalog_stats.genre_deleted(instance.pk)
+
+
+@receiver(pre_save, sender=Movie)
+def movie_stats_before_save(sender, instance, raw=False, **kwargs):
+    if not raw and instance.pk is not None:
+        instance._stats_previous = catalog_stats.load_states([instance.pk]).get(instance.pk)
+
+
+@receiver(post_save, sender=Movie)
+def movie_stats_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        catalog_stats.movie_saved(instance, instance.__dict__.pop("_stats_previous", None))
+
+
+@receiver(pre_delete, sender=Movie)
+def movie_stats_before_delete(sender, instance, **kwargs):
+    instance._stats_previous = catalog_stats.load_states([instance.pk]).get(instance.pk)
+    catalog_stats.movie_deleting(instance.pk)
+
+
+@receiver(post_delete, sender=Movie)
+def movie_stats_deleted(sender, instance, **kwargs):
+    catalog_stats.movie_deleted(instance.pk, instance.__dict__.pop("_stats_previous", None))
+
+
+@receiver(pre_save, sender=Review)
+def review_stats_before_save(sender, instance, raw=False, **kwargs):
+    if not raw and instance.pk is not None:
+        instance._stats_previous = (
+            Review.objects.filter(pk=instance.pk).values_list("movie_id", "rating").first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def review_stats_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        catalog_stats.review_changed(
+            instance.__dict__.pop("_stats_previous", None),
+            (instance.movie_id, instance.rating),
+        )
+
+
+@receiver(post_delete, sender=Review)
+def review_stats_deleted(sender, instance, **kwargs):
+    # Archived reviews keep counting
+    if not review_archive.moving():
+        catalog_stats.review_changed((instance.movie_id, instance.rating), None)
+
+
+@receiver(post_delete, sender=ArchivedReview)
+def archived_review_stats_deleted(sender, instance, **kwargs):
+    catalog_stats.review_changed((instance.movie_id, instance.rating), None)
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+def genre_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Statistics and cached movies for changed genre links. Links are only
+    known for sure around the write: post_add gets the ids actually
+    inserted, removals are read before they happen
+    """
+    if action in ("pre_remove", "pre_clear"):
+        Through = Movie.genres.through
+        links = Through.objects.filter(**{"genre_id" if reverse else "movie_id": instance.pk})
+        if pk_set:
+            links = links.filter(**{"movie_id__in" if reverse else "genre_id__in": pk_set})
+        instance._stats_unlinked = list(links.values_list("movie_id", "genre_id"))
+
+    elif action == "post_add":
+        pairs = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+        catalog_stats.genre_links_changed(pairs, 1)
+        movie_cache.invalidate({movie_id for movie_id, _ in pairs})
+        change_feed.record_movies(change_feed.UPSERT, sorted({movie_id for movie_id, _ in pairs}))
+
+    elif action in ("post_remove", "post_clear"):
+        pairs = instance.__dict__.pop("_stats_unlinked", [])
+        catalog_stats.genre_links_changed(pairs, -1)
+        movie_cache.invalidate({movie_id for movie_id, _ in pairs})
+        change_feed.record_movies(change_feed.UPSERT, sorted({movie_id for movie_id, _ in pairs}))
+
+
+# =====================================================
+# MOVIE REPRESENTATION CACHE
+# =====================================================
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+def movie_cache_changed(sender, instance, **kwargs):
+    movie_cache.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=ArchivedReview)
+def movie_cache_review_changed(sender, instance, **kwargs):
+    # Review count and average rating are part of the representation
+    if not review_archive.moving():
+        movie_cache.invalidate([instance.movie_id])
+
+
+# =====================================================
+# CHANGE FEED
+# =====================================================
+CHANGE_FEED_ENTITIES = {
+    Movie: change_feed.MOVIE,
+    Genre: change_feed.GENRE,
+    Review: change_feed.REVIEW,
+    # Archiving is not a change; deleting the archived row is
+    ArchivedReview: change_feed.REVIEW,
+    Watchlist: change_feed.WATCHLIST,
+    Favorite: change_feed.FAVORITE,
+}
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Watchlist)
+@receiver(post_save, sender=Favorite)
+def change_feed_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        change_feed.record_instance(CHANGE_FEED_ENTITIES[sender], change_feed.UPSERT, instance)
+
+
+@receiver(post_delete, sender=Movie)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=ArchivedReview)
+@receiver(post_delete, sender=Watchlist)
+@receiver(post_delete, sender=Favorite)
+def change_feed_deleted(sender, instance, **kwargs):
+    if not review_archive.moving():
+        change_feed.record_instance(CHANGE_FEED_ENTITIES[sender], change_feed.DELETE, instance)
@@ -0,0 +1,79 @@
+"""
+Test the admin changelists for large tables
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError
+from django.test import Client, override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from movies.models import Genre, Movie
+from movies.pagination import EstimatedCountPaginator
+
+
+# =====================================================
+# DATABASE (a throwaway test database, skipped when none is reachable)
+# =====================================================
+@pytest.fixture(scope="module")
+def database():
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    try:
+        old_config = runner.setup_databases()
+    except (ImproperlyConfigured, DatabaseError) as e:
+        pytest.skip(f"No test database: {e}")
+
+    setup_test_environment()
+    cache.clear()
+    yield
+    teardown_test_environment()
+    runner.teardown_databases(old_config)
+
+
+@pytest.fixture
+def admin_client(database):
+    client = Client()
+    client.force_login(User.objects.get_or_create(username="admin", is_staff=True, is_superuser=True)[0])
+    return client
+
+
+def _titles(response):
+    return sorted(movie.title for movie in response.context["cl"].result_list)
+
+
+def test_genre_filter(admin_client):
+    drama = Genre.objects.create(name="Drama")
+    Movie.objects.create(title="Heat").genres.add(drama)
+    Movie.objects.create(title="Ronin")
+
+    response = admin_client.get("/admin/movies/movie/", {"genre": drama.id})
+    assert response.status_code == 200
+    assert _titles(response) == ["Heat"]
+
+    # Hand-edited query strings do not reach the ORM
+    response = admin_client.get("/admin/movies/movie/", {"genre": "drama"})
+    assert response.status_code == 200
+    assert _titles(response) == []
+
+
+def test_filtered_counts_stop_at_the_limit(database):
+    for i in range(5):
+        Movie.objects.create(title=f"Counted {i}")
+
+    queryset = Movie.objects.filter(title__startswith="Counted").order_by("id")
+    with override_settings(ADMIN_COUNT_LIMIT=3):
+        assert EstimatedCountPaginator(queryset, 2).count == 3
+    assert EstimatedCountPaginator(queryset, 2).count == 5
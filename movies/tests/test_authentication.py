@@ -0,0 +1,95 @@
+"""
+Test JWT authentication from token claims and the token denylist
+"""
+
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from movies import authentication
+from movies.authentication import (
+    USER_CACHE_KEY,
+    CachedJWTAuthentication,
+    CachedTokenUser,
+    revoke_token,
+    revoke_user_tokens,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _authenticate(token):
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+    return CachedJWTAuthentication().authenticate(request)
+
+
+def test_user_is_resolved_from_claims():
+    token = AccessToken.for_user(User(id=7, username="alice"))
+    # The full user comes from the cache, not the database
+    cache.set(USER_CACHE_KEY.format(7), User(id=7, username="alice", is_staff=True))
+
+    user, validated = _authenticate(token)
+
+    assert isinstance(user, CachedTokenUser)
+    # simplejwt keeps the id claim as a string
+    assert (user.id, user.pk) == ("7", "7")
+    assert user.username == "alice"
+    assert user.is_staff
+
+
+def test_revoked_tokens_are_rejected():
+    token = AccessToken.for_user(User(id=7))
+    other = AccessToken.for_user(User(id=7))
+
+    revoke_token(token)
+
+    with pytest.raises(AuthenticationFailed):
+        _authenticate(token)
+    assert _authenticate(other)[0].id == "7"
+
+
+def test_revoking_a_user_rejects_earlier_tokens_only(monkeypatch):
+    earlier = AccessToken.for_user(User(id=7))
+    earlier["iat"] -= 120
+
+    # Revoked a minute ago, between the two tokens
+    now = time.time()
+    monkeypatch.setattr(authentication, "time", SimpleNamespace(time=lambda: now - 60))
+    revoke_user_tokens(7)
+    later = AccessToken.for_user(User(id=7))
+
+    with pytest.raises(AuthenticationFailed):
+        _authenticate(earlier)
+    assert _authenticate(later)[0].id == "7"
+    assert _authenticate(AccessToken.for_user(User(id=8)))[0].id == "8"
+
+
+def test_schema_documents_bearer_auth():
+    from movies.utils import schema_cache
+
+    schema = json.loads(schema_cache.render_schema())
+
+    assert schema["components"]["securitySchemes"]["jwtAuth"] == {
+        "type": "http", "scheme": "bearer", "bearerFormat": "JWT",
+    }
@@ -0,0 +1,31 @@
+"""
+Test catalog export parameters
+"""
+
+import os
+import sys
+import warnings
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from movies.exporters.catalog_exporter import parse_since
+
+
+def test_parse_since():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+
+        # Naive values are UTC
+        assert parse_since("2020-01-02") == datetime(2020, 1, 2, tzinfo=timezone.utc)
+        assert parse_since("2020-01-02T10:30:00") == datetime(2020, 1, 2, 10, 30, tzinfo=timezone.utc)
+        assert parse_since("2020-01-02T10:30:00+02:00") == datetime(2020, 1, 2, 8, 30, tzinfo=timezone.utc)
+
+    with pytest.raises(ValueError):
+        parse_since("yesterday")
@@ -0,0 +1,187 @@
+"""
+Test catalog statistics deltas
+"""
+
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, transaction
+from django.test.runner import DiscoverRunner
+from django.utils import timezone
+
+from movies.models import CatalogStat, Genre, Movie, MovieRatingCount, Review
+from movies.services import catalog_stats, review_archive
+from movies.services.catalog_stats import (
+    MovieState,
+    merge_deltas,
+    movie_delta,
+    review_delta,
+    runtime_bucket,
+)
+
+
+def test_runtime_buckets():
+    assert runtime_bucket(0) is None
+    assert runtime_bucket(29) == 0
+    assert runtime_bucket(95) == 90
+    assert runtime_bucket(400) == 180
+
+
+def test_movie_delta_moves_between_buckets():
+    old = MovieState(date(2001, 1, 1), 95, 7.0, (1,), 2, 15)
+    new = old._replace(release_date=date(2002, 1, 1))
+
+    delta = movie_delta(old, new)
+
+    assert delta[("year", 2001)]["movie_count"] == -1
+    assert delta[("year", 2001)]["rating_sum"] == -15
+    assert delta[("year", 2002)]["movie_count"] == 1
+    assert not any(delta[("genre", 1)].values())
+
+
+def test_deltas_coalesce():
+    state = MovieState(None, 0, 5.0, (3,), 0, 0)
+
+    delta = merge_deltas(review_delta(state, 1, 8), review_delta(state, 1, 6))
+    merge_deltas(delta, review_delta(state, -1, -8))
+
+    assert delta == {("genre", 3): {
+        "movie_count": 0, "vote_average_sum": 0, "runtime_sum": 0,
+        "review_count": 1, "rating_sum": 6,
+    }}
+
+
+# =====================================================
+# DATABASE (a throwaway test database, skipped when none is reachable)
+# =====================================================
+@pytest.fixture(scope="module")
+def database():
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    try:
+        old_config = runner.setup_databases()
+    except (ImproperlyConfigured, DatabaseError) as e:
+        pytest.skip(f"No test database: {e}")
+
+    cache.clear()
+    yield
+    runner.teardown_databases(old_config)
+
+
+def _stat(genre, counter):
+    row = CatalogStat.objects.filter(dimension="genre", key=genre.id).first()
+    return getattr(row, counter) if row else 0
+
+
+def _totals():
+    stats = {
+        (row["dimension"], row["key"]): {name: round(row[name], 6) for name in catalog_stats.COUNTERS}
+        for row in CatalogStat.objects.values("dimension", "key", *catalog_stats.COUNTERS)
+    }
+    ratings = dict(
+        ((movie_id, rating), count)
+        for movie_id, rating, count in MovieRatingCount.objects.values_list("movie_id", "rating", "count")
+    )
+    # Rows emptied by deltas stay behind; rebuild() does not create them
+    return (
+        {key: counters for key, counters in stats.items() if any(counters.values())},
+        {key: count for key, count in ratings.items() if count},
+    )
+
+
+def test_deltas_are_written_after_commit(database):
+    genre = Genre.objects.create(name="Commit")
+    movie = Movie.objects.create(title="Pending", release_date=date(2003, 5, 1), runtime=100)
+    movie.genres.add(genre)
+    alice, bob, carol = (User.objects.create(username=name) for name in ("alice", "bob", "carol"))
+
+    with transaction.atomic():
+        Review.objects.create(movie=movie, user=alice, rating=8)
+        assert _stat(genre, "review_count") == 0
+    assert _stat(genre, "review_count") == 1
+
+    # A rolled back savepoint drops only its own deltas
+    with transaction.atomic():
+        Review.objects.create(movie=movie, user=bob, rating=4)
+        with pytest.raises(ValueError), transaction.atomic():
+            Review.objects.create(movie=movie, user=carol, rating=9)
+            raise ValueError
+    assert (_stat(genre, "review_count"), _stat(genre, "rating_sum")) == (2, 12)
+    assert not MovieRatingCount.objects.filter(movie=movie, rating=9, count__gt=0).exists()
+
+    with pytest.raises(ValueError), transaction.atomic():
+        Review.objects.create(movie=movie, user=carol, rating=2)
+        raise ValueError
+    assert _stat(genre, "review_count") == 2
+
+
+def test_one_pending_delta_per_savepoint(database):
+    genre = Genre.objects.create(name="Batched")
+    movie = Movie.objects.create(title="Batched", release_date=date(2004, 2, 1), runtime=95)
+    movie.genres.add(genre)
+    users = [User.objects.create(username=f"batch{i}") for i in range(3)]
+
+    def pending():
+        hooks = transaction.get_connection().run_on_commit
+        return sum(isinstance(hook[1], catalog_stats.PendingDeltas) for hook in hooks)
+
+    with transaction.atomic():
+        for user in users:
+            Review.objects.create(movie=movie, user=user, rating=6)
+        assert pending() == 1
+
+        with transaction.atomic():
+            movie.runtime = 125
+            movie.save()
+            assert pending() == 2
+
+    assert _stat(genre, "review_count") == 3
+
+
+def test_incremental_totals_match_rebuild(database):
+    drama, comedy = Genre.objects.create(name="Drama"), Genre.objects.create(name="Comedy")
+    users = [User.objects.create(username=f"rater{i}") for i in range(4)]
+
+    movies = []
+    for i in range(6):
+        movie = Movie.objects.create(
+            title=f"Movie {i}", release_date=date(1990 + i % 3, 1, 1), runtime=40 + i * 30, vote_average=5.5 + i,
+        )
+        movie.genres.add(drama if i % 2 else comedy)
+        movies.append(movie)
+    movies[0].genres.add(drama)
+
+    for i, movie in enumerate(movies):
+        for user in users[:i % 4 + 1]:
+            Review.objects.create(movie=movie, user=user, rating=(i + user.id) % 10 + 1)
+
+    with transaction.atomic():
+        review = Review.objects.filter(movie=movies[1]).first()
+        review.rating = 10
+        review.save()
+        movies[2].release_date = date(2011, 6, 1)
+        movies[2].save()
+        movies[3].genres.remove(drama)
+        Review.objects.filter(movie=movies[4]).first().delete()
+
+    movies[5].delete()
+
+    Review.objects.filter(movie=movies[3]).update(created_at=timezone.now() - timezone.timedelta(days=1000))
+    review_archive.archive_batch(review_archive.cutoff())
+
+    incremental = _totals()
+    catalog_stats.rebuild()
+    catalog_stats.rebuild_rating_counts()
+
+    assert incremental == _totals()
@@ -0,0 +1,97 @@
+"""
+Test the scheduled incremental catalog sync
+"""
+
+import os
+import sys
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError
+from django.test.runner import DiscoverRunner
+from django.utils import timezone
+
+from movies.models import Movie, SyncRun
+from movies.services.catalog_sync import LOCK_KEY, CatalogSync
+
+
+# =====================================================
+# DATABASE (a throwaway test database, skipped when none is reachable)
+# =====================================================
+@pytest.fixture(scope="module")
+def database():
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    try:
+        old_config = runner.setup_databases()
+    except (ImproperlyConfigured, DatabaseError) as e:
+        pytest.skip(f"No test database: {e}")
+
+    yield
+    runner.teardown_databases(old_config)
+
+
+@pytest.fixture
+def catalog(database):
+    Movie.objects.all().delete()
+    cache.delete(LOCK_KEY)
+
+    def movie(title, hours_ago, **fields):
+        movie = Movie.objects.create(title=title, **fields)
+        Movie.objects.filter(id=movie.id).update(last_synced_at=timezone.now() - timedelta(hours=hours_ago))
+        return movie
+
+    return {
+        "popular": movie("Popular", 72, tmdb_id=1, vote_count=5000),
+        "obscure": movie("Obscure", 72, tmdb_id=2, vote_count=0),
+        "fresh": movie("Fresh", 1, tmdb_id=3, vote_count=9000),
+        "local": movie("Local only", 72),
+    }
+
+
+def _sync(details, **budgets):
+    sync = CatalogSync(**budgets)
+    sync.tmdb = mock.Mock()
+    sync.tmdb.get_movie_details.side_effect = details
+    return sync
+
+
+def test_stale_popular_movies_are_synced_first(catalog):
+    sync = _sync(lambda tmdb_id: {"title": f"Synced {tmdb_id}", "vote_count": 5000}, request_budget=1)
+
+    assert [movie["id"] for movie in sync.candidates()] == [catalog["popular"].id, catalog["obscure"].id]
+
+    run = sync.run()
+
+    assert (run.status, run.checked, run.requests, run.updated, run.failed) == (SyncRun.STATUS_SUCCESS, 1, 1, 1, 0)
+    assert Movie.objects.get(id=catalog["popular"].id).title == "Synced 1"
+    # Out of budget: the next run picks it up
+    assert [movie["id"] for movie in sync.candidates()] == [catalog["obscure"].id]
+
+
+def test_failed_lookups_are_marked_synced(catalog):
+    run = _sync(lambda tmdb_id: {"error": "Movie not found"}).run()
+
+    assert (run.checked, run.failed, run.updated) == (2, 2, 0)
+    assert Movie.objects.get(id=catalog["obscure"].id).title == "Obscure"
+    assert not _sync(None).candidates()
+
+
+def test_overlapping_runs_are_skipped(catalog):
+    cache.add(LOCK_KEY, "another worker", 60)
+
+    sync = _sync(None)
+    run = sync.run()
+
+    assert run.status == SyncRun.STATUS_SKIPPED
+    sync.tmdb.get_movie_details.assert_not_called()
+    assert cache.get(LOCK_KEY) == "another worker"
@@ -0,0 +1,104 @@
+"""
+Test change feed access and ordering
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, transaction
+from django.test.runner import DiscoverRunner
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from movies.models import ChangeEvent
+from movies.services import change_feed
+from movies.views import ChangeFeedView
+
+
+def _get(user):
+    request = APIRequestFactory().get("/api/v1/changes/", {"entity": "watchlist"})
+    force_authenticate(request, user=user)
+    return ChangeFeedView.as_view()(request)
+
+
+def test_regular_users_cannot_read_the_feed():
+    assert _get(User(id=2, username="bob")).status_code == 403
+    assert _get(AnonymousUser()).status_code in (401, 403)
+
+
+# =====================================================
+# DATABASE (a throwaway test database, skipped when none is reachable)
+# =====================================================
+@pytest.fixture(scope="module")
+def database():
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    try:
+        old_config = runner.setup_databases()
+    except (ImproperlyConfigured, DatabaseError) as e:
+        pytest.skip(f"No test database: {e}")
+
+    yield
+    runner.teardown_databases(old_config)
+
+
+def _event(event_id, entity_id):
+    return ChangeEvent.objects.create(
+        id=event_id, entity=ChangeEvent.ENTITY_MOVIE, action=ChangeEvent.ACTION_UPSERT, entity_id=entity_id
+    )
+
+
+def test_positions_are_stamped_after_commit(database):
+    with transaction.atomic():
+        change_feed.record_movies(ChangeEvent.ACTION_UPSERT, [1, 2])
+        with transaction.atomic():
+            change_feed.record_movies(ChangeEvent.ACTION_UPSERT, [3])
+        assert not ChangeEvent.objects.filter(seq__isnull=False).exists()
+
+    events, _ = change_feed.changes(since=change_feed.watermark())
+    assert [event.entity_id for event in events][-3:] == [1, 2, 3]
+    assert not ChangeEvent.objects.filter(seq__isnull=True).exists()
+
+
+def test_one_stamp_per_transaction(database):
+    def stamps():
+        return sum(hook[1] is change_feed.stamp for hook in transaction.get_connection().run_on_commit)
+
+    with transaction.atomic():
+        for movie_id in (1, 2, 3):
+            change_feed.record_movies(ChangeEvent.ACTION_UPSERT, [movie_id])
+        with transaction.atomic():
+            change_feed.record_movies(ChangeEvent.ACTION_DELETE, [4])
+        assert stamps() == 1
+
+    # A hook registered inside a savepoint does not cover the outer scope
+    with transaction.atomic():
+        with transaction.atomic():
+            change_feed.record_movies(ChangeEvent.ACTION_UPSERT, [5])
+        change_feed.record_movies(ChangeEvent.ACTION_UPSERT, [6])
+        assert stamps() == 2
+
+    assert not ChangeEvent.objects.filter(seq__isnull=True).exists()
+
+
+def test_late_commits_are_served_after_the_cursor(database):
+    # A transaction that took id 5000 but commits after the one with 9000
+    change_feed.stamp()
+    _event(9000, 90)
+    change_feed.stamp()
+    cursor = change_feed.latest_seq()
+
+    _event(5000, 50)
+    change_feed.stamp()
+
+    events, _ = change_feed.changes(since=cursor)
+    assert [(event.id, event.entity_id) for event in events] == [(5000, 50)]
+    assert events[0].seq > cursor
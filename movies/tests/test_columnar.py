@@ -0,0 +1,44 @@
+"""
+Test columnar snapshot ordering
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from movies.utils.columnar import SnapshotResult, _dense_rank
+
+
+def _result(ids, values, descending=False):
+    np = pytest.importorskip("numpy")
+
+    ids = np.array(ids, dtype=np.int64)
+    rank = _dense_rank(np.array(values)).astype(np.int64)
+    rank = -rank if descending else rank
+    rows = np.arange(len(ids), dtype=np.int64)
+    return SnapshotResult(ids, rows, (rank << 32) | rows)
+
+
+def test_ties_are_broken_by_id_in_both_directions():
+    result = _result([1, 2, 3, 4, 5], [7.0, 9.0, 7.0, 9.0, 8.0], descending=True)
+
+    assert result[:] == [2, 4, 5, 1, 3]
+    assert _result([1, 2, 3, 4, 5], [7.0, 9.0, 7.0, 9.0, 8.0])[:] == [1, 3, 5, 2, 4]
+
+
+def test_pages_match_the_full_sort():
+    values = [(i * 37) % 11 for i in range(50)]
+    result = _result(list(range(100, 150)), values, descending=True)
+    everything = result[:]
+
+    assert len(result) == 50
+    assert result[0:10] + result[10:20] + result[20:50] == everything
+    assert result[3] == everything[3]
+    assert result[60:70] == []
@@ -0,0 +1,71 @@
+"""
+Test response compression
+"""
+
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from movies.middleware import CompressionMiddleware, accepted_encodings
+
+BODY = b'{"results": [' + b'{"title": "Movie"},' * 200 + b'{}]}'
+
+
+def _compress(response, accept="gzip"):
+    middleware = CompressionMiddleware(lambda request: response)
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+    return middleware.process_response(request, response)
+
+
+def test_accept_encoding_qualities():
+    assert accepted_encodings("gzip;q=0.5, br, identity;q=x") == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+    assert accepted_encodings("") == {}
+
+
+def test_gzip_is_negotiated_and_vary_is_set():
+    response = _compress(HttpResponse(BODY, content_type="application/json"), accept="deflate, gzip;q=0.8")
+
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.content) == BODY
+    assert response["Content-Length"] == str(len(response.content))
+
+
+def test_refused_encodings_stay_uncompressed_but_vary():
+    response = _compress(HttpResponse(BODY, content_type="application/json"), accept="gzip;q=0, identity")
+
+    assert not response.has_header("Content-Encoding")
+    assert response["Vary"] == "Accept-Encoding"
+    assert response.content == BODY
+
+
+def test_small_responses_are_left_alone():
+    response = _compress(HttpResponse(b'{"ok": true}', content_type="application/json"))
+
+    assert not response.has_header("Content-Encoding")
+    assert not response.has_header("Vary")
+
+
+def test_html_is_never_compressed():
+    response = _compress(HttpResponse(BODY, content_type="text/html; charset=utf-8"))
+
+    assert not response.has_header("Content-Encoding")
+    assert response.content == BODY
+
+
+def test_streamed_responses_are_compressed_per_chunk():
+    chunks = [BODY[i:i + 500] for i in range(0, len(BODY), 500)]
+    response = _compress(StreamingHttpResponse(iter(chunks), content_type="application/json"))
+
+    assert response["Content-Encoding"] == "gzip"
+    assert not response.has_header("Content-Length")
+    assert gzip.decompress(b"".join(response.streaming_content)) == BODY
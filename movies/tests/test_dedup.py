@@ -0,0 +1,48 @@
+"""
+Test duplicate detection (normalization, blocking, scoring, clustering)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from movies.services.dedup import Record, blocking_keys, cluster, find_duplicates, normalize_title
+
+
+def record(movie_id, title, year, imdb_id=None, tmdb_id=None, runtime=0, vote_count=0):
+    return Record(movie_id, normalize_title(title), year, runtime, imdb_id, tmdb_id, vote_count)
+
+
+def test_normalize_title():
+    assert normalize_title("Amélie") == "amelie"
+    assert normalize_title("  Fast & Furious: Tokyo-Drift ") == "fast and furious tokyo drift"
+    assert normalize_title("Matrix, The") == "the matrix"
+
+
+def test_years_one_apart_share_a_block():
+    assert blocking_keys(record(1, "The Matrix", 1999)) & blocking_keys(record(2, "Matrix", 2000))
+    assert not blocking_keys(record(1, "The Matrix", 1999)) & blocking_keys(record(2, "Matrix", 2001))
+
+
+def test_duplicates_are_found_and_clustered():
+    records = [
+        record(1, "The Matrix", 1999, imdb_id="tt0133093"),
+        record(2, "The Matrix", 1999, tmdb_id=603, vote_count=100),
+        record(3, "The Matrix.", 2000),
+        record(4, "The Matrix", 1999, imdb_id="tt9999999"),
+        record(5, "The Matrix Reloaded", 2003),
+    ]
+
+    pairs = find_duplicates(records, threshold=0.9, workers=1)
+    assert (2, 5) not in {(a, b) for _, a, b in pairs}
+
+    clusters = cluster(pairs, records)
+
+    # 1 and 4 have different IMDb ids, so only 1 joins 2 and 3;
+    # 2 survives with the most votes
+    assert clusters == {2: [1, 3]}
@@ -0,0 +1,159 @@
+"""
+Tests for the poster / backdrop image pipeline
+Sources are served by a local fake image server
+"""
+
+import io
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from django.conf import settings
+
+from movies.services import image_pipeline
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_STORAGE_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def image_server(monkeypatch):
+    """Serves `images` {path: (content type, bytes)} and counts requests"""
+    images = {}
+    hits = []
+    monkeypatch.setattr(settings, "IMAGE_SOURCE_HOSTS", ("127.0.0.1",), raising=False)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if self.path == "/redirect.jpg":
+                self.send_response(302)
+                self.send_header("Location", "http://169.254.169.254/latest/meta-data/")
+                self.end_headers()
+                return
+            if self.path not in images:
+                self.send_error(404)
+                return
+            content_type, body = images[self.path]
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f"http://127.0.0.1:{server.server_port}", images, hits
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_bucket_width():
+    assert image_pipeline.bucket_width(1, (92, 185, 342)) == 92
+    assert image_pipeline.bucket_width(185, (92, 185, 342)) == 185
+    assert image_pipeline.bucket_width(200, (92, 185, 342)) == 342
+    assert image_pipeline.bucket_width(5000, (92, 185, 342)) == 342
+
+
+def test_source_is_fetched_once(storage, image_server):
+    base, images, hits = image_server
+    images["/poster.jpg"] = ("image/jpeg", b"not really a jpeg")
+
+    first = image_pipeline.fetch_source(base + "/poster.jpg")
+    second = image_pipeline.fetch_source(base + "/poster.jpg")
+
+    assert first == second
+    assert hits == ["/poster.jpg"]
+    assert image_pipeline.source_path(first).read_bytes() == b"not really a jpeg"
+
+    with pytest.raises(image_pipeline.ImageUnavailable):
+        image_pipeline.fetch_source(base + "/missing.jpg")
+
+
+def test_only_allowed_hosts_are_fetched(storage, image_server):
+    base, images, hits = image_server
+
+    for url in ("http://169.254.169.254/latest/meta-data/", "file:///etc/passwd", base.replace("127.0.0.1", "localhost") + "/a.jpg"):
+        with pytest.raises(image_pipeline.ImageUnavailable):
+            image_pipeline.fetch_source(url)
+
+    # Redirects are not followed, even from an allowed host
+    with pytest.raises(image_pipeline.ImageUnavailable):
+        image_pipeline.fetch_source(base + "/redirect.jpg")
+    assert hits == ["/redirect.jpg"]
+
+
+def test_quota_evicts_least_recently_used(storage):
+    for age, name in enumerate(["newest", "middle", "oldest"]):
+        path = image_pipeline.source_path(name * 2)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 - age, 1000 - age))
+
+    removed, used = image_pipeline.enforce_quota(max_bytes=250)
+
+    assert (removed, used) == (1, 200)
+    assert not image_pipeline.source_path("oldest" * 2).exists()
+
+
+def test_thumbnails_are_rendered_per_width_bucket(storage, image_server):
+    Image = pytest.importorskip("PIL.Image")
+    base, images, _ = image_server
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 900), "red").save(buffer, "JPEG")
+    images["/backdrop.jpg"] = ("image/jpeg", buffer.getvalue())
+
+    digest = image_pipeline.fetch_source(base + "/backdrop.jpg")
+    path = image_pipeline.ensure_derivative(digest, 185, "jpeg")
+
+    with Image.open(path) as thumbnail:
+        assert thumbnail.size == (185, 278)
+
+    # Never upscaled
+    with Image.open(image_pipeline.ensure_derivative(digest, 780, "jpeg")) as thumbnail:
+        assert thumbnail.size == (600, 900)
+
+
+def test_corrupt_sources_do_not_stop_the_run(storage, image_server, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    base, images, _ = image_server
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 450), "blue").save(buffer, "JPEG")
+    images["/good.jpg"] = ("image/jpeg", buffer.getvalue())
+    images["/corrupt.jpg"] = ("image/jpeg", b"not really a jpeg")
+
+    stats = image_pipeline.process([base + "/good.jpg", base + "/corrupt.jpg"], sizes=(92,), output_formats=("jpeg",), workers=1)
+
+    assert stats == {"sources": 2, "failed": 1, "rendered": 1, "existing": 0}
+
+    # The quota still runs when processing fails outright
+    def fail(*args, **kwargs):
+        raise RuntimeError("render pool died")
+
+    enforced = []
+    monkeypatch.setattr(image_pipeline, "catalog_urls", lambda: set())
+    monkeypatch.setattr(image_pipeline, "process", fail)
+    monkeypatch.setattr(image_pipeline, "enforce_quota", lambda: enforced.append(True) or (0, 0))
+
+    with pytest.raises(RuntimeError):
+        image_pipeline.process_catalog()
+    assert enforced == [True]
@@ -0,0 +1,63 @@
+"""
+Test IMDb dataset parsing
+"""
+
+import gzip
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from movies.importers.imdb_dataset_importer import (
+    iter_line_chunks,
+    parse_basics_chunk,
+    read_ratings,
+)
+
+BASICS = (
+    "tconst\ttitleType\tprimaryTitle\toriginalTitle\tisAdult\tstartYear\tendYear\truntimeMinutes\tgenres\n"
+    "tt0000001\tmovie\tHeat\tHeat\t0\t1995\t\\N\t170\tAction,Crime\n"
+    "tt0000002\ttvEpisode\tPilot\tPilot\t0\t2001\t\\N\t45\tDrama\n"
+    "tt0000003\ttvMovie\tUntitled\tUntitled\t0\t\\N\t\\N\t\\N\t\\N\n"
+)
+
+RATINGS = (
+    "tconst\taverageRating\tnumVotes\n"
+    "tt0000001\t8.3\t700000\n"
+)
+
+
+def _write_gz(tmp_path, name, content):
+    path = tmp_path / name
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        handle.write(content)
+    return path
+
+
+def test_parse_basics_chunk_filters_and_converts():
+    rows = parse_basics_chunk(BASICS.splitlines(keepends=True)[1:])
+
+    assert rows == [
+        ("tt0000001", "Heat", date(1995, 1, 1), 170, ("Action", "Crime")),
+        ("tt0000003", "Untitled", None, 0, ()),
+    ]
+
+
+def test_iter_line_chunks_skips_header(tmp_path):
+    path = _write_gz(tmp_path, "title.basics.tsv.gz", BASICS)
+
+    chunks = list(iter_line_chunks(path, chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[0][0].startswith("tt0000001")
+
+
+def test_read_ratings(tmp_path):
+    path = _write_gz(tmp_path, "title.ratings.tsv.gz", RATINGS)
+
+    assert read_ratings(path) == {"tt0000001": (8.3, 700000)}
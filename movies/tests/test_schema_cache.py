@@ -0,0 +1,37 @@
+"""
+Test schema artifact generation
+"""
+
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from django.conf import settings
+
+from movies.utils import schema_cache
+
+
+def test_identity_file_is_written_last(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEMA_ARTIFACT_DIR", tmp_path, raising=False)
+    monkeypatch.setattr(settings, "SCHEMA_VERSION", "test", raising=False)
+    monkeypatch.setattr(schema_cache, "render_schema", lambda: b'{"openapi": "3.0.3"}')
+
+    written = []
+    write = schema_cache._write
+    monkeypatch.setattr(schema_cache, "_write", lambda path, content: written.append(path) or write(path, content))
+
+    version, paths = schema_cache.generate()
+
+    assert version == "test"
+    assert written[-1] == paths["identity"]
+    assert gzip.decompress(paths["gzip"].read_bytes()) == b'{"openapi": "3.0.3"}'
+
+    # Complete sets are not generated again
+    schema_cache.generate()
+    assert len(written) == len(set(written))
@@ -0,0 +1,29 @@
+"""
+Test slow query fingerprints
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from movies.utils.slow_queries import fingerprint, normalize
+
+
+def test_literals_and_in_lists_share_a_fingerprint():
+    a = 'SELECT "movies_movie"."id" FROM "movies_movie" WHERE ("movies_movie"."id" IN (1, 2, 3) AND "title" = \'It\'\'s\') LIMIT 21'
+    b = 'SELECT "movies_movie"."id" FROM  "movies_movie" WHERE ("movies_movie"."id" IN (7) AND "title" = \'Up\') LIMIT 5'
+
+    assert fingerprint(a) == fingerprint(b)
+    assert normalize(a).endswith('IN (...) AND "title" = ?) LIMIT ?')
+
+
+def test_placeholders_and_identifiers_are_kept():
+    sql = 'SELECT U0."movie_id" FROM "movies_movie_genres" U0 WHERE U0."genre_id" IN (%s, %s)'
+
+    assert normalize(sql) == 'SELECT U0."movie_id" FROM "movies_movie_genres" U0 WHERE U0."genre_id" IN (...)'
+    assert fingerprint(sql) != fingerprint(sql.replace("genre_id", "movie_id"))
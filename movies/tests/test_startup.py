@@ -0,0 +1,38 @@
+"""
+Test startup profiling and the lazily imported modules
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from movies.utils.startup import by_package, parse_importtime, profile_startup
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 | django.utils
+import time:        50 |       1400 | django
+"""
+
+
+def test_parse_importtime():
+    modules = parse_importtime(IMPORTTIME + "unrelated stderr line\n")
+
+    assert modules == {"_io": (120, 120), "django.utils": (300, 900), "django": (50, 1400)}
+    assert by_package(modules) == {"_io": 120, "django": 350}
+
+
+def test_cold_start_leaves_heavy_modules_out():
+    profile = profile_startup()
+
+    assert set(profile) == {"wall", "settings", "apps_ready", "urls", "modules", "packages"}
+    assert "django.urls" in profile["modules"]
+    # Loaded on first use by the schema / import views
+    for module in ("drf_spectacular.views", "drf_spectacular.generators", "movies.schema", "movies.services.tmdb_service"):
+        assert module not in profile["modules"]
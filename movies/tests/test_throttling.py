@@ -0,0 +1,81 @@
+"""
+Test token bucket throttling
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from movies.throttling import TokenBucketThrottle, consume, parse_rate
+
+
+class ImportView(APIView):
+    permission_classes = []
+    throttle_scope = "import"
+
+    def get(self, request):
+        return Response({})
+
+
+def _get(user):
+    request = APIRequestFactory().get("/")
+    force_authenticate(request, user=user)
+    return ImportView.as_view()(request)
+
+
+def _bucket(scope, user):
+    return cache.get(TokenBucketThrottle.cache_format % {"scope": scope, "ident": f"user:{user.pk}"})
+
+
+def test_parse_rate():
+    assert parse_rate("600/min") == (600, 10.0)
+    assert parse_rate("20/hour") == (20, 20 / 3600)
+
+
+def test_new_bucket_starts_full():
+    allowed, state, wait = consume(None, now=100.0, capacity=10, refill_rate=1.0, cost=4)
+
+    assert allowed
+    assert state == (6, 100.0)
+    assert wait == 0.0
+
+
+def test_cost_larger_than_tokens_is_rejected_with_wait():
+    allowed, state, wait = consume((2, 100.0), now=100.0, capacity=10, refill_rate=0.5, cost=5)
+
+    assert not allowed
+    assert state == (2, 100.0)
+    assert wait == 6.0
+
+
+def test_bucket_refills_up_to_capacity():
+    allowed, state, _ = consume((0, 0.0), now=1000.0, capacity=10, refill_rate=1.0, cost=1)
+
+    assert allowed
+    assert state == (9, 1000.0)
+
+
+def test_rejected_requests_do_not_debit_other_buckets():
+    user = User(id=9001, username="throttled")
+    cache.delete_many([TokenBucketThrottle.cache_format % {"scope": scope, "ident": "user:9001"} for scope in ("user", "import")])
+
+    assert _get(user).status_code == 200
+    assert _bucket("user", user)[0] == 599
+    assert _bucket("import", user)[0] == 19
+
+    # The user bucket is empty: the import bucket keeps its tokens
+    cache.set(TokenBucketThrottle.cache_format % {"scope": "user", "ident": "user:9001"}, (0, time.time()))
+    assert _get(user).status_code == 429
+    assert _bucket("import", user)[0] == 19
@@ -0,0 +1,100 @@
+"""
+Test applying queued review and watchlist writes
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_api.settings")
+
+import django
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError
+from django.test.runner import DiscoverRunner
+
+from movies.models import ChangeEvent, Movie, PendingWrite, Review, Watchlist
+from movies.services import catalog_stats, write_behind
+
+
+# =====================================================
+# DATABASE (a throwaway test database, skipped when none is reachable)
+# =====================================================
+@pytest.fixture(scope="module")
+def database():
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    try:
+        old_config = runner.setup_databases()
+    except (ImproperlyConfigured, DatabaseError) as e:
+        pytest.skip(f"No test database: {e}")
+
+    cache.clear()
+    yield
+    runner.teardown_databases(old_config)
+
+
+def _events(entity):
+    return ChangeEvent.objects.filter(entity=entity, action=ChangeEvent.ACTION_UPSERT).count()
+
+
+def test_queued_writes_are_applied_in_batches(database):
+    movie = Movie.objects.create(title="Queued", runtime=100)
+    users = [User.objects.create(username=f"queued{i}") for i in range(3)]
+
+    for i, user in enumerate(users):
+        assert write_behind.enqueue(PendingWrite.KIND_REVIEW, user.id, movie.id, {"rating": i + 7, "comment": "ok"})
+        assert write_behind.enqueue(PendingWrite.KIND_WATCHLIST, user.id, movie.id)
+    # One pending write per kind, user and movie
+    assert not write_behind.enqueue(PendingWrite.KIND_WATCHLIST, users[0].id, movie.id)
+
+    totals = write_behind.apply_pending_writes(batch_size=4)
+
+    assert totals == {"applied": 6, "skipped": 0, "batches": 2}
+    assert not PendingWrite.objects.exists()
+    assert sorted(Review.objects.filter(movie=movie).values_list("rating", flat=True)) == [7, 8, 9]
+    assert Watchlist.objects.filter(movie=movie).count() == 3
+    assert catalog_stats.rating_summary(movie.id)["count"] == 3
+
+
+def test_conflicting_writes_are_skipped(database):
+    movie = Movie.objects.create(title="Conflicts", runtime=100)
+    alice, bob = User.objects.create(username="alice"), User.objects.create(username="bob")
+
+    # Both already wrote through the synchronous path
+    Review.objects.create(movie=movie, user=alice, rating=5)
+    Watchlist.objects.create(movie=movie, user=alice)
+
+    for user in (alice, bob):
+        write_behind.enqueue(PendingWrite.KIND_REVIEW, user.id, movie.id, {"rating": 9})
+        write_behind.enqueue(PendingWrite.KIND_WATCHLIST, user.id, movie.id)
+
+    reviews, watchlist = _events(ChangeEvent.ENTITY_REVIEW), _events(ChangeEvent.ENTITY_WATCHLIST)
+    totals = write_behind.apply_pending_writes()
+
+    assert totals == {"applied": 2, "skipped": 2, "batches": 1}
+    assert Review.objects.get(movie=movie, user=alice).rating == 5
+    # Events only for rows that were written
+    assert _events(ChangeEvent.ENTITY_REVIEW) == reviews + 1
+    assert _events(ChangeEvent.ENTITY_WATCHLIST) == watchlist + 1
+    assert catalog_stats.rating_summary(movie.id)["count"] == 2
+
+
+def test_a_racing_review_only_skips_itself(database):
+    movie = Movie.objects.create(title="Race", runtime=100)
+    carol, dave = User.objects.create(username="carol"), User.objects.create(username="dave")
+    Review.objects.create(movie=movie, user=carol, rating=4)
+
+    # Passed the existence check, then lost the race to the direct write
+    inserted = write_behind._insert_reviews([
+        Review(movie=movie, user=carol, rating=8),
+        Review(movie=movie, user=dave, rating=6),
+    ])
+
+    assert [review.user_id for review in inserted] == [dave.id]
+    assert Review.objects.filter(movie=movie).count() == 2
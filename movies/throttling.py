@@ -0,0 +1,153 @@
+"""
+Token Bucket Throttling
+Per-client and per-endpoint buckets stored in the shared cache
+"""
+
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .utils import metrics
+
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """'600/min' -> (capacity 600, refill 10.0 tokens per second)"""
+    num, period = rate.split("/")
+    capacity = int(num)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def consume(state, now, capacity, refill_rate, cost=1):
+    """
+    Take `cost` tokens from a bucket.
+    state is (tokens, timestamp) or None for a full bucket.
+    Returns (allowed, new_state, seconds until `cost` tokens are available).
+    """
+    tokens, updated = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill_rate)
+
+    if tokens >= cost:
+        return True, (tokens - cost, now), 0.0
+
+    return False, (tokens, now), (cost - tokens) / refill_rate
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base token bucket. Subclasses pick the bucket scope and the cost
+    of a request. Rates come from REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"].
+
+    The first token bucket throttle a request reaches checks every bucket
+    of the view and debits them only if all allow it, so a request
+    rejected by one bucket does not use up the others. The rest read
+    their result from the request.
+
+    Bucket state is read and written through the cache without a lock,
+    so concurrent requests can occasionally overdraw a bucket slightly.
+    """
+
+    cache = cache
+    cache_format = "throttle:bucket:%(scope)s:%(ident)s"
+
+    def get_scope(self, request, view):
+        raise NotImplementedError
+
+    def get_cost(self, request, view):
+        return 1
+
+    def allow_request(self, request, view):
+        results = getattr(request._request, "token_buckets", None)
+        if results is None:
+            results = request._request.token_buckets = self.check_buckets(request, view)
+
+        allowed, self._wait = results.get(self.get_scope(request, view), (True, 0.0))
+        return allowed
+
+    def check_buckets(self, request, view):
+        """{scope: (allowed, wait)} for every token bucket throttle of the view"""
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+
+        buckets = {}
+        for throttle in view.get_throttles():
+            if not isinstance(throttle, TokenBucketThrottle):
+                continue
+            scope = throttle.get_scope(request, view)
+            rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope) if scope else None
+            if rate is not None:
+                key = self.cache_format % {"scope": scope, "ident": ident}
+                buckets[scope] = (key, *parse_rate(rate), throttle.get_cost(request, view))
+
+        # One cache round trip for all of them
+        states = self.cache.get_many([key for key, _, _, _ in buckets.values()])
+        now = time.time()
+
+        checked = {
+            scope: (capacity, refill_rate, cost, consume(states.get(key), now, capacity, refill_rate, cost))
+            for scope, (key, capacity, refill_rate, cost) in buckets.items()
+        }
+        debit = all(result[0] for _, _, _, result in checked.values())
+
+        results = {}
+        for scope, (capacity, refill_rate, cost, (allowed, state, wait)) in checked.items():
+            if debit:
+                # Keep the key until a drained bucket would be full again
+                self.cache.set(buckets[scope][0], state, int(capacity / refill_rate) + 1)
+            elif allowed:
+                state = (state[0] + cost, state[1])
+
+            self.record_headers(request, capacity, state[0], (capacity - state[0]) / refill_rate)
+
+            if not allowed:
+                metrics.incr(f"throttle.rejected.{scope}")
+
+            results[scope] = (allowed, wait)
+
+        return results
+
+    def wait(self):
+        return self._wait
+
+    @staticmethod
+    def record_headers(request, limit, remaining, reset):
+        """Keep the most restrictive bucket for the RateLimit-* headers"""
+        current = getattr(request._request, "ratelimit", None)
+        if current is None or remaining < current["remaining"]:
+            request._request.ratelimit = {
+                "limit": limit,
+                "remaining": int(remaining),
+                "reset": int(reset + 0.999),
+            }
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """
+    One bucket per user ("user" rate) or per IP ("anon" rate).
+    Requests cost the view's `throttle_cost` (default 1), so expensive
+    endpoints drain the client's budget faster.
+    """
+
+    def get_scope(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return "user"
+        return "anon"
+
+    def get_cost(self, request, view):
+        return getattr(view, "throttle_cost", 1)
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """
+    One bucket per client for each endpoint class that sets
+    `throttle_scope`; every request costs one token.
+    """
+
+    def get_scope(self, request, view):
+        return getattr(view, "throttle_scope", None)
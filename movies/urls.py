@@ -2,6 +2,9 @@ from django.urls import path
 from .views import (
     MovieListCreateView,
     MovieDetailView,
+    MovieBatchView,
+    MovieImageView,
+    ImageFileView,
     GenreListCreateView,
     GenreDetailView,
     ReviewListCreateView,
@@ -11,6 +14,10 @@ from .views import (
     ImportMovieFromTMDBView,
     ImportIMDBAPIView,
     MovieSearchView,
+    CatalogExportView,
+    MetricsView,
+    CatalogStatsView,
+    ChangeFeedView,
 )
 
 urlpatterns = [
@@ -18,6 +25,11 @@ urlpatterns = [
     # ================= MOVIES =================
     path("movies/", MovieListCreateView.as_view(), name="movie-list"),
     path("movies/<int:pk>/", MovieDetailView.as_view(), name="movie-detail"),
+    path("movies/batch/", MovieBatchView.as_view(), name="movie-batch"),
+    path("movies/<int:pk>/images/<str:kind>/", MovieImageView.as_view(), name="movie-image"),
+
+    # ================= IMAGES =================
+    path("images/<str:name>", ImageFileView.as_view(), name="image-file"),
 
     # ================= GENRES =================
     path("genres/", GenreListCreateView.as_view()),
@@ -39,6 +51,18 @@ urlpatterns = [
     path("movies/import/", ImportMovieFromTMDBView.as_view()),
     path("import-imdb/", ImportIMDBAPIView.as_view(), name="import-imdb"),
 
+    # ================= EXPORT =================
+    path("export/catalog/", CatalogExportView.as_view(), name="catalog-export"),
+
+    # ================= CHANGE FEED =================
+    path("changes/", ChangeFeedView.as_view(), name="change-feed"),
+
+    # ================= STATISTICS =================
+    path("stats/", CatalogStatsView.as_view(), name="catalog-stats"),
+
+    # ================= METRICS =================
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+
     # ================= SEARCH =================
   path("movies/search/", MovieSearchView.as_view(), name="movie-search"),
 ]
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+Cache Manager
+Per-worker caches kept coherent through version numbers in the shared cache
+"""
+
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.text import slugify
+
+
+GENRE_VERSION_KEY = "genres:version"
+CATALOG_VERSION_KEY = "catalog:version"
+MOVIE_KEY = "movie:fragment:{}:{}"
+MOVIE_VERSION_KEY = "movie:version:{}"
+
+
+# =====================================================
+# GENRE TAXONOMY
+# =====================================================
+class GenreCache:
+    """
+    The genre list is tiny and rarely changes, so every worker holds it
+    in memory. Genre writes bump a shared version and workers reload on
+    their next lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._genres = []
+        self._serialized = []
+
+    def version(self):
+        return cache.get_or_set(GENRE_VERSION_KEY, uuid.uuid4().hex, None)
+
+    def invalidate(self):
+        # After commit, or another worker could reload the old taxonomy
+        # under the new version and keep it until the next genre write
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        cache.set(GENRE_VERSION_KEY, uuid.uuid4().hex, None)
+
+    def _ensure_loaded(self):
+        version = self.version()
+        if version == self._version:
+            return version
+
+        from movies.models import Genre
+        from movies.serializers import GenreSerializer
+
+        with self._lock:
+            genres = list(Genre.objects.all())
+            self._genres = [
+                {"id": genre.id, "name": genre.name, "slug": slugify(genre.name)}
+                for genre in genres
+            ]
+            self._serialized = GenreSerializer(genres, many=True).data
+            self._version = version
+
+        return version
+
+    def genres(self):
+        """[{id, name, slug}] ordered by name"""
+        self._ensure_loaded()
+        return self._genres
+
+    def serialized(self):
+        """GenreSerializer output for every genre"""
+        self._ensure_loaded()
+        return self._serialized
+
+    def by_name(self):
+        return {genre["name"]: genre["id"] for genre in self.genres()}
+
+    def names(self):
+        return {genre["id"]: genre["name"] for genre in self.genres()}
+
+    def resolve(self, query):
+        """
+        Genre ids matching a filter value: an exact slug, or a
+        case-insensitive substring of the name (the old icontains)
+        """
+        query = query.strip().lower()
+        genres = self.genres()
+
+        exact = [genre["id"] for genre in genres if genre["slug"] == slugify(query)]
+        if exact:
+            return exact
+
+        return [genre["id"] for genre in genres if query in genre["name"].lower()]
+
+
+genre_cache = GenreCache()
+
+
+# =====================================================
+# CATALOG VERSION
+# =====================================================
+def catalog_version():
+    """Token that changes whenever a movie, genre or genre link is written"""
+    return cache.get_or_set(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def bump_catalog_version():
+    cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+# =====================================================
+# MOVIE FRAGMENTS
+# =====================================================
+class MovieCache:
+    """
+    Full serialized movies, one fragment per id. A fragment is only used
+    while it matches (id, updated_at, aggregates version): the aggregates
+    version is a per-movie token bumped whenever the movie, its reviews
+    or its genre links change, plus the genre version for renames.
+    Versions only reach other processes through a shared cache backend.
+    """
+
+    def timeout(self):
+        return getattr(settings, "MOVIE_CACHE_TIMEOUT", 3600)
+
+    def lookup(self, movie_ids, updated_at=None):
+        """
+        One get_many for fragments and versions. Returns
+        ({movie id: data} for valid fragments, {movie id: version});
+        pass the versions to store() for movies serialized afterwards.
+        `updated_at` ({movie id: serialized updated_at}) is checked for the
+        ids it contains.
+        """
+        genre_version = genre_cache.version()
+        keys = {movie_id: MOVIE_KEY.format(genre_version, movie_id) for movie_id in movie_ids}
+        version_keys = {movie_id: MOVIE_VERSION_KEY.format(movie_id) for movie_id in movie_ids}
+
+        values = cache.get_many([*keys.values(), *version_keys.values()])
+
+        versions = {}
+        for movie_id, key in version_keys.items():
+            version = values.get(key)
+            if version is None:
+                # Evicted or never set: start from a fresh token, so fragments
+                # stored under an earlier token can never match again
+                version = cache.get_or_set(key, uuid.uuid4().hex[:12], None)
+            versions[movie_id] = version
+
+        found = {}
+        for movie_id, key in keys.items():
+            entry = values.get(key)
+            if entry is None or entry["version"] != versions[movie_id]:
+                continue
+            stamp = (updated_at or {}).get(movie_id)
+            if stamp is not None and entry["data"]["updated_at"] != stamp:
+                continue
+            found[movie_id] = entry["data"]
+
+        return found, versions
+
+    def store(self, movies, versions):
+        """Cache {movie id: data} under the versions lookup() returned"""
+        genre_version = genre_cache.version()
+        cache.set_many(
+            {
+                MOVIE_KEY.format(genre_version, movie_id): {
+                    "version": versions.get(movie_id),
+                    "data": data,
+                }
+                for movie_id, data in movies.items()
+            },
+            self.timeout(),
+        )
+
+    def invalidate(self, movie_ids):
+        """
+        Bump the aggregates version of each movie (one set_many) once the
+        current transaction commits. Bumping earlier would let a concurrent
+        reader cache the old row under the new version.
+        """
+        movie_ids = list(movie_ids)
+        if movie_ids:
+            transaction.on_commit(lambda: self._bump(movie_ids))
+
+    def _bump(self, movie_ids):
+        token = uuid.uuid4().hex[:12]
+        cache.set_many({MOVIE_VERSION_KEY.format(movie_id): token for movie_id in movie_ids}, None)
+
+
+movie_cache = MovieCache()
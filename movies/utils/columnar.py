@@ -0,0 +1,289 @@
+"""
+Columnar Catalog
+Browse queries (genre / year / rating filters, title search, sorting)
+answered from NumPy columns held by each worker instead of the database.
+The snapshot reloads when the shared catalog version changes (every
+movie, genre or genre link write bumps it) or after
+COLUMNAR_CATALOG_MAX_AGE seconds. Off unless COLUMNAR_CATALOG_ENABLED
+is set and NumPy is installed; the views fall back to the ORM otherwise.
+
+Ordering matches the ORM on MySQL / SQLite: NULLs sort first ascending,
+ties are broken by id; titles compare case-insensitively.
+"""
+
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import numpy as np
+except ImportError:  # optional, the ORM path is used without it
+    np = None
+
+from .cache_manager import catalog_version, genre_cache
+
+# ?sort= values the snapshot can order by (with or without "-")
+SORT_FIELDS = ("id", "title", "release_date", "vote_average", "vote_count", "runtime")
+
+
+def available():
+    return np is not None
+
+
+def enabled():
+    return available() and getattr(settings, "COLUMNAR_CATALOG_ENABLED", False)
+
+
+def _dense_rank(values):
+    """Rank of every value among the distinct values (ties share a rank)"""
+    _, inverse = np.unique(values, return_inverse=True)
+    return inverse.reshape(-1).astype(np.int32)
+
+
+# =====================================================
+# SNAPSHOT
+# =====================================================
+class CatalogSnapshot:
+    """
+    One catalog version as columns, one row per movie in id order:
+    ids, release dates (days since 1970), years, vote average / count,
+    runtime, a genre bitmask (one uint64 word per 64 genres) and the
+    interned, casefolded titles. Sort ranks are precomputed per column.
+    """
+
+    def __init__(self, version, chunk_size=5000):
+        from movies.models import Movie
+
+        self.version = version
+
+        ids, released, votes, counts, runtimes, titles = [], [], [], [], [], []
+        rows = Movie.objects.order_by("id").values_list(
+            "id", "release_date", "vote_average", "vote_count", "runtime", "title"
+        )
+        for movie_id, release_date, vote_average, vote_count, runtime, title in rows.iterator(chunk_size=chunk_size):
+            ids.append(movie_id)
+            released.append(release_date)
+            votes.append(vote_average)
+            counts.append(vote_count)
+            runtimes.append(runtime)
+            titles.append(sys.intern((title or "").casefold()))
+
+        self.ids = np.array(ids, dtype=np.int64)
+        self.release = np.array(released, dtype="datetime64[D]")
+        self.year = np.zeros(len(ids), dtype=np.int16)
+        known = ~np.isnat(self.release)
+        self.year[known] = self.release[known].astype("datetime64[Y]").astype(np.int16) + 1970
+        self.vote_average = np.array([np.nan if v is None else v for v in votes], dtype=np.float64)
+        self.vote_count = np.array([v or 0 for v in counts], dtype=np.int32)
+        self.runtime = np.array([v or 0 for v in runtimes], dtype=np.int16)
+        self.titles = np.array(titles, dtype=object)
+
+        self._load_genres(chunk_size)
+
+        # Dense ranks turn every sort into an integer sort; NULL ranks lowest
+        days = self.release.astype(np.int64)
+        days[~known] = np.iinfo(np.int64).min
+        votes = np.nan_to_num(self.vote_average, nan=-np.inf)
+        self.ranks = {
+            "id": np.arange(len(ids), dtype=np.int32),
+            "title": _dense_rank(self.titles) if len(ids) else np.zeros(0, dtype=np.int32),
+            "release_date": _dense_rank(days),
+            "vote_average": _dense_rank(votes),
+            "vote_count": _dense_rank(self.vote_count),
+            "runtime": _dense_rank(self.runtime),
+        }
+
+    def _load_genres(self, chunk_size):
+        from movies.models import Genre, Movie
+
+        genre_ids = np.array(sorted(Genre.objects.values_list("id", flat=True)), dtype=np.int64)
+        self.genre_bits = {
+            int(genre_id): (index // 64, np.uint64(1 << index % 64))
+            for index, genre_id in enumerate(genre_ids)
+        }
+        self.genre_mask = np.zeros((len(self.ids), max(1, -(-len(genre_ids) // 64))), dtype=np.uint64)
+
+        links = np.array(
+            list(Movie.genres.through.objects.values_list("movie_id", "genre_id").iterator(chunk_size=chunk_size)),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        if not len(links) or not len(self.ids) or not len(genre_ids):
+            return
+
+        # Row of each link's movie and bit of its genre; both lists are sorted
+        rows = np.searchsorted(self.ids, links[:, 0])
+        bits = np.searchsorted(genre_ids, links[:, 1])
+        valid = (
+            (rows < len(self.ids)) & (self.ids[np.minimum(rows, len(self.ids) - 1)] == links[:, 0])
+            & (bits < len(genre_ids)) & (genre_ids[np.minimum(bits, len(genre_ids) - 1)] == links[:, 1])
+        )
+        rows, bits = rows[valid], bits[valid]
+
+        np.bitwise_or.at(
+            self.genre_mask,
+            (rows, bits // 64),
+            np.left_shift(np.uint64(1), (bits % 64).astype(np.uint64)),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nbytes(self):
+        arrays = [self.ids, self.release, self.year, self.vote_average, self.vote_count,
+                  self.runtime, self.genre_mask, *self.ranks.values()]
+        return sum(array.nbytes for array in arrays) + sum(map(sys.getsizeof, self.titles))
+
+    # ---------- queries ----------
+
+    def query(self, genre_ids=None, year=None, min_vote=None, search=None, sort="-release_date"):
+        """
+        Matching rows as a lazily sorted SnapshotResult, or None for a
+        sort the snapshot cannot answer.
+        `genre_ids` matches movies in any of the genres (None = no filter).
+        """
+        field = sort.lstrip("-")
+        if field not in self.ranks:
+            return None
+
+        match = np.ones(len(self.ids), dtype=bool)
+
+        if genre_ids is not None:
+            any_genre = np.zeros(len(self.ids), dtype=bool)
+            for genre_id in genre_ids:
+                if genre_id in self.genre_bits:
+                    word, bit = self.genre_bits[genre_id]
+                    any_genre |= (self.genre_mask[:, word] & bit) != 0
+            match &= any_genre
+
+        if year is not None:
+            match &= self.year == year
+
+        if min_vote is not None:
+            # NaN compares False, like NULL in SQL
+            match &= self.vote_average >= min_vote
+
+        rows = np.flatnonzero(match)
+
+        if search:
+            needle = search.casefold()
+            titles = self.titles[rows]
+            rows = rows[np.fromiter((needle in title for title in titles), dtype=bool, count=len(titles))]
+
+        # Rank in the high bits, row (= id order) in the low bits
+        rank = self.ranks[field][rows].astype(np.int64)
+        if sort.startswith("-"):
+            rank = -rank
+        keys = (rank << 32) | rows.astype(np.int64)
+
+        return SnapshotResult(self.ids, rows, keys)
+
+
+class SnapshotResult:
+    """
+    Movie ids of one query. Slicing a page only sorts what it needs:
+    the first `stop` keys are selected with argpartition, then sorted.
+    Works as a Paginator object_list.
+    """
+
+    def __init__(self, ids, rows, keys):
+        self._ids = ids
+        self._rows = rows
+        self._keys = keys
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+
+        start, stop, step = index.indices(len(self))
+        if start >= stop:
+            return []
+
+        keys = self._keys
+        if stop < len(keys):
+            top = np.argpartition(keys, stop - 1)[:stop]
+            order = top[np.argsort(keys[top], kind="stable")]
+        else:
+            order = np.argsort(keys, kind="stable")
+
+        return self._ids[self._rows[order[start:stop:step]]].tolist()
+
+
+# =====================================================
+# PER-WORKER CATALOG
+# =====================================================
+class ColumnarCatalog:
+    """
+    Holds the current snapshot. One thread reloads a stale snapshot while
+    the others keep answering from the previous one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._loaded_at = 0.0
+
+    def _stale(self, version):
+        max_age = getattr(settings, "COLUMNAR_CATALOG_MAX_AGE", 300)
+        snapshot = self._snapshot
+        return (
+            snapshot is None
+            or snapshot.version != version
+            or time.monotonic() - self._loaded_at > max_age
+        )
+
+    def snapshot(self):
+        version = catalog_version()
+        if not self._stale(version):
+            return self._snapshot
+
+        # Somebody else is reloading: use the previous snapshot meanwhile
+        if self._snapshot is not None and not self._lock.acquire(blocking=False):
+            return self._snapshot
+        if self._snapshot is None:
+            self._lock.acquire()
+
+        try:
+            if self._stale(version):
+                self._snapshot = CatalogSnapshot(version)
+                self._loaded_at = time.monotonic()
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def browse(self, genre=None, year=None, min_vote=None, search=None, sort="-release_date"):
+        """
+        SnapshotResult for the list / search view parameters, or None when
+        the request needs the ORM (disabled, unsupported sort or year)
+        """
+        if not enabled():
+            return None
+
+        field = (sort or "").lstrip("-")
+        if field not in SORT_FIELDS:
+            return None
+
+        genre_ids = None
+        if genre:
+            genre_ids = genre_cache.resolve(genre)
+
+        if year:
+            try:
+                year = int(year)
+            except ValueError:
+                return None
+
+        return self.snapshot().query(
+            genre_ids=genre_ids,
+            year=year or None,
+            min_vote=min_vote,
+            search=search or None,
+            sort=sort,
+        )
+
+
+columnar_catalog = ColumnarCatalog()
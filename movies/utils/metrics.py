@@ -0,0 +1,30 @@
+"""
+Metrics - counters kept in the shared cache
+so every worker adds to the same totals
+"""
+
+from django.core.cache import cache
+
+COUNTER_KEY = "metrics:counter:{}"
+NAMES_KEY = "metrics:names"
+
+
+def incr(name, amount=1):
+    key = COUNTER_KEY.format(name)
+
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        # First hit: create the counter (add is atomic) and register its name
+        if not cache.add(key, amount, timeout=None):
+            cache.incr(key, amount)
+
+        names = cache.get(NAMES_KEY, set())
+        if name not in names:
+            cache.set(NAMES_KEY, names | {name}, timeout=None)
+
+
+def get_counters():
+    names = sorted(cache.get(NAMES_KEY, set()))
+    values = cache.get_many([COUNTER_KEY.format(name) for name in names])
+    return {name: values.get(COUNTER_KEY.format(name), 0) for name in names}
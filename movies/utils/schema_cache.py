@@ -0,0 +1,139 @@
+"""
+Schema Cache
+The OpenAPI schema is generated once per code version (at deploy with
+`manage.py generate_schema`, or on the first request) and kept on disk
+pre-serialized and pre-compressed
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # optional, like in movies.middleware
+    brotli = None
+
+
+SOURCE_DIRS = ("movies", "movie_api")
+SKIP_DIRS = {"tests", "migrations", "__pycache__"}
+
+_lock = threading.Lock()
+_artifacts = {}
+_version = None
+
+
+# =====================================================
+# VERSION
+# =====================================================
+def code_version():
+    """
+    SCHEMA_VERSION if set (e.g. the deployed git sha), otherwise a hash
+    of the project's source, the spectacular settings and its version
+    """
+    global _version
+
+    if getattr(settings, "SCHEMA_VERSION", None):
+        return settings.SCHEMA_VERSION
+
+    if _version is None:
+        import drf_spectacular
+
+        digest = hashlib.md5()
+        digest.update(drf_spectacular.__version__.encode())
+        digest.update(repr(sorted(getattr(settings, "SPECTACULAR_SETTINGS", {}).items())).encode())
+
+        base = Path(settings.BASE_DIR)
+        for directory in SOURCE_DIRS:
+            for root, dirs, files in os.walk(base / directory):
+                dirs[:] = sorted(name for name in dirs if name not in SKIP_DIRS)
+                for name in sorted(files):
+                    if name.endswith(".py"):
+                        path = Path(root) / name
+                        digest.update(str(path.relative_to(base)).encode())
+                        digest.update(path.read_bytes())
+
+        _version = digest.hexdigest()[:16]
+
+    return _version
+
+
+# =====================================================
+# ARTIFACT
+# =====================================================
+def artifact_dir():
+    return Path(getattr(settings, "SCHEMA_ARTIFACT_DIR", Path(settings.BASE_DIR) / "var" / "schema"))
+
+
+def artifact_paths(version):
+    base = artifact_dir() / f"openapi-{version}.json"
+    return {
+        "identity": base,
+        "gzip": base.with_name(base.name + ".gz"),
+        "br": base.with_name(base.name + ".br"),
+    }
+
+
+def render_schema():
+    """Run drf-spectacular's generator once and return the JSON bytes"""
+    from drf_spectacular.generators import SchemaGenerator
+    from drf_spectacular.renderers import OpenApiJsonRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    from movies import schema  # noqa: F401  registers the extensions
+
+    generator = SchemaGenerator()
+    schema = generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+def _write(path, content):
+    # Write then rename, so readers never see a partial file
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(content)
+    os.replace(temporary, path)
+
+
+def generate(force=False):
+    """Write the artifact for the current code version; returns its paths"""
+    version = code_version()
+    paths = artifact_paths(version)
+
+    if paths["identity"].exists() and not force:
+        return version, paths
+
+    content = render_schema()
+    paths["identity"].parent.mkdir(parents=True, exist_ok=True)
+
+    # The identity file marks the set as complete, so it goes last
+    _write(paths["gzip"], gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write(paths["br"], brotli.compress(content, quality=11))
+    _write(paths["identity"], content)
+
+    _artifacts.pop(version, None)
+    return version, paths
+
+
+def get_artifact():
+    """
+    (version, {encoding: bytes}) for the current code version, read from
+    disk once per process and generated first if it is missing
+    """
+    version = code_version()
+
+    if version not in _artifacts:
+        with _lock:
+            if version not in _artifacts:
+                _, paths = generate()
+                _artifacts[version] = {
+                    encoding: path.read_bytes()
+                    for encoding, path in paths.items()
+                    if path.exists()
+                }
+
+    return version, _artifacts[version]
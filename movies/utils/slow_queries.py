@@ -0,0 +1,132 @@
+"""
+Slow Query Log
+Queries over SLOW_QUERY_THRESHOLD_MS are normalized, fingerprinted and
+aggregated per view in SlowQuery; a sample of them is EXPLAINed.
+Enabled with SLOW_QUERY_LOG_ENABLED (movies.middleware.SlowQueryMiddleware)
+"""
+
+import hashlib
+import random
+import re
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+
+# =====================================================
+# FINGERPRINT
+# =====================================================
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.\"`])-?\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(sql):
+    """
+    The statement with literals as ?, IN lists collapsed and whitespace
+    squeezed, so one filter combination gives one entry whatever the values
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize(sql).encode()).hexdigest()
+
+
+# =====================================================
+# CAPTURE
+# =====================================================
+class QueryRecorder:
+    """connection.execute_wrapper() hook collecting queries over the threshold"""
+
+    def __init__(self, threshold_ms):
+        self.threshold = threshold_ms / 1000
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= self.threshold:
+                self.slow.append((context["connection"].alias, sql, params, many, duration))
+
+
+def explain(alias, sql, params):
+    """Plan text for a SELECT, or "" when the backend cannot explain it"""
+    connection = connections[alias]
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            columns = [column[0] for column in cursor.description or []]
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return ""
+
+    lines = [" | ".join(str(value) for value in row) for row in rows]
+    if len(columns) > 1:
+        lines.insert(0, " | ".join(columns))
+    return "\n".join(lines)
+
+
+def _example(sql, params):
+    return f"{sql}\n-- params: {params!r}"[:10000]
+
+
+def _add(queryset, milliseconds, now):
+    return queryset.update(
+        count=F("count") + 1,
+        total_ms=F("total_ms") + milliseconds,
+        max_ms=Greatest(F("max_ms"), Value(milliseconds, output_field=FloatField())),
+        last_seen=now,
+    )
+
+
+def record(view, queries):
+    """Add captured (alias, sql, params, many, seconds) entries to SlowQuery"""
+    from movies.models import SlowQuery
+
+    explain_rate = getattr(settings, "SLOW_QUERY_EXPLAIN_RATE", 0.1)
+    now = timezone.now()
+
+    for alias, sql, params, many, duration in queries:
+        lookup = {"fingerprint": fingerprint(sql), "view": view[:200]}
+        milliseconds = duration * 1000
+
+        updated = _add(SlowQuery.objects.filter(**lookup), milliseconds, now)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    SlowQuery.objects.create(
+                        **lookup,
+                        sql=normalize(sql),
+                        example=_example(sql, params),
+                        count=1,
+                        total_ms=milliseconds,
+                        max_ms=milliseconds,
+                    )
+            except IntegrityError:
+                # Another worker created it first
+                updated = _add(SlowQuery.objects.filter(**lookup), milliseconds, now)
+
+        # Every new entry gets a plan, then a sample keeps it current
+        is_select = sql.lstrip().upper().startswith(("SELECT", "WITH"))
+        if is_select and not many and (not updated or random.random() < explain_rate):
+            plan = explain(alias, sql, params)
+            if plan:
+                SlowQuery.objects.filter(**lookup).update(
+                    plan=plan,
+                    example=_example(sql, params),
+                    explained_at=now,
+                )
@@ -0,0 +1,90 @@
+"""
+Startup Profiling
+Runs Django startup in a fresh interpreter with `python -X importtime`
+and reports per-module import cost plus settings / app-ready / URLconf time
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+from django.conf import settings
+settings.INSTALLED_APPS
+configured = time.perf_counter()
+import django
+django.setup()
+ready = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+loaded = time.perf_counter()
+print("STARTUP " + json.dumps({
+    "settings": configured - started,
+    "apps_ready": ready - configured,
+    "urls": loaded - ready,
+}))
+"""
+
+
+def parse_importtime(output):
+    """{module: (self µs, cumulative µs)} from -X importtime stderr"""
+    modules = {}
+
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+
+    return modules
+
+
+def by_package(modules):
+    """Self import time summed per top-level package, in µs"""
+    packages = {}
+    for name, (self_us, _) in modules.items():
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    return packages
+
+
+def profile_startup(importtime=True):
+    """
+    One cold start of this project. Returns
+    {"wall", "settings", "apps_ready", "urls"} in seconds, plus
+    "modules" and "packages" when importtime is on.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", PROBE]
+
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+        "DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE
+    ))
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        command, capture_output=True, text=True, env=env, cwd=settings.BASE_DIR
+    )
+    wall = time.perf_counter() - started
+
+    lines = [line for line in result.stdout.splitlines() if line.startswith("STARTUP ")]
+    if result.returncode or not lines:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "startup failed")
+
+    profile = {"wall": wall, **json.loads(lines[-1][len("STARTUP "):])}
+
+    if importtime:
+        profile["modules"] = parse_importtime(result.stderr)
+        profile["packages"] = by_package(profile["modules"])
+
+    return profile
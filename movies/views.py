@@ -7,23 +7,60 @@ from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.generics import ListAPIView
 from django.db.models import Q
+from django.utils.http import parse_etags
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.shortcuts import render
-import requests
-
-from .models import Movie, Genre, Review, Watchlist, Favorite
+from django.urls import reverse
+import zlib
+
+from .models import Movie, Genre, Review, ArchivedReview, Watchlist, Favorite, CatalogStat, ChangeEvent, PendingWrite
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import revoke_token
+from .exporters.catalog_exporter import iter_catalog_chunks, iter_ndjson_gzip, parse_since
+from .middleware import accepted_encodings
+from .pagination import KeysetPagination
+from .renderers import iter_json_list
+from .services import catalog_stats, change_feed, write_behind
+from .utils import metrics, schema_cache
+from .utils.cache_manager import genre_cache
+from .utils.columnar import columnar_catalog
 from .serializers import (
+    MovieFieldset,
+    movie_fragments,
     MovieSerializer,
     GenreSerializer,
     ReviewSerializer,
     WatchlistSerializer,
-    FavoriteSerializer
+    FavoriteSerializer,
+    TokenRevokeSerializer,
 )
 
-from .services.tmdb_service import TMDBService
-from .importers.imdb_importer import IMDBImporter
+from .importers.tmdb_importer import tmdb_details_to_row
+from .importers.upsert import link_genres, upsert_movies
+
+
+# ====================================================
+# HELPERS
+# ====================================================
+
+def filter_by_genre(queryset, genre):
+    """
+    Resolve the genre filter through the cached taxonomy to exact ids,
+    then match them with a semi-join on the genre link table
+    (no LIKE, no duplicate rows)
+    """
+    genre_ids = genre_cache.resolve(genre)
+    if not genre_ids:
+        return queryset.none()
+
+    links = Movie.genres.through.objects.filter(genre_id__in=genre_ids)
+    return queryset.filter(id__in=links.values("movie_id"))
 
 
 # ====================================================
@@ -34,31 +71,128 @@ class MovieListCreateView(generics.ListCreateAPIView):
     queryset = Movie.objects.all()
     serializer_class = MovieSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    throttle_cost = 5
 
     def get(self, request, *args, **kwargs):
 
+        genre = request.query_params.get("genre")
+        year = request.query_params.get("year")
+        search = request.query_params.get("search")
+        sort = request.query_params.get("sort", "-release_date")
+
+        min_vote = request.query_params.get("min_vote")
+        if min_vote:
+            try:
+                min_vote = float(min_vote)
+            except ValueError:
+                return Response({"error": "min_vote must be a number"}, status=400)
+
+        fieldset = MovieFieldset(request.query_params)
+
+        # In-memory columnar snapshot, when enabled and able to answer
+        matches = columnar_catalog.browse(genre=genre, year=year, min_vote=min_vote or None, search=search, sort=sort)
+        if matches is not None:
+            return self.respond_ids(fieldset, matches)
+
         queryset = self.get_queryset()
 
-        genre = request.query_params.get("genre")
         if genre:
-            queryset = queryset.filter(genres__name__icontains=genre)
+            queryset = filter_by_genre(queryset, genre)
 
-        year = request.query_params.get("year")
         if year:
             queryset = queryset.filter(release_date__year=year)
 
-        search = request.query_params.get("search")
+        if min_vote:
+            queryset = queryset.filter(vote_average__gte=min_vote)
+
         if search:
             queryset = queryset.filter(title__icontains=search)
 
-        sort = request.query_params.get("sort", "-release_date")
-        queryset = queryset.order_by(sort)
+        # id breaks ties, so the order is stable (and the same as the snapshot's)
+        queryset = queryset.order_by(sort, "id")
+
+        # Fast read-only path: only the requested columns, no field objects
+        rows = fieldset.values(queryset)
+
+        # Large results are streamed so memory does not grow with the result
+        threshold = getattr(settings, "MOVIE_LIST_STREAMING_THRESHOLD", 1000)
+        if rows[threshold:threshold + 1].exists():
+            return self.stream(fieldset, rows)
+
+        results = fieldset.serialize(rows)
+
+        return Response({
+            "count": len(results),
+            "results": results
+        })
+
+    def stream(self, fieldset, rows):
+        chunk_size = getattr(settings, "MOVIE_LIST_STREAMING_CHUNK_SIZE", 500)
+        head = b'{"count":%d,"results":' % rows.count()
+
+        return StreamingHttpResponse(
+            iter_json_list(fieldset.iter_serialized(rows, chunk_size), head=head, tail=b"}"),
+            content_type="application/json",
+        )
+
+    def respond_ids(self, fieldset, matches):
+        """Snapshot results: ordered ids rendered from the movie fragments"""
+        threshold = getattr(settings, "MOVIE_LIST_STREAMING_THRESHOLD", 1000)
+        if len(matches) <= threshold:
+            results = fieldset.serialize_ids(matches[:])
+            return Response({
+                "count": len(results),
+                "results": results
+            })
+
+        ids = matches[:]
+        chunk_size = getattr(settings, "MOVIE_LIST_STREAMING_CHUNK_SIZE", 500)
+
+        # The snapshot may predate deletes, which serialize_ids skips; drop
+        # them before the count goes out (the same race as stream() remains)
+        existing = set()
+        for start in range(0, len(ids), chunk_size):
+            existing.update(Movie.objects.filter(id__in=ids[start:start + chunk_size]).values_list("id", flat=True))
+        ids = [movie_id for movie_id in ids if movie_id in existing]
+
+        chunks = (fieldset.serialize_ids(ids[start:start + chunk_size]) for start in range(0, len(ids), chunk_size))
+
+        return StreamingHttpResponse(
+            iter_json_list(chunks, head=b'{"count":%d,"results":' % len(ids), tail=b"}"),
+            content_type="application/json",
+        )
+
 
-        serializer = self.get_serializer(queryset, many=True)
+class MovieBatchView(APIView):
+    """
+    GET /api/v1/movies/batch/?ids=3,1,2
+    Several movies in one request, in the requested order. Cached
+    fragments come from one get_many; only the misses are loaded, with a
+    single id__in query. Unknown ids are listed in "missing".
+    """
+
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    throttle_cost = 5
+
+    def get(self, request):
+        max_ids = getattr(settings, "MOVIE_BATCH_MAX_IDS", 100)
+
+        try:
+            ids = [int(value) for value in request.query_params.get("ids", "").split(",") if value.strip()]
+        except ValueError:
+            return Response({"error": "ids must be a comma separated list of integers"}, status=400)
+
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return Response({"error": "ids required"}, status=400)
+        if len(ids) > max_ids:
+            return Response({"error": f"At most {max_ids} ids per request"}, status=400)
+
+        movies = movie_fragments(dict.fromkeys(ids))
 
         return Response({
-            "count": queryset.count(),
-            "results": serializer.data
+            "results": [movies[movie_id] for movie_id in ids if movie_id in movies],
+            "missing": [movie_id for movie_id in ids if movie_id not in movies],
         })
 
 
@@ -68,6 +202,102 @@ class MovieDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     lookup_field = "pk"
 
+    def get_queryset(self):
+        if self.request.method == "GET":
+            # The representation comes from the fragment cache
+            return Movie.objects.only("id", "updated_at")
+        return Movie.objects.all()
+
+    def retrieve(self, request, *args, **kwargs):
+        fieldset = MovieFieldset(request.query_params)
+        movie = self.get_object()
+
+        fragment = movie_fragments({movie.id: movie.updated_at}).get(movie.id)
+        if fragment is None:
+            raise Http404
+        return Response(fieldset.project(fragment))
+
+
+class MovieImageView(APIView):
+    """
+    GET /api/v1/movies/<pk>/images/<poster|backdrop>/?width=342
+    Redirects to the thumbnail for the nearest width bucket, WebP when
+    the client accepts it. Sources are only fetched by process_images,
+    never from a request: an unprocessed image is a 404.
+    """
+
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    schema = None
+
+    def get(self, request, pk, kind):
+        from .services import image_pipeline
+
+        if kind not in ("poster", "backdrop"):
+            raise Http404
+
+        path = get_object_or_404(Movie.objects.values_list(f"{kind}_path", flat=True), pk=pk)
+        url = image_pipeline.source_url(path)
+        if url is None:
+            return Response({"error": f"Movie has no {kind}"}, status=404)
+
+        if not image_pipeline.available():
+            return Response({"error": "Image processing is not available"}, status=503)
+
+        try:
+            width = int(request.query_params.get("width", image_pipeline.widths()[-1]))
+        except ValueError:
+            return Response({"error": "width must be an integer"}, status=400)
+
+        digest = image_pipeline.stored_source(url)
+        if digest is None:
+            return Response({"error": f"The {kind} has not been processed yet"}, status=404)
+
+        # ImageFileView renders the derivative from the stored source if needed
+        fmt = image_pipeline.negotiate_format(request.META.get("HTTP_ACCEPT", ""))
+        name = image_pipeline.derivative_name(digest, image_pipeline.bucket_width(width), fmt)
+        response = HttpResponseRedirect(reverse("image-file", args=[name]))
+        # The movie's source may change, so the redirect itself is short-lived
+        response["Cache-Control"] = "public, max-age=3600"
+        response["Vary"] = "Accept"
+        return response
+
+
+class ImageFileView(APIView):
+    """
+    GET /api/v1/images/<digest>-<width>.<webp|jpg>
+    A rendered thumbnail. Names are content hashes, so responses never
+    change and are cacheable forever.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    throttle_classes = []
+    schema = None
+
+    def get(self, request, name):
+        from .services import image_pipeline
+
+        parsed = image_pipeline.parse_derivative_name(name)
+        if parsed is None:
+            raise Http404
+
+        digest, width, fmt = parsed
+        if width not in image_pipeline.widths():
+            raise Http404
+
+        if request.META.get("HTTP_IF_NONE_MATCH") == f'"{name}"':
+            response = HttpResponse(status=304)
+        else:
+            try:
+                path = image_pipeline.ensure_derivative(digest, width, fmt)
+            except image_pipeline.ImageUnavailable:
+                raise Http404
+            response = FileResponse(open(path, "rb"), content_type=image_pipeline.CONTENT_TYPES[fmt])
+
+        response["ETag"] = f'"{name}"'
+        response["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
 
 # ====================================================
 # GENRE CRUD
@@ -78,6 +308,28 @@ class GenreListCreateView(generics.ListCreateAPIView):
     serializer_class = GenreSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    def list(self, request, *args, **kwargs):
+        """Served from the in-process genre cache, with an ETag"""
+        version = genre_cache.version()
+        etag = '"genres-%s-%s"' % (version, zlib.crc32(request.get_full_path().encode()))
+
+        # Compression weakens the ETag, so compare the opaque part only
+        client_etags = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if etag in [tag.removeprefix("W/") for tag in client_etags]:
+            return Response(status=304, headers={"ETag": etag})
+
+        data = genre_cache.serialized()
+
+        page = self.paginate_queryset(data)
+        if page is not None:
+            response = self.get_paginated_response(page)
+        else:
+            response = Response(data)
+
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
+
 
 class GenreDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Genre.objects.all()
@@ -91,17 +343,79 @@ class GenreDetailView(generics.RetrieveUpdateDestroyAPIView):
 # ====================================================
 
 class ReviewListCreateView(generics.ListCreateAPIView):
+    """
+    GET /api/v1/movies/<movie_id>/reviews/?cursor=&summary=1&include_archived=1
+    Newest first, keyset paginated. summary=1 adds the movie's rating
+    histogram to the first page; include_archived=1 merges in the reviews
+    moved to the archive (archived rows keep their review id).
+    """
+
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         movie_id = self.kwargs.get("movie_id")
-        return Review.objects.filter(movie_id=movie_id)
+        return Review.objects.filter(movie_id=movie_id).select_related("movie", "user")
+
+    def list(self, request, *args, **kwargs):
+        sources = [self.get_queryset()]
+        if request.query_params.get("include_archived") in ("1", "true"):
+            sources.append(
+                ArchivedReview.objects.filter(movie_id=self.kwargs.get("movie_id")).select_related("movie", "user")
+            )
+
+        page = self.paginator.paginate_sources(sources, request)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+
+        first_page = not request.query_params.get(self.paginator.cursor_query_param)
+        if first_page and request.query_params.get("summary") in ("1", "true"):
+            response.data["summary"] = catalog_stats.rating_summary(self.kwargs.get("movie_id"))
+
+        return response
+
+    def create(self, request, *args, **kwargs):
+        # One review per movie, archived or not
+        archived = ArchivedReview.objects.filter(movie_id=self.kwargs.get("movie_id"), user_id=request.user.id)
+        if archived.exists():
+            return Response(
+                {"error": "You have already reviewed this movie"},
+                status=400
+            )
+
+        if not write_behind.enabled():
+            return super().create(request, *args, **kwargs)
+
+        # Write-behind: validate now, apply in the next worker batch
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        movie = get_object_or_404(Movie, pk=self.kwargs.get("movie_id"))
+
+        already_reviewed = Review.objects.filter(movie=movie, user_id=request.user.id).exists()
+        queued = not already_reviewed and write_behind.enqueue(
+            PendingWrite.KIND_REVIEW,
+            request.user.id,
+            movie.id,
+            {
+                "rating": serializer.validated_data["rating"],
+                "comment": serializer.validated_data.get("comment"),
+            },
+        )
+
+        if not queued:
+            return Response(
+                {"error": "You have already reviewed this movie"},
+                status=400
+            )
+
+        return Response({"message": "Review queued"}, status=202)
 
     def perform_create(self, serializer):
         movie_id = self.kwargs.get("movie_id")
         movie = get_object_or_404(Movie, pk=movie_id)
-        serializer.save(user=self.request.user, movie=movie)
+        serializer.save(user_id=self.request.user.id, movie=movie)
 
 
 class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -112,8 +426,8 @@ class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         if self.request.method in ["PUT", "PATCH", "DELETE"]:
-            return Review.objects.filter(user=self.request.user)
-        return Review.objects.all()
+            return Review.objects.filter(user_id=self.request.user.id).select_related("movie", "user")
+        return Review.objects.select_related("movie", "user")
 
 
 # ====================================================
@@ -124,21 +438,31 @@ class WatchlistView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        watchlist = Watchlist.objects.filter(user=request.user)
-        serializer = WatchlistSerializer(watchlist, many=True)
+        watchlist = list(Watchlist.objects.filter(user_id=request.user.id).select_related("movie"))
+        fragments = movie_fragments({item.movie_id: item.movie.updated_at for item in watchlist})
+        serializer = WatchlistSerializer(watchlist, many=True, context={"movie_fragments": fragments})
         return Response(serializer.data)
 
     def post(self, request):
         serializer = WatchlistSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            if write_behind.enabled():
+                # Adding twice is harmless, so a duplicate is acknowledged too
+                write_behind.enqueue(
+                    PendingWrite.KIND_WATCHLIST,
+                    request.user.id,
+                    serializer.validated_data["movie"].id,
+                )
+                return Response({"message": "Watchlist add queued"}, status=202)
+
+            serializer.save(user_id=request.user.id)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
     def delete(self, request, movie_id):
         item = get_object_or_404(
             Watchlist,
-            user=request.user,
+            user_id=request.user.id,
             movie_id=movie_id
         )
         item.delete()
@@ -153,33 +477,64 @@ class FavoriteView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        favorites = Favorite.objects.filter(user=request.user)
-        serializer = FavoriteSerializer(favorites, many=True)
+        favorites = list(Favorite.objects.filter(user_id=request.user.id).select_related("movie"))
+        fragments = movie_fragments({item.movie_id: item.movie.updated_at for item in favorites})
+        serializer = FavoriteSerializer(favorites, many=True, context={"movie_fragments": fragments})
         return Response(serializer.data)
 
     def post(self, request):
         serializer = FavoriteSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            serializer.save(user_id=request.user.id)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
     def delete(self, request, movie_id):
         item = get_object_or_404(
             Favorite,
-            user=request.user,
+            user_id=request.user.id,
             movie_id=movie_id
         )
         item.delete()
         return Response(status=204)
 
 
+# ====================================================
+# TOKEN REVOCATION
+# ====================================================
+
+class TokenRevokeView(APIView):
+    """
+    POST /api/token/revoke/
+    Denylists the calling access token and, optionally, a refresh token
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = TokenRevokeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        refresh = serializer.validated_data.get("refresh")
+        if refresh:
+            try:
+                revoke_token(RefreshToken(refresh))
+            except TokenError as e:
+                return Response({"error": str(e)}, status=400)
+
+        revoke_token(request.auth)
+
+        return Response(status=204)
+
+
 # ====================================================
 # TMDB SINGLE MOVIE IMPORT
 # ====================================================
 
 class ImportMovieFromTMDBView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "import"
+    throttle_cost = 10
 
     def post(self, request):
 
@@ -191,30 +546,41 @@ class ImportMovieFromTMDBView(APIView):
                 status=400
             )
 
+        try:
+            tmdb_id = int(tmdb_id)
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "tmdb_id must be an integer"},
+                status=400
+            )
+
+        from .services.tmdb_service import TMDBService
+
         service = TMDBService()
         data = service.get_movie_details(tmdb_id)
 
         if "error" in data:
             return Response(data, status=404)
 
-        movie, created = Movie.objects.get_or_create(
-            tmdb_id=tmdb_id,
-            defaults={
-                "title": data["title"],
-                "overview": data.get("overview", ""),
-                "release_date": data.get("release_date"),
-                "vote_average": data.get("vote_average", 0),
-                "vote_count": data.get("vote_count", 0),
-                "runtime": data.get("runtime", 0),
-                "poster_path": data.get("poster_path", ""),
-                "backdrop_path": data.get("backdrop_path", ""),
-            }
+        movie_ids, stats = upsert_movies(
+            [tmdb_details_to_row(tmdb_id, data)],
+            key="tmdb_id"
         )
 
-        serializer = MovieSerializer(movie)
+        movie_id = movie_ids[tmdb_id]
+        link_genres({movie_id: data.get("genres", [])})
+
+        if stats["created"]:
+            message = "Movie imported"
+        elif stats["updated"]:
+            message = "Movie updated"
+        else:
+            message = "Movie exists"
+
+        serializer = MovieSerializer(Movie.objects.get(pk=movie_id))
 
         return Response({
-            "message": "Movie imported" if created else "Movie exists",
+            "message": message,
             "movie": serializer.data
         })
 
@@ -230,9 +596,13 @@ class ImportIMDBAPIView(APIView):
     """
 
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "import"
+    throttle_cost = 100
 
     def post(self, request):
 
+        from .importers.imdb_importer import IMDBImporter
+
         importer = IMDBImporter()
         importer.run()
 
@@ -241,6 +611,182 @@ class ImportIMDBAPIView(APIView):
         })
 
 
+# ====================================================
+# CATALOG STATISTICS
+# ====================================================
+
+class CatalogStatsView(APIView):
+    """
+    GET /api/v1/stats/?dimension=genre|year|runtime
+    Averages per genre, release year or runtime bucket, read from the
+    CatalogStat summary table (constant cost, no catalog scan)
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        dimension = request.query_params.get("dimension", CatalogStat.DIMENSION_GENRE)
+
+        if dimension not in dict(CatalogStat.DIMENSION_CHOICES):
+            return Response(
+                {"error": "dimension must be one of: genre, year, runtime"},
+                status=400
+            )
+
+        return Response({
+            "dimension": dimension,
+            "results": catalog_stats.summary(dimension),
+        })
+
+
+# ====================================================
+# API SCHEMA
+# ====================================================
+
+class SchemaView(APIView):
+    """
+    GET /api/schema/
+    The OpenAPI schema (JSON) generated once per code version, served
+    from its pre-compressed artifact with an ETag
+    """
+
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    throttle_classes = []
+    schema = None
+
+    def get(self, request):
+        version, artifact = schema_cache.get_artifact()
+
+        # Best pre-compressed variant the client accepts; brotli on a tie
+        accepted = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        encoding, quality = "identity", 0
+        for name in ("br", "gzip"):
+            if name in artifact and accepted.get(name, 0) > quality:
+                encoding, quality = name, accepted[name]
+
+        etag = f'"{version}"' if encoding == "identity" else f'"{version}-{encoding}"'
+
+        client_etags = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if etag in [tag.removeprefix("W/") for tag in client_etags]:
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(artifact[encoding], content_type="application/vnd.oai.openapi+json")
+            if encoding != "identity":
+                response["Content-Encoding"] = encoding
+
+        response["ETag"] = etag
+        response["Vary"] = "Accept-Encoding"
+        response["Cache-Control"] = "no-cache"
+        return response
+
+
+# ====================================================
+# METRICS
+# ====================================================
+
+class MetricsView(APIView):
+    """
+    GET /api/v1/metrics/
+    Shared counters (e.g. throttle.rejected.<scope>) and write-behind lag
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    throttle_classes = []
+
+    def get(self, request):
+        return Response({
+            "counters": metrics.get_counters(),
+            "write_behind": write_behind.status(),
+        })
+
+
+# ====================================================
+# CATALOG EXPORT
+# ====================================================
+
+class CatalogExportView(APIView):
+    """
+    GET /api/v1/export/catalog/
+    GET /api/v1/export/catalog/?since=2026-01-01T00:00:00Z
+
+    Streams the catalog as gzip NDJSON, one movie per line
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "export"
+    throttle_cost = 50
+
+    def get(self, request):
+
+        since = request.query_params.get("since")
+        if since:
+            try:
+                since = parse_since(since)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=400)
+
+        response = StreamingHttpResponse(
+            iter_ndjson_gzip(iter_catalog_chunks(since=since or None)),
+            content_type="application/gzip",
+        )
+        response["Content-Disposition"] = 'attachment; filename="catalog.ndjson.gz"'
+        return response
+
+
+# ====================================================
+# CHANGE FEED
+# ====================================================
+
+class ChangeFeedView(APIView):
+    """
+    GET /api/v1/changes/?since=<seq>&limit=500&entity=movie,genre
+
+    Catalog change events after `since`, oldest first. Store `cursor`
+    and pass it as the next `since`; deletes arrive as "delete" events.
+    410 means `since` is behind the compaction watermark: resync from
+    /api/v1/export/catalog/ and continue from the returned watermark.
+    Events carry other users' ids, so only staff (service accounts) read it.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    max_limit = 1000
+
+    def get(self, request):
+        try:
+            since = int(request.query_params.get("since", 0))
+            limit = int(request.query_params.get("limit", 500))
+        except ValueError:
+            return Response({"error": "since and limit must be integers"}, status=400)
+
+        entities = [name for name in request.query_params.get("entity", "").split(",") if name]
+        unknown = set(entities) - dict(ChangeEvent.ENTITY_CHOICES).keys()
+        if unknown:
+            return Response(
+                {"error": f"Unknown entity: {', '.join(sorted(unknown))}"},
+                status=400
+            )
+
+        try:
+            events, has_more = change_feed.changes(since, max(1, min(limit, self.max_limit)), entities)
+        except change_feed.FeedExpired as e:
+            return Response(
+                {"error": str(e), "watermark": e.watermark},
+                status=410
+            )
+
+        cursor = events[-1].seq if events else since
+        next_url = None
+        if has_more:
+            next_url = replace_query_param(request.build_absolute_uri(), "since", cursor)
+
+        return Response({
+            "results": [change_feed.as_dict(event) for event in events],
+            "cursor": cursor,
+            "next": next_url,
+        })
+
+
 # ====================================================
 # SEARCH MOVIES
 # ====================================================
@@ -255,13 +801,16 @@ class MovieSearchView(ListAPIView):
     """
     serializer_class = MovieSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = "search"
+    throttle_cost = 5
 
     def get_queryset(self):
 
         query = self.request.query_params.get("q")
         genre = self.request.query_params.get("genre")
 
-        qs = Movie.objects.all()
+        # Newest first; id breaks ties like the columnar snapshot
+        qs = Movie.objects.order_by("-release_date", "id")
 
         # Search by movie title
         if query:
@@ -269,26 +818,27 @@ class MovieSearchView(ListAPIView):
 
         # Filter by genre
         if genre:
-            qs = qs.filter(genres__name__icontains=genre)
+            qs = filter_by_genre(qs, genre)
 
-        return qs.distinct()
-    
-def home(request):
+        return qs
 
-    query = request.GET.get("q")
-    movies = []
+    def list(self, request, *args, **kwargs):
+        fieldset = MovieFieldset(request.query_params)
 
-    if query:
-        try:
-            response = requests.get(
-                f"http://127.0.0.1:8000/api/v1/search/?q={query}"
-            )
-            data = response.json()
-            movies = data.get("results", [])
-        except:
-            movies = []
-
-    return render(request, "index.html", {
-        "movies": movies,
-        "query": query
-    })
\ No newline at end of file
+        matches = columnar_catalog.browse(
+            genre=request.query_params.get("genre"),
+            search=request.query_params.get("q"),
+        )
+        if matches is not None:
+            page = self.paginate_queryset(matches)
+            if page is not None:
+                return self.get_paginated_response(fieldset.serialize_ids(page))
+            return Response(fieldset.serialize_ids(matches[:]))
+
+        queryset = fieldset.values(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fieldset.serialize(page))
+
+        return Response(fieldset.serialize(queryset))
@@ -1,5 +1,4 @@
 from django.shortcuts import render
-import requests
 
 
 def home(request):
@@ -8,6 +7,8 @@ def home(request):
     movies = []
 
     if query:
+        import requests
+
         api_url = "http://127.0.0.1:8000/api/v1/search/"
         response = requests.get(api_url, params={"q": query})
 